@@ -0,0 +1,75 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import argparse
+
+import numpy as np
+
+from config import hybrid_lexicon as cfg
+from src.common.io import load_profiles
+from src.common.text import normalize_text
+from src.algorithms.hybrid_lexicon.engine import format_ml_stats, predict_proba_bucketed, token_lengths
+from src.algorithms.hybrid_lexicon.models import load_ml_models, load_token_cache
+from src.algorithms.hybrid_lexicon.tokens import format_token_cache_stats
+
+
+def annotated_titles():
+    titles = []
+    for profile in load_profiles(cfg.ANNOTATED_JSON_PATH):
+        jobs = profile if isinstance(profile, list) else profile.get("experiences", [])
+        titles.extend(normalize_text(str(j.get("position") or "")) for j in jobs if isinstance(j, dict))
+    return list(dict.fromkeys(t for t in titles if t))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ML-stage encoding: one title per call vs fixed-order vs length-bucketed batches vs the shared token cache.")
+    parser.add_argument("--batch-size", type=int, default=cfg.ML_BATCH_SIZE)
+    parser.add_argument("--max-length", type=int, default=cfg.ML_MAX_SEQ_LENGTH)
+    parser.add_argument("--n-single", type=int, default=200, help="Titles for the one-per-call baseline")
+    args = parser.parse_args()
+
+    dept_model, sen_model, _, _ = load_ml_models()
+    token_cache = load_token_cache(dept_model, sen_model)
+    titles = annotated_titles()
+
+    lengths = token_lengths(dept_model, titles, 10_000)
+    p50, p95, p99 = np.percentile(lengths, [50, 95, 99])
+    print(f"{len(titles)} distinct annotated titles; tokens p50={p50:.0f} p95={p95:.0f} "
+          f"p99={p99:.0f} max={lengths.max()}; {np.mean(lengths > args.max_length):.2%} truncated "
+          f"at max_length={args.max_length}")
+
+    for name, model in (("department", dept_model), ("seniority", sen_model)):
+        single = titles[:args.n_single]
+        stats = {}
+        for t in single:
+            predict_proba_bucketed(model, [t], 1, args.max_length, stats=stats)
+        print(f"[{name}] one per call : {format_ml_stats(stats)}")
+
+        runs = {}
+        for label, bucketed in (("fixed order ", False), ("bucketed    ", True)):
+            stats = {}
+            runs[label] = predict_proba_bucketed(
+                model, titles, args.batch_size, args.max_length, bucketed=bucketed, stats=stats
+            )
+            print(f"[{name}] {label}: {format_ml_stats(stats)}")
+        diff = np.abs(runs["fixed order "] - runs["bucketed    "]).max()
+        print(f"[{name}] max |p_fixed - p_bucketed| = {diff:.2e}")
+
+        if token_cache is not None:
+            stats = {}
+            cached = predict_proba_bucketed(
+                model, titles, args.batch_size, args.max_length, stats=stats, token_cache=token_cache
+            )
+            print(f"[{name}] token cache : {format_ml_stats(stats)}")
+            print(f"[{name}] max |p_bucketed - p_cached| = {np.abs(runs['bucketed    '] - cached).max():.2e}")
+
+    if token_cache is not None:
+        print(f"Token cache: {format_token_cache_stats(token_cache)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config import hybrid_lexicon as hy_cfg
+from config import rule_based as rb_cfg
+from config import tfidf_fast as tf_cfg
+from config.base import ARTIFACTS_DIR
+from src.common.current_job import select_current_job
+from src.common.io import iter_profiles, save_df
+from src.common.lexicon import load_compiled_lexicon
+from src.common.lookup import build_lookup
+from src.common.text import _normalize_cached, build_job_text, normalize_text
+from src.common.tfidf import load_tfidf_classifier
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ALGORITHMS = ("rule_based", "hybrid_lexicon", "tfidf_fast")
+RESULTS_DIR = ARTIFACTS_DIR / "bench"
+# Latency samples kept per stage when a streamed input runs the stage once per batch.
+SAMPLE_CAP = 1_000_000
+
+
+def peak_rss_mb() -> float:
+    if resource is None:
+        return float("nan")
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024
+
+
+class StageTimer:
+    """Wall time, per-item latency samples and peak RSS per named stage.
+
+    Per-item stages time every call; batched stages time each chunk and record its time
+    divided by the chunk length for every item in it (the amortized per-item cost).
+    A stage recorded again (one run per streamed batch of profiles) accumulates; its latency
+    samples are thinned to SAMPLE_CAP in proportion to the items each part stands for."""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._samples: Dict[str, np.ndarray] = {}
+        self._rng = np.random.default_rng(0)
+
+    def _merge(self, name: str, n_items: int, seconds: float, samples: np.ndarray):
+        prev = self._samples.get(name)
+        if prev is None:
+            return n_items, seconds, samples
+        prev_items = self.stages[name]["items"]
+        total = prev_items + n_items
+        if len(prev) + len(samples) > SAMPLE_CAP and total:
+            keep_prev = min(len(prev), round(SAMPLE_CAP * prev_items / total))
+            prev = self._rng.choice(prev, keep_prev, replace=False)
+            samples = self._rng.choice(samples, min(len(samples), SAMPLE_CAP - keep_prev), replace=False)
+        return total, self.stages[name]["seconds"] + seconds, np.concatenate([prev, samples])
+
+    def _record(self, name: str, n_items: int, seconds: float, samples: np.ndarray) -> None:
+        n_items, seconds, samples = self._merge(name, n_items, seconds, np.asarray(samples, dtype=np.float64))
+        self._samples[name] = samples
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1e6 if len(samples) else (0.0, 0.0, 0.0)
+        self.stages[name] = {
+            "items": n_items,
+            "seconds": seconds,
+            "items_per_s": n_items / seconds if seconds > 0 else None,
+            "p50_us": float(p50),
+            "p95_us": float(p95),
+            "p99_us": float(p99),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    def skip(self, name: str, reason: str) -> None:
+        self.stages[name] = {"skipped": reason}
+
+    def once(self, name: str, fn: Callable[[], Any], n_items: int = None) -> Any:
+        """One call; `n_items` defaults to len() of its result."""
+        start = time.perf_counter()
+        out = fn()
+        seconds = time.perf_counter() - start
+        n_items = len(out) if n_items is None else n_items
+        self._record(name, n_items, seconds, np.full(1, seconds / max(n_items, 1)))
+        return out
+
+    def batches(self, name: str, batches: Iterable[Sequence[Any]]) -> Iterator[Sequence[Any]]:
+        """Yields from `batches`, timing the fetch of each batch as one call of stage `name`."""
+        it = iter(batches)
+        while True:
+            start = time.perf_counter()
+            batch = next(it, None)
+            seconds = time.perf_counter() - start
+            if batch is None:
+                return
+            self._record(name, len(batch), seconds, np.full(1, seconds / max(len(batch), 1)))
+            yield batch
+
+    def per_item(self, name: str, fn: Callable[[Any], Any], items: Sequence[Any]) -> List[Any]:
+        out, samples = [], np.empty(len(items), dtype=np.float64)
+        clock = time.perf_counter
+        start = clock()
+        for i, item in enumerate(items):
+            t0 = clock()
+            out.append(fn(item))
+            samples[i] = clock() - t0
+        self._record(name, len(items), clock() - start, samples)
+        return out
+
+    def chunked(self, name: str, fn: Callable[[Sequence[Any]], Any], items: Sequence[Any], chunk_size: int) -> List[Any]:
+        """fn() per chunk of `items`; returns the per-chunk results."""
+        out, samples = [], []
+        start = time.perf_counter()
+        for lo in range(0, len(items), chunk_size):
+            chunk = items[lo:lo + chunk_size]
+            t0 = time.perf_counter()
+            out.append(fn(chunk))
+            samples.extend([(time.perf_counter() - t0) / len(chunk)] * len(chunk))
+        self._record(name, len(items), time.perf_counter() - start, np.asarray(samples))
+        return out
+
+
+def profile_batches(path: Path, batch_size: int) -> Iterator[List[Any]]:
+    """Profiles in lists of `batch_size`; a .jsonl input is never held in memory whole."""
+    profiles = iter_profiles(path)
+    while True:
+        batch = list(islice(profiles, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def current_jobs(timer: StageTimer, profiles: List[Any]) -> List[Dict[str, Any]]:
+    experiences = [p if isinstance(p, list) else p.get("experiences", []) for p in profiles]
+    jobs = timer.per_item("select_current_job", select_current_job, experiences)
+    return [j for j in jobs if j]
+
+
+def write_stage(timer: StageTimer, df: pd.DataFrame, out_dir: Path) -> None:
+    timer.once("write_output", lambda: save_df(df, out_dir / "predictions.csv"), len(df))
+
+
+def bench_rule_based(timer: StageTimer, profiles: List[Any], out_dir: Path, chunk_size: int) -> None:
+    from src.algorithms.rule_based.engine import DepartmentRuleScorer, SeniorityRuleScorer
+    from src.algorithms.rule_based.inference import score_batch
+
+    dept_lexicon = load_compiled_lexicon(rb_cfg.DEPT_LEXICON_PATH, rb_cfg.DEPT_LEXICON_COMPILED_PATH)
+    sen_lexicon = load_compiled_lexicon(rb_cfg.SEN_LEXICON_PATH, rb_cfg.SEN_LEXICON_COMPILED_PATH)
+    dept_args = {
+        "bigram_weight": rb_cfg.DEPT_BIGRAM_WEIGHT,
+        "unigram_weight": rb_cfg.DEPT_UNIGRAM_WEIGHT,
+        "min_score": rb_cfg.DEPT_MIN_SCORE,
+        "default_label": rb_cfg.DEPT_DEFAULT_LABEL,
+    }
+
+    jobs = current_jobs(timer, profiles)
+    texts = timer.per_item("build_job_text", build_job_text, jobs)
+
+    if rb_cfg.BATCH_SCORING:
+        chunks = timer.chunked(
+            "department_and_seniority_rules",
+            lambda chunk: score_batch(chunk, dept_lexicon, sen_lexicon, dept_args, rb_cfg.SEN_DEFAULT_LABEL),
+            texts, chunk_size,
+        )
+        df = pd.concat([pd.DataFrame(c) for c in chunks], ignore_index=True)
+    else:
+        dept_scorer = DepartmentRuleScorer(dept_lexicon, **dept_args)
+        sen_scorer = SeniorityRuleScorer(sen_lexicon, default_label=rb_cfg.SEN_DEFAULT_LABEL)
+        dept = timer.per_item("department_rules", dept_scorer.score, texts)
+        sen = timer.per_item("seniority_rules", sen_scorer.score, texts)
+        df = pd.DataFrame({
+            "dept_pred": [dept_scorer.label_name(d[0]) for d in dept],
+            "sen_pred": [sen_scorer.label_name(s[0]) for s in sen],
+        })
+    write_stage(timer, df, out_dir)
+
+
+def bench_hybrid(timer: StageTimer, profiles: List[Any], out_dir: Path, chunk_size: int) -> None:
+    from src.algorithms.hybrid_lexicon.engine import (
+        predict_department_rule,
+        predict_proba_bucketed,
+        predict_seniority_rule,
+        resolve_before_ml,
+    )
+    from src.algorithms.hybrid_lexicon.models import load_ml_models, load_token_cache
+
+    dept_lexicon = load_compiled_lexicon(hy_cfg.DEPT_LEXICON_PATH, hy_cfg.DEPT_LEXICON_COMPILED_PATH)
+    sen_lexicon = load_compiled_lexicon(hy_cfg.SEN_LEXICON_PATH, hy_cfg.SEN_LEXICON_COMPILED_PATH)
+    dept_lookup = build_lookup(hy_cfg.DEPT_LOOKUP_PATH) if hy_cfg.EXACT_LOOKUP else None
+    sen_lookup = build_lookup(hy_cfg.SEN_LOOKUP_PATH) if hy_cfg.EXACT_LOOKUP else None
+    dept_tfidf = sen_tfidf = None
+    if hy_cfg.TFIDF_TIER:
+        dept_tfidf = load_tfidf_classifier(
+            hy_cfg.DEPT_LOOKUP_PATH, hy_cfg.DEPT_TFIDF_PATH, "Department", hy_cfg.TFIDF_TARGET_PRECISION
+        )
+        sen_tfidf = load_tfidf_classifier(
+            hy_cfg.SEN_LOOKUP_PATH, hy_cfg.SEN_TFIDF_PATH, "Seniority", hy_cfg.TFIDF_TARGET_PRECISION
+        )
+
+    jobs = current_jobs(timer, profiles)
+    texts = timer.per_item("normalize_text", lambda j: normalize_text(j.get("position", "")), jobs)
+    texts = [t for t in texts if t]
+
+    # Exact lookup -> lexicon rules -> TF-IDF together, i.e. everything ahead of the encoder
+    # (the same span serve.py reports as stage="pre_ml").
+    dept = timer.per_item(
+        "department_pre_ml",
+        lambda t: resolve_before_ml(t, predict_department_rule, dept_lexicon, True, dept_lookup, dept_tfidf),
+        texts,
+    )
+    sen = timer.per_item(
+        "seniority_pre_ml",
+        lambda t: resolve_before_ml(t, predict_seniority_rule, sen_lexicon, True, sen_lookup, sen_tfidf),
+        texts,
+    )
+
+    try:
+        dept_model, sen_model, _, _ = load_ml_models()
+    except (ImportError, OSError) as e:
+        timer.skip("department_setfit", f"ML models unavailable: {e}")
+        timer.skip("seniority_setfit", f"ML models unavailable: {e}")
+    else:
+        token_cache = load_token_cache(dept_model, sen_model)
+        for name, model, resolved in (("department_setfit", dept_model, dept), ("seniority_setfit", sen_model, sen)):
+            pending = list(dict.fromkeys(t for t, r in zip(texts, resolved) if r is None))
+            timer.chunked(
+                name,
+                lambda chunk, model=model: predict_proba_bucketed(
+                    model, chunk, hy_cfg.ML_BATCH_SIZE, hy_cfg.ML_MAX_SEQ_LENGTH, token_cache=token_cache
+                ),
+                pending, chunk_size,
+            )
+
+    df = pd.DataFrame({
+        "text": texts,
+        "department_source": [r[2] if r else "ML" for r in dept],
+        "seniority_source": [r[2] if r else "ML" for r in sen],
+    })
+    write_stage(timer, df, out_dir)
+
+
+def bench_tfidf_fast(timer: StageTimer, profiles: List[Any], out_dir: Path, chunk_size: int) -> None:
+    from src.algorithms.tfidf_fast.inference import load_models, predict_batched
+
+    dept_model, sen_model = load_models()
+    jobs = current_jobs(timer, profiles)
+    texts = timer.per_item("normalize_text", lambda j: normalize_text(j.get("position", "")), jobs)
+
+    dept = timer.chunked(
+        "department_tfidf",
+        lambda chunk: predict_batched(dept_model, chunk, tf_cfg.DEPT_FALLBACK_LABEL)[0],
+        texts, chunk_size,
+    )
+    sen = timer.chunked(
+        "seniority_tfidf",
+        lambda chunk: predict_batched(sen_model, chunk, tf_cfg.SEN_FALLBACK_LABEL)[0],
+        texts, chunk_size,
+    )
+    df = pd.DataFrame({"dept_pred": np.concatenate(dept or [[]]), "sen_pred": np.concatenate(sen or [[]])})
+    write_stage(timer, df, out_dir)
+
+
+BENCHES = {
+    "rule_based": bench_rule_based,
+    "hybrid_lexicon": bench_hybrid,
+    "tfidf_fast": bench_tfidf_fast,
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(algo: str, result: Dict[str, Any]) -> None:
+    print(f"\n=== {algo}: {result['profiles']} profiles, {result['profiles_per_s']:,.0f} profiles/s ===")
+    print(f"{'stage':32} {'items':>9} {'seconds':>9} {'items/s':>12} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'RSS MB':>8}")
+    for name, s in result["stages"].items():
+        if "skipped" in s:
+            print(f"{name:32} skipped: {s['skipped']}")
+            continue
+        rate = f"{s['items_per_s']:,.0f}" if s["items_per_s"] else "-"
+        print(f"{name:32} {s['items']:>9} {s['seconds']:>9.3f} {rate:>12} "
+              f"{s['p50_us']:>9.1f} {s['p95_us']:>9.1f} {s['p99_us']:>9.1f} {s['peak_rss_mb']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage end-to-end benchmark of the inference pipelines.")
+    parser.add_argument("--algo", choices=ALGORITHMS, nargs="+", default=list(ALGORITHMS))
+    parser.add_argument("--input", type=Path, default=rb_cfg.NOT_ANNOTATED_JSON_PATH, help="Profiles JSON or JSONL")
+    parser.add_argument("--batch-profiles", type=int, default=100_000,
+                        help="Profiles read and run through the stages at a time (bounds memory for large .jsonl inputs)")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="Items per batched-stage chunk")
+    parser.add_argument("--out", type=Path, default=None, help=f"JSON results (default: {RESULTS_DIR}/<commit>_<time>.json)")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "input": str(args.input),
+        "algorithms": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for algo in args.algo:
+            # Every algorithm starts from a cold normalize_text cache.
+            _normalize_cached.cache_clear()
+            timer = StageTimer()
+            n_profiles = 0
+            for profiles in timer.batches("load_profiles", profile_batches(args.input, args.batch_profiles)):
+                BENCHES[algo](timer, profiles, Path(tmp) / algo, args.chunk_size)
+                n_profiles += len(profiles)
+
+            total = sum(s.get("seconds", 0.0) for s in timer.stages.values())
+            report["algorithms"][algo] = result = {
+                "profiles": n_profiles,
+                "seconds": total,
+                "profiles_per_s": n_profiles / total if total > 0 else 0.0,
+                "peak_rss_mb": peak_rss_mb(),
+                "stages": timer.stages,
+            }
+            print_report(algo, result)
+
+    out = args.out or RESULTS_DIR / f"{commit}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nSaved: {out}")
+
+
+if __name__ == "__main__":
+    main()
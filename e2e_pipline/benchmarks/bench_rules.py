@@ -0,0 +1,56 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import argparse
+import time
+
+from benchmarks.titles import sample_titles
+from config import rule_based as cfg
+from src.common.io import load_lexicon
+from src.common.text import normalize_text
+from src.algorithms.rule_based.engine import predict_department_rule
+from src.algorithms.rule_based.batch import BatchDepartmentScorer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-title vs batch department rule scoring.")
+    parser.add_argument("--n", type=int, default=1_000_000, help="Titles for the batch engine")
+    parser.add_argument("--n-loop", type=int, default=2_000, help="Titles for the per-title engine")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    lexicon = load_lexicon(cfg.DEPT_LEXICON_PATH)
+    params = {
+        "bigram_weight": cfg.DEPT_BIGRAM_WEIGHT,
+        "unigram_weight": cfg.DEPT_UNIGRAM_WEIGHT,
+        "min_score": cfg.DEPT_MIN_SCORE,
+        "default_label": cfg.DEPT_DEFAULT_LABEL,
+    }
+    titles = [normalize_text(t) for t in sample_titles(args.n, seed=args.seed)]
+
+    loop_titles = titles[:args.n_loop]
+    t0 = time.perf_counter()
+    for t in loop_titles:
+        predict_department_rule(t, lexicon, normalized=True, **params)
+    dt = time.perf_counter() - t0
+    print(f"predict_department_rule: {len(loop_titles) / dt * 60 / 1e6:8.3f}M titles/min")
+
+    t0 = time.perf_counter()
+    scorer = BatchDepartmentScorer(lexicon, **params)
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in scorer.iter_chunks(titles, chunk_size=args.chunk_size, normalized=True):
+        pass
+    dt = time.perf_counter() - t0
+    print(f"BatchDepartmentScorer  : {len(titles) / dt * 60 / 1e6:8.3f}M titles/min "
+          f"({len(set(titles))} distinct, build {build * 1e3:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
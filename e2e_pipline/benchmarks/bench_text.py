@@ -0,0 +1,78 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import argparse
+import re
+import time
+
+from benchmarks.titles import sample_titles
+from src.common import text as text_mod
+from src.common.lexicon import load_compiled_lexicon
+from config import hybrid_lexicon as hycfg
+from src.algorithms.hybrid_lexicon.engine import predict_department_rule
+
+
+def _normalize_uncompiled(text):
+    if not isinstance(text, str):
+        return ""
+    text = str(text).lower()
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def _normalize_compiled(text):
+    if not isinstance(text, str):
+        return ""
+    return text_mod._WS_RE.sub(" ", text.lower()).strip()
+
+
+def _time(fn, titles, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for t in titles:
+            fn(t)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(titles) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark for normalize_text.")
+    parser.add_argument("--n", type=int, default=200_000, help="Number of sampled titles")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--labeled-share", type=float, default=0.5,
+                        help="Share of titles drawn from the labeled CSVs (long tail of unique titles)")
+    args = parser.parse_args()
+
+    titles = sample_titles(args.n, seed=args.seed, labeled_share=args.labeled_share)
+    print(f"{len(titles)} titles, {len(set(titles))} distinct")
+
+    print(f"re.sub per call      : {_time(_normalize_uncompiled, titles, args.repeat):8.1f} ns/title")
+    print(f"precompiled pattern  : {_time(_normalize_compiled, titles, args.repeat):8.1f} ns/title")
+
+    text_mod._normalize_cached.cache_clear()
+    t0 = time.perf_counter()
+    for t in titles:
+        text_mod.normalize_text(t)
+    cold = (time.perf_counter() - t0) / len(titles) * 1e9
+    print(f"memoized (cold)      : {cold:8.1f} ns/title  {text_mod.normalize_cache_info()}")
+    print(f"memoized (warm)      : {_time(text_mod.normalize_text, titles, args.repeat):8.1f} ns/title")
+
+    # Compiled once, outside the timed loop: the rows compare normalize_text against normalized=True.
+    lexicon = load_compiled_lexicon(hycfg.DEPT_LEXICON_PATH, hycfg.DEPT_LEXICON_COMPILED_PATH)
+    sample = [text_mod.normalize_text(t) for t in titles[:2000]]
+    for normalized in (False, True):
+        t0 = time.perf_counter()
+        for t in sample:
+            predict_department_rule(t, lexicon, normalized=normalized)
+        dt = (time.perf_counter() - t0) / len(sample) * 1e6
+        print(f"hybrid dept rule (normalized={normalized!s:5}): {dt:8.1f} us/title")
+
+
+if __name__ == "__main__":
+    main()
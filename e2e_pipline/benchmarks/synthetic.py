@@ -0,0 +1,141 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import argparse
+import json
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from config.base import DATA_DIR
+from src.common.io import load_profiles
+
+PROFILE_SOURCES = ("linkedin-cvs-annotated.json", "linkedin-cvs-not-annotated.json")
+TITLE_SOURCES = ("department-v2.csv", "seniority-v2.csv")
+MAX_SHIFT_MONTHS = 24
+
+_YYYY_MM_RE = re.compile(r"\d{4}-\d{2}")
+_YYYY_RE = re.compile(r"\d{4}")
+
+
+@dataclass
+class ProfileModel:
+    """What synthetic profiles are sampled from.
+
+    `templates` are the real experience histories reduced to (organization slot, startDate,
+    endDate, status): resampling them whole keeps history length, status mix and date layout
+    (including missing and year-only dates) jointly as observed. Each organization slot is
+    filled with an (organization, linkedin) pair from `organizations`, so a person keeps the
+    same employer across consecutive roles, and each role gets a title from `positions`."""
+    templates: List[List[Tuple[int, Any, Any, Any]]]
+    positions: List[str]
+    organizations: List[Tuple[str, str]]
+
+
+def fit_profile_model(data_dir: Path = DATA_DIR) -> ProfileModel:
+    templates, organizations = [], []
+    for name in PROFILE_SOURCES:
+        for profile in load_profiles(data_dir / name):
+            jobs = profile if isinstance(profile, list) else profile.get("experiences", [])
+            slots: Dict[str, int] = {}
+            template = []
+            for job in jobs:
+                if not isinstance(job, dict):
+                    continue
+                org = (job.get("organization") or "", job.get("linkedin") or "")
+                slots.setdefault(org[0], len(slots))
+                organizations.append(org)
+                template.append((slots[org[0]], job.get("startDate"), job.get("endDate"), job.get("status")))
+            if template:
+                templates.append(template)
+
+    positions = []
+    for name in TITLE_SOURCES:
+        positions.extend(pd.read_csv(data_dir / name)["text"].dropna().astype(str).tolist())
+    return ProfileModel(templates, positions, organizations)
+
+
+def _shift_date(value: Any, months: int) -> Any:
+    if not isinstance(value, str):
+        return value
+    if _YYYY_MM_RE.fullmatch(value):
+        m = int(value[:4]) * 12 + int(value[5:]) - 1 + months
+        return f"{m // 12:04d}-{m % 12 + 1:02d}"
+    if _YYYY_RE.fullmatch(value):
+        return f"{int(value) + months // 12:04d}"
+    return value
+
+
+def generate_profiles(model: ProfileModel, n: int, seed: int = 0) -> Iterator[List[Dict[str, Any]]]:
+    """`n` profiles, lazily: memory stays flat however many are requested."""
+    rng = random.Random(seed)
+    for _ in range(n):
+        template = rng.choice(model.templates)
+        # One shift per profile keeps the history's internal order; only backwards, so no role
+        # starts in the future.
+        shift = -rng.randint(0, MAX_SHIFT_MONTHS)
+        orgs: Dict[int, Tuple[str, str]] = {}
+        profile = []
+        for slot, start, end, status in template:
+            if slot not in orgs:
+                orgs[slot] = rng.choice(model.organizations)
+            organization, linkedin = orgs[slot]
+            profile.append({
+                "organization": organization,
+                "linkedin": linkedin,
+                "position": rng.choice(model.positions),
+                "startDate": _shift_date(start, shift),
+                "endDate": _shift_date(end, shift),
+                "status": status,
+            })
+        yield profile
+
+
+def write_profiles(profiles: Iterator[List[Dict[str, Any]]], path: Path, fmt: Optional[str] = None) -> Tuple[int, int]:
+    """Stream profiles to `path` as a JSON array (the format of data/linkedin-cvs-*.json) or as
+    JSONL, one profile per line. Returns (profiles, bytes) written."""
+    fmt = fmt or ("jsonl" if path.suffix == ".jsonl" else "json")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = size = 0
+    with open(path, "wb") as f:
+        if fmt == "json":
+            size += f.write(b"[\n")
+        for profile in profiles:
+            line = json.dumps(profile, ensure_ascii=False).encode("utf-8")
+            if fmt == "json" and count:
+                size += f.write(b",\n")
+            size += f.write(line)
+            if fmt == "jsonl":
+                size += f.write(b"\n")
+            count += 1
+        if fmt == "json":
+            size += f.write(b"\n]\n")
+    return count, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic LinkedIn-style profiles for load testing.")
+    parser.add_argument("--profiles", type=int, required=True, help="Number of profiles to generate")
+    parser.add_argument("--out", type=Path, required=True, help="Output path (.json array or .jsonl)")
+    parser.add_argument("--format", choices=("json", "jsonl"), default=None, help="Override the format implied by --out")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = fit_profile_model()
+    start = time.perf_counter()
+    count, size = write_profiles(generate_profiles(model, args.profiles, seed=args.seed), args.out, args.format)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {count:,} profiles ({size / 1e6:,.1f} MB) to {args.out} in {elapsed:.1f}s "
+          f"({count / elapsed:,.0f} profiles/s)")
+
+
+if __name__ == "__main__":
+    main()
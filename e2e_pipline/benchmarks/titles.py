@@ -0,0 +1,27 @@
+import random
+from typing import List
+
+import pandas as pd
+
+from config.base import DATA_DIR
+from src.common.io import load_profiles
+
+def observed_titles() -> List[str]:
+    titles = []
+    for name in ("linkedin-cvs-annotated.json", "linkedin-cvs-not-annotated.json"):
+        for profile in load_profiles(DATA_DIR / name):
+            jobs = profile if isinstance(profile, list) else profile.get("experiences", [])
+            titles.extend(str(j.get("position") or "") for j in jobs if isinstance(j, dict))
+    return titles
+
+def labeled_titles() -> List[str]:
+    titles = []
+    for name in ("department-v2.csv", "seniority-v2.csv"):
+        titles.extend(pd.read_csv(DATA_DIR / name)["text"].astype(str).tolist())
+    return titles
+
+def sample_titles(n: int, seed: int = 0, labeled_share: float = 0.5) -> List[str]:
+    # Profile titles keep their natural repetition; the labeled CSVs add the long tail of distinct titles.
+    rng = random.Random(seed)
+    observed, labeled = observed_titles(), labeled_titles()
+    return [rng.choice(labeled) if rng.random() < labeled_share else rng.choice(observed) for _ in range(n)]
@@ -6,10 +6,60 @@ ANNOTATED_JSON_PATH = DATA_DIR / "linkedin-cvs-annotated.json"
 DEPT_LEXICON_PATH = DATA_DIR / "department_lexicon.json"
 SEN_LEXICON_PATH = DATA_DIR / "seniority_lexicon.json"
 
+# Compiled by pipelines/compile_lexicon.py; rebuilt automatically when the JSON changes.
+DEPT_LEXICON_COMPILED_PATH = ARTIFACTS_DIR / "lexicons" / "department_lexicon.pkl"
+SEN_LEXICON_COMPILED_PATH = ARTIFACTS_DIR / "lexicons" / "seniority_lexicon.pkl"
+
+# Labeled titles resolved by exact lookup ahead of the lexicon (source "Exact").
+DEPT_LOOKUP_PATH = DATA_DIR / "department-v2.csv"
+SEN_LOOKUP_PATH = DATA_DIR / "seniority-v2.csv"
+
+# TF-IDF + LogisticRegression tier between the rules and SetFit, trained on the same CSVs and
+# retrained automatically when they change. SetFit only sees titles below the calibrated
+# threshold, i.e. where held-out TF-IDF precision would drop under TFIDF_TARGET_PRECISION.
+DEPT_TFIDF_PATH = ARTIFACTS_DIR / "tfidf" / "department.joblib"
+SEN_TFIDF_PATH = ARTIFACTS_DIR / "tfidf" / "seniority.joblib"
+TFIDF_TARGET_PRECISION = 0.95
+TFIDF_REPORT_THRESHOLDS = (0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95)
+
+# ML_BACKEND = "knn" swaps the SetFit heads for a top-k cosine vote over the labeled CSV titles,
+# embedded once with the same SetFit bodies (pipelines/build_knn_index.py, or on first use).
+ML_BACKEND = "setfit"
+DEPT_KNN_DIR = ARTIFACTS_DIR / "knn" / "department"
+SEN_KNN_DIR = ARTIFACTS_DIR / "knn" / "seniority"
+KNN_K = 10
+KNN_USE_HNSW = False
+DEPT_KNN_THRESHOLD = 0.8
+SEN_KNN_THRESHOLD = 0.8
+
 OUTPUT_DIR = ARTIFACTS_DIR / "hybrid"
 PREDICTIONS_PATH = OUTPUT_DIR / "predictions.csv"
 
+# Per-tier latency histograms, source counts and cache hit rates, written next to the outputs.
+INSTRUMENTATION = True
+INFERENCE_METRICS_PATH = OUTPUT_DIR / "predictions.metrics.json"
+VALIDATION_METRICS_PATH = OUTPUT_DIR / "validation.metrics.json"
+
 CHECKPOINTS_DIR = MODELS_DIR / "checkpoints"
 
 DEPT_ML_THRESHOLD = 0.99
-SEN_ML_THRESHOLD = 0.95
\ No newline at end of file
+SEN_ML_THRESHOLD = 0.95
+
+# pipelines/sweep_thresholds.py scores the annotated titles once (probabilities cached under
+# SWEEP_DIR) and evaluates every ML threshold in the grid. Besides the most accurate point it
+# reports the lowest threshold whose ML-answered precision stays >= ML_SWEEP_TARGET_PRECISION.
+ML_SWEEP_THRESHOLDS = tuple(round(0.30 + 0.01 * i, 2) for i in range(70)) + (0.995, 0.999)
+ML_SWEEP_TARGET_PRECISION = 0.9
+SWEEP_DIR = OUTPUT_DIR / "sweep"
+
+# Titles left for the ML stage are encoded in batches of similar tokenized length and truncated
+# to ML_MAX_SEQ_LENGTH tokens (titles rarely pass 20; the body default is 256-512).
+ML_BATCH_SIZE = 32
+ML_MAX_SEQ_LENGTH = 48
+# Tokenize each title once for both SetFit bodies (same MiniLM vocabulary) and feed the cached
+# ids to the encoders instead of letting each predict_proba call re-tokenize.
+TOKEN_CACHE = True
+
+BULK_CURRENT_JOB = False
+EXACT_LOOKUP = True
+TFIDF_TIER = True
\ No newline at end of file
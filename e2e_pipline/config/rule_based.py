@@ -6,12 +6,40 @@ NOT_ANNOTATED_JSON_PATH = DATA_DIR / "linkedin-cvs-not-annotated.json"
 DEPT_LEXICON_PATH = DATA_DIR / "department_lexicon.json"
 SEN_LEXICON_PATH = DATA_DIR / "seniority_lexicon.json"
 
+# Labeled titles the lexicons are built from (pipelines/lexicon.py build).
+DEPT_LEXICON_SOURCE_PATH = DATA_DIR / "department-v2.csv"
+SEN_LEXICON_SOURCE_PATH = DATA_DIR / "seniority-v2.csv"
+
+# Compiled by pipelines/compile_lexicon.py; rebuilt automatically when the JSON changes.
+DEPT_LEXICON_COMPILED_PATH = ARTIFACTS_DIR / "lexicons" / "department_lexicon.pkl"
+SEN_LEXICON_COMPILED_PATH = ARTIFACTS_DIR / "lexicons" / "seniority_lexicon.pkl"
+
+# Per-title term counts folded by `pipelines/lexicon.py update`; only rows appended to the
+# source CSVs since the last update are tokenized.
+DEPT_LEXICON_STATS_PATH = ARTIFACTS_DIR / "lexicons" / "department_lexicon_stats.pkl"
+SEN_LEXICON_STATS_PATH = ARTIFACTS_DIR / "lexicons" / "seniority_lexicon_stats.pkl"
+
 PRED_ANNOTATED_PATH = ARTIFACTS_DIR / "predictions_rule.csv"
 PRED_NOT_ANNOTATED_PATH = ARTIFACTS_DIR / "predictions_rule_not_annotated.csv"
 
+# Stage timers, counters and source counts (src/common/instrumentation.py), written as JSON at
+# the end of each run. Disabled, the hooks cost one attribute check.
+INSTRUMENTATION = True
+INFERENCE_METRICS_PATH = ARTIFACTS_DIR / "predictions_rule_not_annotated.metrics.json"
+VALIDATION_METRICS_PATH = ARTIFACTS_DIR / "predictions_rule.metrics.json"
+
 DEPT_BIGRAM_WEIGHT = 2.0
 DEPT_UNIGRAM_WEIGHT = 1.0
 DEPT_MIN_SCORE = 2.0
 DEPT_DEFAULT_LABEL = "Other"
 
-SEN_DEFAULT_LABEL = "Professional"
\ No newline at end of file
+# pipelines/tune_rule_weights.py grid for the three department weights above (all combinations).
+TUNE_BIGRAM_WEIGHTS = tuple(0.25 * i for i in range(1, 25))
+TUNE_UNIGRAM_WEIGHTS = tuple(0.25 * i for i in range(1, 17))
+TUNE_MIN_SCORES = tuple(0.5 * i for i in range(13))
+TUNING_DIR = ARTIFACTS_DIR / "tuning"
+
+SEN_DEFAULT_LABEL = "Professional"
+
+BULK_CURRENT_JOB = False
+BATCH_SCORING = False
\ No newline at end of file
@@ -0,0 +1,10 @@
+HOST = "127.0.0.1"
+PORT = 8080
+
+# Requests are queued and classified together: the micro-batcher waits up to MAX_WAIT_MS after
+# the first queued request for more, capped at MAX_BATCH_TITLES titles per batch.
+MAX_BATCH_TITLES = 64
+MAX_WAIT_MS = 5.0
+
+# Prefix of every exposed metric name (GET /metrics).
+METRICS_NAMESPACE = "pds_classifier"
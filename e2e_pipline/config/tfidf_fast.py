@@ -0,0 +1,31 @@
+from .base import DATA_DIR, ARTIFACTS_DIR
+
+ANNOTATED_JSON_PATH = DATA_DIR / "linkedin-cvs-annotated.json"
+NOT_ANNOTATED_JSON_PATH = DATA_DIR / "linkedin-cvs-not-annotated.json"
+
+DEPT_TRAIN_CSV_PATH = DATA_DIR / "department-v2.csv"
+SEN_TRAIN_CSV_PATH = DATA_DIR / "seniority-v2.csv"
+
+DEPT_MODEL_PATH = ARTIFACTS_DIR / "tfidf" / "fast_department.joblib"
+SEN_MODEL_PATH = ARTIFACTS_DIR / "tfidf" / "fast_seniority.joblib"
+
+OUTPUT_DIR = ARTIFACTS_DIR / "tfidf_fast"
+PREDICTIONS_PATH = OUTPUT_DIR / "predictions.csv"
+
+INSTRUMENTATION = True
+INFERENCE_METRICS_PATH = OUTPUT_DIR / "predictions.metrics.json"
+VALIDATION_METRICS_PATH = OUTPUT_DIR / "validation.metrics.json"
+
+# Predictions below the model's calibrated threshold (held-out precision < TARGET_PRECISION)
+# fall back to these labels, as predict_with_unknown_fallback did in Approach 6.
+TARGET_PRECISION = 0.95
+DEPT_FALLBACK_LABEL = "Other"
+SEN_FALLBACK_LABEL = "Senior"
+BATCH_SIZE = 8192
+# Titles that are empty after normalization are not scored.
+EMPTY_LABEL = "Unknown"
+
+# The seniority CSV has no Professional/Entry classes.
+SEN_TRUTH_MAP = {"Professional": "Senior", "Entry": "Junior"}
+
+BULK_CURRENT_JOB = False
@@ -0,0 +1,35 @@
+from pathlib import Path
+import sys
+import time
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import argparse
+from config import hybrid_lexicon as cfg
+from src.common.knn import build_knn_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed the labeled CSVs with the SetFit bodies for the kNN backend.")
+    parser.add_argument("--hnsw", action="store_true", default=cfg.KNN_USE_HNSW, help="also build an HNSW index")
+    args = parser.parse_args()
+
+    from setfit import SetFitModel
+
+    for name, csv_path, index_dir in (
+        ("department_model", cfg.DEPT_LOOKUP_PATH, cfg.DEPT_KNN_DIR),
+        ("seniority_model", cfg.SEN_LOOKUP_PATH, cfg.SEN_KNN_DIR),
+    ):
+        model_path = cfg.CHECKPOINTS_DIR / name
+        body = SetFitModel.from_pretrained(str(model_path)).model_body
+        start = time.perf_counter()
+        index = build_knn_index(csv_path, index_dir, body, str(model_path), use_hnsw=args.hnsw)
+        print(
+            f"{csv_path.name} -> {index_dir} "
+            f"({len(index.texts)} titles x {index.embeddings.shape[1]} dims, {time.perf_counter() - start:.1f}s)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from pathlib import Path
+import sys
+import time
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import argparse
+from config import rule_based as rbcfg
+from config import hybrid_lexicon as hycfg
+from src.common.lexicon import compile_lexicon_file, load_compiled_lexicon
+
+
+def _lexicon_pairs():
+    pairs = {}
+    for cfg in (rbcfg, hycfg):
+        pairs[cfg.DEPT_LEXICON_COMPILED_PATH] = cfg.DEPT_LEXICON_PATH
+        pairs[cfg.SEN_LEXICON_COMPILED_PATH] = cfg.SEN_LEXICON_PATH
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile lexicon JSONs into binary artifacts.")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the artifact is up to date")
+    args = parser.parse_args()
+
+    for artifact_path, json_path in _lexicon_pairs().items():
+        start = time.perf_counter()
+        if args.force:
+            lexicon = compile_lexicon_file(json_path, artifact_path)
+        else:
+            lexicon = load_compiled_lexicon(json_path, artifact_path)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(
+            f"{json_path.name} -> {artifact_path} "
+            f"({len(lexicon.labels)} labels, {len(lexicon.terms)} terms, {elapsed_ms:.1f} ms)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -9,50 +9,60 @@ if str(BASE_DIR) not in sys.path:
 from config import rule_based as rbcfg
 from config import hybrid_lexicon as hycfg
 
-from src.common.io import load_lexicon
+from src.common.lexicon import load_compiled_lexicon
+from src.common.lookup import build_lookup
+from src.common.tfidf import load_tfidf_classifier
 from src.common.text import build_job_text, normalize_text
-from src.algorithms.rule_based.engine import predict_department_rule as rb_dept_rule
-from src.algorithms.rule_based.engine import predict_seniority_rule as rb_sen_rule
+from src.algorithms.rule_based.engine import DepartmentRuleScorer, SeniorityRuleScorer
 from src.algorithms.rule_based.inference import dept_confidence_from_debug, sen_confidence_from_debug
 from src.algorithms.hybrid_lexicon.engine import (
     predict_department_rule as hy_dept_rule,
     predict_seniority_rule as hy_sen_rule,
     predict_hybrid_smart,
 )
-from setfit import SetFitModel
+from src.algorithms.hybrid_lexicon.models import format_neighbours, load_ml_models
 
 
 def _load_rule_context():
     return {
-        "dept_lexicon": load_lexicon(rbcfg.DEPT_LEXICON_PATH),
-        "sen_lexicon": load_lexicon(rbcfg.SEN_LEXICON_PATH),
+        "dept_scorer": DepartmentRuleScorer(
+            load_compiled_lexicon(rbcfg.DEPT_LEXICON_PATH, rbcfg.DEPT_LEXICON_COMPILED_PATH),
+            bigram_weight=rbcfg.DEPT_BIGRAM_WEIGHT,
+            unigram_weight=rbcfg.DEPT_UNIGRAM_WEIGHT,
+            min_score=rbcfg.DEPT_MIN_SCORE,
+            default_label=rbcfg.DEPT_DEFAULT_LABEL,
+        ),
+        "sen_scorer": SeniorityRuleScorer(
+            load_compiled_lexicon(rbcfg.SEN_LEXICON_PATH, rbcfg.SEN_LEXICON_COMPILED_PATH),
+            default_label=rbcfg.SEN_DEFAULT_LABEL,
+        ),
     }
 
 
 def _load_hybrid_context():
+    dept_model, sen_model, dept_ml_threshold, sen_ml_threshold = load_ml_models()
     return {
-        "dept_lexicon": load_lexicon(hycfg.DEPT_LEXICON_PATH),
-        "sen_lexicon": load_lexicon(hycfg.SEN_LEXICON_PATH),
-        "dept_model": SetFitModel.from_pretrained(str(hycfg.CHECKPOINTS_DIR / "department_model")),
-        "sen_model": SetFitModel.from_pretrained(str(hycfg.CHECKPOINTS_DIR / "seniority_model")),
+        "dept_lexicon": load_compiled_lexicon(hycfg.DEPT_LEXICON_PATH, hycfg.DEPT_LEXICON_COMPILED_PATH),
+        "sen_lexicon": load_compiled_lexicon(hycfg.SEN_LEXICON_PATH, hycfg.SEN_LEXICON_COMPILED_PATH),
+        "dept_lookup": build_lookup(hycfg.DEPT_LOOKUP_PATH) if hycfg.EXACT_LOOKUP else None,
+        "sen_lookup": build_lookup(hycfg.SEN_LOOKUP_PATH) if hycfg.EXACT_LOOKUP else None,
+        "dept_tfidf": load_tfidf_classifier(
+            hycfg.DEPT_LOOKUP_PATH, hycfg.DEPT_TFIDF_PATH, "Department", hycfg.TFIDF_TARGET_PRECISION
+        ) if hycfg.TFIDF_TIER else None,
+        "sen_tfidf": load_tfidf_classifier(
+            hycfg.SEN_LOOKUP_PATH, hycfg.SEN_TFIDF_PATH, "Seniority", hycfg.TFIDF_TARGET_PRECISION
+        ) if hycfg.TFIDF_TIER else None,
+        "dept_model": dept_model,
+        "sen_model": sen_model,
+        "dept_ml_threshold": dept_ml_threshold,
+        "sen_ml_threshold": sen_ml_threshold,
     }
 
 
 def run_rule_based_single(job, ctx):
     text = build_job_text(job)
-    dept_pred, dept_dbg = rb_dept_rule(
-        text,
-        ctx["dept_lexicon"],
-        bigram_weight=rbcfg.DEPT_BIGRAM_WEIGHT,
-        unigram_weight=rbcfg.DEPT_UNIGRAM_WEIGHT,
-        min_score=rbcfg.DEPT_MIN_SCORE,
-        default_label=rbcfg.DEPT_DEFAULT_LABEL,
-    )
-    sen_pred, sen_dbg = rb_sen_rule(
-        text,
-        ctx["sen_lexicon"],
-        default_label=rbcfg.SEN_DEFAULT_LABEL,
-    )
+    dept_pred, dept_dbg = ctx["dept_scorer"].explain(text)
+    sen_pred, sen_dbg = ctx["sen_scorer"].explain(text)
 
     return {
         "department": dept_pred,
@@ -75,10 +85,12 @@ def run_hybrid_single(job, ctx):
         }
 
     dept_pred, dept_conf, dept_src = predict_hybrid_smart(
-        text, hy_dept_rule, ctx["dept_lexicon"], ctx["dept_model"], hycfg.DEPT_ML_THRESHOLD, "Other"
+        text, hy_dept_rule, ctx["dept_lexicon"], ctx["dept_model"], ctx["dept_ml_threshold"], "Other",
+        normalized=True, lookup=ctx["dept_lookup"], tfidf=ctx["dept_tfidf"],
     )
     sen_pred, sen_conf, sen_src = predict_hybrid_smart(
-        text, hy_sen_rule, ctx["sen_lexicon"], ctx["sen_model"], hycfg.SEN_ML_THRESHOLD, "Senior"
+        text, hy_sen_rule, ctx["sen_lexicon"], ctx["sen_model"], ctx["sen_ml_threshold"], "Senior",
+        normalized=True, lookup=ctx["sen_lookup"], tfidf=ctx["sen_tfidf"],
     )
 
     return {
@@ -87,6 +99,8 @@ def run_hybrid_single(job, ctx):
         "seniority": sen_pred,
         "seniority_conf": sen_conf,
         "source": f"{dept_src}/{sen_src}",
+        "department_neighbours": format_neighbours(ctx["dept_model"], text) if dept_src in ("ML", "Fallback") else "",
+        "seniority_neighbours": format_neighbours(ctx["sen_model"], text) if sen_src in ("ML", "Fallback") else "",
     }
 
 
@@ -95,6 +109,9 @@ def print_result(title, res):
     print(f"Department: {res['department']}")
     print(f"Seniority:  {res['seniority']}")
     print(f"Source:     {res['source']}")
+    for key, name in (("department_neighbours", "Dept neighbours"), ("seniority_neighbours", "Sen neighbours")):
+        if res.get(key):
+            print(f"{name}: {res[key]}")
     if isinstance(res.get("department_conf"), dict):
         conf = res["department_conf"].get("dept_confidence")
         if conf is not None:
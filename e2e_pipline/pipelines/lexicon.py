@@ -0,0 +1,107 @@
+from pathlib import Path
+import sys
+import time
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import argparse
+import json
+
+import pandas as pd
+
+from config import rule_based as rbcfg
+from config import hybrid_lexicon as hycfg
+from src.common.lexicon import compile_lexicon_file
+from src.common.lexicon_builder import DEPARTMENT_SPEC, SENIORITY_SPEC, build_lexicon, update_lexicon, write_lexicon
+
+TASKS = {
+    "department": (rbcfg.DEPT_LEXICON_SOURCE_PATH, DEPARTMENT_SPEC, rbcfg.DEPT_LEXICON_PATH, rbcfg.DEPT_LEXICON_STATS_PATH),
+    "seniority": (rbcfg.SEN_LEXICON_SOURCE_PATH, SENIORITY_SPEC, rbcfg.SEN_LEXICON_PATH, rbcfg.SEN_LEXICON_STATS_PATH),
+}
+
+
+def _artifacts_for(json_path):
+    """Compiled artifacts of every config that reads `json_path`."""
+    paths = []
+    for cfg in (rbcfg, hycfg):
+        for src, artifact in ((cfg.DEPT_LEXICON_PATH, cfg.DEPT_LEXICON_COMPILED_PATH),
+                              (cfg.SEN_LEXICON_PATH, cfg.SEN_LEXICON_COMPILED_PATH)):
+            if src == json_path and artifact not in paths:
+                paths.append(artifact)
+    return paths
+
+
+def _print_diff(old, new):
+    for label in dict.fromkeys([*old, *new]):
+        before, after = set(old.get(label, [])), set(new.get(label, []))
+        added, removed = sorted(after - before), sorted(before - after)
+        if added or removed:
+            print(f"  {label}: +{len(added)} {added[:5]} -{len(removed)} {removed[:5]}")
+
+
+def _load_rows(csv_path):
+    df = pd.read_csv(csv_path)
+    return df["text"].astype(str).tolist(), df["label"].astype(str).tolist()
+
+
+def _save(lexicon, json_path, args):
+    if json_path.exists():
+        _print_diff(json.loads(json_path.read_text(encoding="utf-8")), lexicon)
+    if args.dry_run:
+        return
+    if args.out_dir is not None:
+        out_path = args.out_dir / json_path.name
+        write_lexicon(lexicon, out_path)
+        print(f"  Saved: {out_path}")
+        return
+    write_lexicon(lexicon, json_path)
+    for artifact in _artifacts_for(json_path):
+        compile_lexicon_file(json_path, artifact)
+    print(f"  Saved: {json_path} (+ compiled {', '.join(str(a) for a in _artifacts_for(json_path))})")
+
+
+def _summary(task, n_rows, lexicon):
+    return f"{task}: {n_rows} titles -> {len(lexicon)} labels, {sum(len(v) for v in lexicon.values())} terms"
+
+
+def build(args):
+    for task in (TASKS if args.task == "all" else [args.task]):
+        csv_path, spec, json_path, _ = TASKS[task]
+        start = time.perf_counter()
+        texts, labels = _load_rows(csv_path)
+        lexicon = build_lexicon(texts, labels, spec)
+        print(f"{_summary(task, len(texts), lexicon)} ({time.perf_counter() - start:.2f}s)")
+        _save(lexicon, json_path, args)
+
+
+def update(args):
+    for task in (TASKS if args.task == "all" else [args.task]):
+        csv_path, spec, json_path, stats_path = TASKS[task]
+        start = time.perf_counter()
+        texts, labels = _load_rows(csv_path)
+        lexicon, folded, rebuilt = update_lexicon(texts, labels, spec, stats_path)
+        how = f"folded all {folded} (new store)" if rebuilt else f"folded {folded} new"
+        print(f"{_summary(task, len(texts), lexicon)}, {how} ({time.perf_counter() - start:.2f}s)")
+        _save(lexicon, json_path, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lexicon maintenance.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="Rebuild data/*_lexicon.json from the labeled CSVs and compile them")
+    p_build.set_defaults(func=build)
+    p_update = sub.add_parser(
+        "update", help="Fold titles appended to the labeled CSVs into the stored term counts and re-rank"
+    )
+    p_update.set_defaults(func=update)
+    for p in (p_build, p_update):
+        p.add_argument("--task", choices=[*TASKS, "all"], default="all")
+        p.add_argument("--out-dir", type=Path, default=None, help="Write the JSON here instead of data/ (no artifact)")
+        p.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
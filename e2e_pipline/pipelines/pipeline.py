@@ -5,16 +5,27 @@ BASE_DIR = Path(__file__).resolve().parents[1]
 if str(BASE_DIR) not in sys.path:
     sys.path.insert(0, str(BASE_DIR))
 
+import argparse
 from src.algorithms.registry import INFERENCE_REGISTRY, VALIDATION_REGISTRY
+from src.common.profiling import add_profile_args, run_profiled
+
+def run_all(profile_args=None):
+    # With --profile each algorithm run gets its own profile files.
+    def run(kind, name, func):
+        if profile_args is None:
+            func()
+        else:
+            run_profiled(f"{kind}_{name}", func, profile_args)
 
-def run_all():
     for name in INFERENCE_REGISTRY:
         print(f"\n>>> Running inference: {name}")
-        INFERENCE_REGISTRY[name]()
+        run("inference", name, INFERENCE_REGISTRY[name])
 
     for name in VALIDATION_REGISTRY:
         print(f"\n>>> Running validation: {name}")
-        VALIDATION_REGISTRY[name]()
+        run("validation", name, VALIDATION_REGISTRY[name])
 
 if __name__ == "__main__":
-    run_all()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    add_profile_args(parser)
+    run_all(parser.parse_args())
\ No newline at end of file
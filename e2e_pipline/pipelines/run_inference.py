@@ -7,14 +7,16 @@ if str(BASE_DIR) not in sys.path:
 
 import argparse
 from src.algorithms.registry import INFERENCE_REGISTRY
+from src.common.profiling import add_profile_args, run_profiled
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--algo", choices=INFERENCE_REGISTRY.keys(), required=True)
+    add_profile_args(parser)
     args = parser.parse_args()
 
-    INFERENCE_REGISTRY[args.algo]()
+    run_profiled(f"inference_{args.algo}", INFERENCE_REGISTRY[args.algo], args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,15 +7,17 @@ if str(BASE_DIR) not in sys.path:
 
 import argparse
 from src.algorithms.registry import VALIDATION_REGISTRY
+from src.common.profiling import add_profile_args, run_profiled
 
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--algo", choices=VALIDATION_REGISTRY.keys(), required=True)
+    add_profile_args(parser)
     args = parser.parse_args()
 
-    VALIDATION_REGISTRY[args.algo]()
+    run_profiled(f"validation_{args.algo}", VALIDATION_REGISTRY[args.algo], args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,277 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import argparse
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import hybrid_lexicon as hycfg
+from config import rule_based as rbcfg
+from config import serving as cfg
+from src.common.prometheus import Registry, metrics_response
+from src.common.text import normalize_cache_info, normalize_text
+from src.algorithms.hybrid_lexicon.engine import (
+    predict_department_rule as hy_dept_rule,
+    predict_seniority_rule as hy_sen_rule,
+    predict_hybrid_batch,
+)
+from src.algorithms.hybrid_lexicon.models import load_token_cache
+from src.algorithms.rule_based.inference import sen_confidence_from_hits
+from pipelines.interactive import _load_hybrid_context, _load_rule_context, run_rule_based_single
+
+
+class _Pending:
+    __slots__ = ("jobs", "enqueued", "done", "results", "error")
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class ClassifierService:
+    """One algorithm's interactive context behind a micro-batcher.
+
+    HTTP handler threads enqueue their jobs and wait; a single worker drains the queue into
+    batches of up to `max_batch` titles (waiting at most `max_wait_ms` for more after the first
+    request) and classifies each batch in one call, so the SetFit encoder sees batches instead of
+    single titles. Everything the worker does is recorded in `registry`."""
+
+    def __init__(self, algo: str, registry: Registry, max_batch: int = cfg.MAX_BATCH_TITLES, max_wait_ms: float = cfg.MAX_WAIT_MS):
+        self.algo = algo
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue: "queue.Queue[_Pending]" = queue.Queue()
+        self.token_cache = None
+        self._define_metrics(registry)
+
+        start = time.perf_counter()
+        if algo == "hybrid_lexicon":
+            self.ctx = _load_hybrid_context()
+            self.token_cache = load_token_cache(self.ctx["dept_model"], self.ctx["sen_model"])
+        else:
+            self.ctx = _load_rule_context()
+        self.model_load.set(time.perf_counter() - start, algo=algo)
+
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def _define_metrics(self, registry: Registry) -> None:
+        self.requests = registry.counter("requests_total", "Classification requests by outcome.", ("algo", "status"))
+        self.request_latency = registry.histogram("request_latency_seconds", "End-to-end request latency.", ("algo",))
+        self.stage_latency = registry.histogram(
+            "stage_latency_seconds", "Latency per micro-batch, by task and stage.", ("algo", "task", "stage")
+        )
+        self.predictions = registry.counter(
+            "predictions_total", "Predictions by task and source (Exact/Rule/TF-IDF/ML/Fallback/Empty).", ("algo", "task", "source")
+        )
+        self.batch_size = registry.gauge("micro_batch_size", "Titles in the micro-batch being classified.", ("algo",))
+        self.batches = registry.counter("micro_batches_total", "Micro-batches classified.", ("algo",))
+        self.queue_depth = registry.gauge("ml_queue_depth", "Requests waiting for the micro-batcher.", ("algo",))
+        self.model_load = registry.gauge("model_load_seconds", "Time to load the algorithm's context at startup.", ("algo",))
+        self.cache_hit_ratio = registry.gauge("cache_hit_ratio", "Cumulative hit ratio per cache.", ("cache",))
+        registry.collectors.append(self._collect)
+
+    def _collect(self) -> None:
+        self.queue_depth.set(self.queue.qsize(), algo=self.algo)
+        info = normalize_cache_info()
+        total = info.hits + info.misses
+        self.cache_hit_ratio.set(info.hits / total if total else 0.0, cache="normalize_text")
+        if self.token_cache is not None:
+            stats = self.token_cache.stats()
+            total = stats["hits"] + stats["misses"]
+            self.cache_hit_ratio.set(stats["hits"] / total if total else 0.0, cache="token_cache")
+
+    def classify(self, jobs):
+        pending = _Pending(jobs)
+        self.queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.results
+
+    def _next_batch(self):
+        batch = [self.queue.get()]
+        n = len(batch[0].jobs)
+        deadline = time.perf_counter() + self.max_wait
+        while n < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                pending = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(pending)
+            n += len(pending.jobs)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            now = time.perf_counter()
+            for pending in batch:
+                self.stage_latency.observe(now - pending.enqueued, algo=self.algo, task="request", stage="queue_wait")
+            jobs = [job for pending in batch for job in pending.jobs]
+            self.batch_size.set(len(jobs), algo=self.algo)
+            self.batches.inc(algo=self.algo)
+            try:
+                results = self._classify(jobs)
+            except Exception as exc:
+                for pending in batch:
+                    pending.error = exc
+                    pending.done.set()
+                continue
+            finally:
+                self.batch_size.set(0, algo=self.algo)
+            lo = 0
+            for pending in batch:
+                pending.results = results[lo:lo + len(pending.jobs)]
+                lo += len(pending.jobs)
+                pending.done.set()
+
+    def _classify(self, jobs):
+        if self.algo == "hybrid_lexicon":
+            return self._classify_hybrid(jobs)
+        return self._classify_rule_based(jobs)
+
+    def _classify_rule_based(self, jobs):
+        start = time.perf_counter()
+        results = []
+        for job in jobs:
+            res = run_rule_based_single(job, self.ctx)
+            # explain() returns the default label below min_score / without seniority hits.
+            dept_conf = res["department_conf"]
+            dept_src = "Rule" if dept_conf.get("dept_best_score", 0.0) >= rbcfg.DEPT_MIN_SCORE else "Fallback"
+            sen_src = "Rule" if res["seniority_conf"] == sen_confidence_from_hits(True) else "Fallback"
+            res["source"] = f"{dept_src}/{sen_src}"
+            for task, source in (("department", dept_src), ("seniority", sen_src)):
+                self.predictions.inc(algo=self.algo, task=task, source=source)
+            results.append(res)
+        self.stage_latency.observe(time.perf_counter() - start, algo=self.algo, task="all", stage="rules")
+        return results
+
+    def _classify_hybrid(self, jobs):
+        ctx = self.ctx
+        texts = [normalize_text(str(job.get("position") or "")) for job in jobs]
+        scored = [i for i, t in enumerate(texts) if t]
+        results = [{
+            "department": "Unknown", "department_conf": 0.0,
+            "seniority": "Unknown", "seniority_conf": 0.0, "source": "Empty/Empty",
+        } for _ in jobs]
+        for task in ("department", "seniority"):
+            self.predictions.inc(len(jobs) - len(scored), algo=self.algo, task=task, source="Empty")
+
+        tasks = (
+            ("department", hy_dept_rule, ctx["dept_lexicon"], ctx["dept_model"], ctx["dept_ml_threshold"], "Other",
+             ctx["dept_lookup"], ctx["dept_tfidf"]),
+            ("seniority", hy_sen_rule, ctx["sen_lexicon"], ctx["sen_model"], ctx["sen_ml_threshold"], "Senior",
+             ctx["sen_lookup"], ctx["sen_tfidf"]),
+        )
+        per_task = {}
+        for task, rule_func, lexicon, model, threshold, fallback, lookup, tfidf in tasks:
+            stats = {}
+            start = time.perf_counter()
+            per_task[task] = predict_hybrid_batch(
+                [texts[i] for i in scored], rule_func, lexicon, model, threshold, fallback,
+                normalized=True, lookup=lookup, tfidf=tfidf,
+                batch_size=hycfg.ML_BATCH_SIZE, max_length=hycfg.ML_MAX_SEQ_LENGTH,
+                stats=stats, token_cache=self.token_cache, stage=task,
+            )
+            ml_seconds = stats.get("seconds", 0.0)
+            self.stage_latency.observe(time.perf_counter() - start - ml_seconds, algo=self.algo, task=task, stage="pre_ml")
+            if stats.get("titles"):
+                self.stage_latency.observe(ml_seconds, algo=self.algo, task=task, stage="ml")
+            for _, _, source in per_task[task]:
+                self.predictions.inc(algo=self.algo, task=task, source=source)
+
+        for k, i in enumerate(scored):
+            dept_pred, dept_conf, dept_src = per_task["department"][k]
+            sen_pred, sen_conf, sen_src = per_task["seniority"][k]
+            results[i] = {
+                "department": dept_pred, "department_conf": float(dept_conf),
+                "seniority": sen_pred, "seniority_conf": float(sen_conf),
+                "source": f"{dept_src}/{sen_src}",
+            }
+        return results
+
+
+def make_handler(service: ClassifierService, registry: Registry):
+    class Handler(BaseHTTPRequestHandler):
+        def _json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False, default=float).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                metrics_response(self, registry)
+            elif self.path == "/healthz":
+                self._json(200, {"status": "ok", "algo": service.algo})
+            else:
+                self._json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/classify":
+                self._json(404, {"error": "not found"})
+                return
+            start = time.perf_counter()
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                jobs = payload["jobs"] if isinstance(payload, dict) and "jobs" in payload else [payload]
+                if not isinstance(jobs, list) or not all(isinstance(job, dict) for job in jobs):
+                    raise ValueError("expected a job object or {\"jobs\": [...]} of job objects")
+            except (ValueError, KeyError, TypeError) as exc:
+                service.requests.inc(algo=service.algo, status="bad_request")
+                self._json(400, {"error": str(exc)})
+                return
+            try:
+                results = service.classify(jobs)
+            except Exception as exc:
+                service.requests.inc(algo=service.algo, status="error")
+                self._json(500, {"error": str(exc)})
+                return
+            service.requests.inc(algo=service.algo, status="ok")
+            service.request_latency.observe(time.perf_counter() - start, algo=service.algo)
+            self._json(200, {"results": results})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running classification service with Prometheus metrics.")
+    parser.add_argument("--algo", choices=["rule_based", "hybrid_lexicon"], default="hybrid_lexicon")
+    parser.add_argument("--host", default=cfg.HOST)
+    parser.add_argument("--port", type=int, default=cfg.PORT)
+    parser.add_argument("--max-batch", type=int, default=cfg.MAX_BATCH_TITLES, help="Titles per micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=cfg.MAX_WAIT_MS, help="How long a micro-batch waits to fill")
+    args = parser.parse_args()
+
+    registry = Registry(cfg.METRICS_NAMESPACE)
+    service = ClassifierService(args.algo, registry, args.max_batch, args.max_wait_ms)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service, registry))
+    print(f"Serving {args.algo} on http://{args.host}:{args.port} (POST /classify, GET /metrics, GET /healthz)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import argparse
+
+import numpy as np
+
+from config import hybrid_lexicon as cfg
+from src.algorithms.hybrid_lexicon.validation import run_threshold_sweep
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep the hybrid ML thresholds over one cached predict_proba pass.")
+    parser.add_argument("--min", type=float, default=None, help="Grid start (default: config ML_SWEEP_THRESHOLDS)")
+    parser.add_argument("--max", type=float, default=0.999)
+    parser.add_argument("--step", type=float, default=0.005)
+    parser.add_argument("--target-precision", type=float, default=cfg.ML_SWEEP_TARGET_PRECISION)
+    args = parser.parse_args()
+
+    thresholds = cfg.ML_SWEEP_THRESHOLDS
+    if args.min is not None:
+        thresholds = tuple(np.round(np.arange(args.min, args.max + 1e-9, args.step), 6))
+    run_threshold_sweep(thresholds=thresholds, target_precision=args.target_precision)
+
+if __name__ == "__main__":
+    main()
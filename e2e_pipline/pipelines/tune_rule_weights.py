@@ -0,0 +1,15 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from src.algorithms.rule_based.tuning import run_tuning
+
+
+def main():
+    run_tuning()
+
+if __name__ == "__main__":
+    main()
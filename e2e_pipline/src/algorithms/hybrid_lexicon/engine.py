@@ -1,94 +1,132 @@
-import re
-from typing import Dict, List, Tuple
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 
-from ...common.text import normalize_text
+from ...common.instrumentation import METRICS, Metrics
+from ...common.lexicon import CompiledLexicon
+from ...common.tfidf import TfidfClassifier
+from ...common.text import normalize_cache_info, normalize_text
+from .tokens import TokenCache, predict_proba_tokens
 
 SENIORITY_HIERARCHY = ["C-Level", "Director", "Management", "Lead", "Senior", "Junior", "Intern"]
+_SENIORITY_RANK = {label: i for i, label in enumerate(SENIORITY_HIERARCHY)}
+
+def _require_compiled(lexicon) -> CompiledLexicon:
+    # Compiling here would rebuild the automaton and prefilter for every title.
+    if not isinstance(lexicon, CompiledLexicon):
+        raise TypeError(
+            f"expected a CompiledLexicon, got {type(lexicon).__name__}; "
+            "load it once with load_compiled_lexicon() or compile_lexicon()"
+        )
+    return lexicon
 
 def predict_department_rule(
     text: str,
-    lexicon: Dict[str, List[str]],
+    lexicon: CompiledLexicon,
     bigram_weight: float = 3.0,
     unigram_weight: float = 1.0,
     min_score: float = 2.0,
-    default_label: str = None
+    default_label: str = None,
+    normalized: bool = False,
 ) -> Tuple[str, float]:
-    t = normalize_text(text)
-    scores: Dict[str, float] = {}
-
-    for label, terms in lexicon.items():
-        score = 0.0
-        for term in terms:
-            term_n = term.strip().lower()
-            if not term_n:
-                continue
-
-            if " " in term_n:
-                if term_n in t:
-                    score += bigram_weight
-            else:
-                if re.search(rf"(?<!\w){re.escape(term_n)}(?!\w)", t):
-                    score += unigram_weight
-
-        if score > 0:
-            scores[label] = score
-
-    if not scores:
+    t = text if normalized else normalize_text(text)
+    lex = _require_compiled(lexicon)
+    if not lex.prefilter().may_match(t):
         return default_label, 0.0
+    multi, single = lex.new_counts(), lex.new_counts()
+    lex.count_hits(t, multi, single)
+
+    best_id, best_score = -1, 0.0
+    for j in range(len(multi)):
+        score = bigram_weight * multi[j] + unigram_weight * single[j]
+        if score > best_score:
+            best_id, best_score = j, score
 
-    best_label = max(scores, key=scores.get)
-    best_score = scores[best_label]
+    if best_id < 0:
+        return default_label, 0.0
 
     if best_score < min_score:
         return default_label, best_score
 
-    return best_label, best_score
+    return lex.labels.names[best_id], best_score
 
 def predict_seniority_rule(
     text: str,
-    lexicon: Dict[str, List[str]],
-    default_label: str = None
+    lexicon: CompiledLexicon,
+    default_label: str = None,
+    normalized: bool = False,
 ) -> Tuple[str, float]:
-    t = normalize_text(text)
-
-    scores = {label: 0 for label in SENIORITY_HIERARCHY}
-
-    for label in SENIORITY_HIERARCHY:
-        terms = lexicon.get(label, [])
-        for term in terms:
-            pattern = rf"\b{re.escape(term.lower())}\b"
-            if re.search(pattern, t):
-                scores[label] += 1
-
-    if any(scores.values()):
-        best_label = max(
-            scores.items(),
-            key=lambda kv: (kv[1], SENIORITY_HIERARCHY.index(kv[0])),
-        )[0]
-        return best_label, 10.0
-
-    for label, terms in lexicon.items():
-        if label in SENIORITY_HIERARCHY:
-            continue
-        for term in terms:
-            if re.search(rf"\b{re.escape(term.lower())}\b", t):
-                return label, 5.0
+    t = text if normalized else normalize_text(text)
+    lex = _require_compiled(lexicon)
+    if not lex.prefilter(boundary=True).may_match(t):
+        return default_label, 0.0
+    counts = lex.new_counts()
+    lex.count_hits(t, counts, counts, boundary=True)
+    names = lex.labels.names
+
+    # Highest count wins; ties go to the later hierarchy entry.
+    best_rank, best_count = -1, 0
+    for j, c in enumerate(counts):
+        rank = _SENIORITY_RANK.get(names[j], -1)
+        if c and rank >= 0 and (c > best_count or (c == best_count and rank > best_rank)):
+            best_rank, best_count = rank, c
+    if best_rank >= 0:
+        return SENIORITY_HIERARCHY[best_rank], 10.0
+
+    for j, c in enumerate(counts):
+        if c and names[j] not in _SENIORITY_RANK:
+            return names[j], 5.0
 
     return default_label, 0.0
 
-def predict_hybrid_smart(text, rule_func, lexicon, model, ml_threshold, fallback_label):
-    rule_pred, _ = rule_func(text, lexicon, default_label=None)
-    if rule_pred:
-        return rule_pred, 1.0, "Rule (Lexicon)"
+def format_prefilter_stats(lexicon: CompiledLexicon, boundary: bool = False) -> str:
+    stats = lexicon.prefilter(boundary).stats()
+    total = stats["passed"] + stats["rejected"]
+    rate = stats["rejected"] / total if total else 0.0
+    return f"{stats['rejected']}/{total} titles skipped the lexicon scan ({rate:.2%})"
 
-    probs = model.predict_proba([text])[0]
+def _to_numpy(probs) -> np.ndarray:
     if hasattr(probs, "cpu"):
         probs = probs.cpu().detach().numpy()
     elif hasattr(probs, "numpy"):
         probs = probs.numpy()
+    return np.asarray(probs)
+
+def resolve_before_ml(
+    text,
+    rule_func,
+    lexicon,
+    normalized=False,
+    lookup: Optional[Dict[str, str]] = None,
+    tfidf: Optional[TfidfClassifier] = None,
+) -> Optional[Tuple[str, float, str]]:
+    """Exact -> lexicon rules -> TF-IDF. None when the title has to go to the ML stage."""
+    if lookup is not None:
+        exact_pred = lookup.get(text if normalized else normalize_text(text))
+        if exact_pred is not None:
+            return exact_pred, 1.0, "Exact"
+
+    rule_pred, _ = rule_func(text, lexicon, default_label=None, normalized=normalized)
+    if rule_pred:
+        return rule_pred, 1.0, "Rule (Lexicon)"
+
+    if tfidf is not None:
+        tfidf_pred, tfidf_conf = tfidf.predict_one(text if normalized else normalize_text(text))
+        if tfidf_conf >= tfidf.threshold:
+            return tfidf_pred, tfidf_conf, "TF-IDF"
+
+    return None
 
+def _resolve_timed(stage: str, text, *args, **kwargs) -> Optional[Tuple[str, float, str]]:
+    # resolve_before_ml with its latency filed under the tier that answered ("ML" = none did).
+    start = time.perf_counter()
+    resolved = resolve_before_ml(text, *args, **kwargs)
+    tier = resolved[2] if resolved is not None else "ML"
+    METRICS.observe(f"{stage}.pre_ml[{tier}]", time.perf_counter() - start)
+    return resolved
+
+def ml_decision(probs, model, ml_threshold, fallback_label) -> Tuple[str, float, str]:
     max_conf = float(np.max(probs))
     pred_idx = int(np.argmax(probs))
 
@@ -101,3 +139,159 @@ def predict_hybrid_smart(text, rule_func, lexicon, model, ml_threshold, fallback
         return ml_pred, max_conf, "ML"
 
     return fallback_label, max_conf, "Fallback"
+
+def predict_hybrid_smart(
+    text,
+    rule_func,
+    lexicon,
+    model,
+    ml_threshold,
+    fallback_label,
+    normalized=False,
+    lookup: Optional[Dict[str, str]] = None,
+    tfidf: Optional[TfidfClassifier] = None,
+    stage: str = "hybrid",
+):
+    if not METRICS.enabled:
+        resolved = resolve_before_ml(text, rule_func, lexicon, normalized=normalized, lookup=lookup, tfidf=tfidf)
+        if resolved is not None:
+            return resolved
+        return ml_decision(_to_numpy(model.predict_proba([text]))[0], model, ml_threshold, fallback_label)
+
+    resolved = _resolve_timed(stage, text, rule_func, lexicon, normalized=normalized, lookup=lookup, tfidf=tfidf)
+    if resolved is None:
+        with METRICS.timer(f"{stage}.ml"):
+            probs = _to_numpy(model.predict_proba([text]))[0]
+        resolved = ml_decision(probs, model, ml_threshold, fallback_label)
+    METRICS.count(f"{stage}.source.{resolved[2]}")
+    return resolved
+
+def token_lengths(model, texts: Sequence[str], max_length: int) -> np.ndarray:
+    """Tokenized length per text (special tokens included, capped at `max_length`) from the
+    encoder's tokenizer; word count + 2 when the model exposes none."""
+    body = getattr(model, "model_body", None) or getattr(model, "encoder", None)
+    tokenizer = getattr(body, "tokenizer", None)
+    if tokenizer is None:
+        return np.array([min(len(t.split()) + 2, max_length) for t in texts], dtype=np.int64)
+    ids = tokenizer(list(texts), truncation=True, max_length=max_length)["input_ids"]
+    return np.fromiter((len(x) for x in ids), dtype=np.int64, count=len(ids))
+
+def predict_proba_bucketed(
+    model,
+    texts: Sequence[str],
+    batch_size: int,
+    max_length: int,
+    bucketed: bool = True,
+    stats: Optional[Dict[str, float]] = None,
+    token_cache: Optional[TokenCache] = None,
+) -> np.ndarray:
+    """predict_proba in batches of titles with similar tokenized length, so each batch pads to
+    its own longest title rather than to the longest of a random mix. Rows come back in input
+    order. `stats`, when given, accumulates titles / tokens / padded_tokens / seconds.
+
+    With a `token_cache` the titles are tokenized once, up front, and the batches run through
+    the body on the cached ids instead of re-tokenizing inside predict_proba."""
+    texts = list(texts)
+    start = time.perf_counter()
+    if token_cache is not None:
+        lengths = token_cache.tokenize(texts)
+    else:
+        lengths = token_lengths(model, texts, max_length)
+    order = np.argsort(lengths, kind="stable") if bucketed else np.arange(len(texts))
+
+    chunks, padded = [], 0
+    for lo in range(0, len(order), batch_size):
+        idx = order[lo:lo + batch_size]
+        batch = [texts[i] for i in idx]
+        if token_cache is not None:
+            chunks.append(_to_numpy(predict_proba_tokens(model, token_cache.features(batch))))
+        else:
+            chunks.append(_to_numpy(model.predict_proba(batch)))
+        padded += len(idx) * int(lengths[idx].max())
+    probs = np.empty((len(texts), chunks[0].shape[1]) if chunks else (0, 0), dtype=np.float64)
+    if chunks:
+        probs[order] = np.concatenate(chunks)
+
+    if stats is not None:
+        stats["titles"] = stats.get("titles", 0) + len(texts)
+        stats["tokens"] = stats.get("tokens", 0) + int(lengths.sum())
+        stats["padded_tokens"] = stats.get("padded_tokens", 0) + padded
+        stats["seconds"] = stats.get("seconds", 0.0) + time.perf_counter() - start
+    return probs
+
+def predict_hybrid_batch(
+    texts: Sequence[str],
+    rule_func,
+    lexicon,
+    model,
+    ml_threshold,
+    fallback_label,
+    normalized=False,
+    lookup: Optional[Dict[str, str]] = None,
+    tfidf: Optional[TfidfClassifier] = None,
+    batch_size: int = 32,
+    max_length: int = 48,
+    stats: Optional[Dict[str, float]] = None,
+    token_cache: Optional[TokenCache] = None,
+    stage: str = "hybrid",
+) -> List[Tuple[str, float, str]]:
+    """predict_hybrid_smart over many titles: the cheap tiers run per title, then every distinct
+    title left for the ML stage is scored once through predict_proba_bucketed."""
+    if METRICS.enabled:
+        results = [
+            _resolve_timed(stage, t, rule_func, lexicon, normalized=normalized, lookup=lookup, tfidf=tfidf)
+            for t in texts
+        ]
+    else:
+        results = [
+            resolve_before_ml(t, rule_func, lexicon, normalized=normalized, lookup=lookup, tfidf=tfidf)
+            for t in texts
+        ]
+    pending = list(dict.fromkeys(t for t, r in zip(texts, results) if r is None))
+    if pending:
+        METRICS.count(f"{stage}.ml_titles", len(pending))
+        with METRICS.timer(f"{stage}.ml"):
+            probs = predict_proba_bucketed(
+                model, pending, batch_size, max_length, stats=stats, token_cache=token_cache
+            )
+        decided = {t: ml_decision(p, model, ml_threshold, fallback_label) for t, p in zip(pending, probs)}
+        results = [r if r is not None else decided[t] for t, r in zip(texts, results)]
+    METRICS.count_all(f"{stage}.source", (r[2] for r in results))
+    return results
+
+def format_ml_stats(stats: Dict[str, float]) -> str:
+    if not stats.get("titles"):
+        return "no titles reached the encoder"
+    padding = 1.0 - stats["tokens"] / stats["padded_tokens"] if stats["padded_tokens"] else 0.0
+    rate = stats["tokens"] / stats["seconds"] if stats["seconds"] > 0 else float("inf")
+    return (
+        f"{stats['titles']} titles, {stats['tokens']} tokens ({padding:.1%} padding) "
+        f"in {stats['seconds']:.2f}s ({rate:,.0f} tokens/s)"
+    )
+
+def record_hybrid_metrics(
+    metrics: Metrics,
+    dept_lexicon: CompiledLexicon,
+    sen_lexicon: CompiledLexicon,
+    dept_stats: Dict[str, float],
+    sen_stats: Dict[str, float],
+    token_cache: Optional[TokenCache] = None,
+) -> None:
+    """End-of-run counters and gauges: prefilter outcomes, ML-stage token totals and the
+    normalize_text / token cache hit rates."""
+    if not metrics.enabled:
+        return
+    for stage, lexicon, boundary, stats in (
+        ("department", dept_lexicon, False, dept_stats),
+        ("seniority", sen_lexicon, True, sen_stats),
+    ):
+        prefilter = lexicon.prefilter(boundary).stats()
+        metrics.count(f"{stage}.prefilter.passed", prefilter["passed"])
+        metrics.count(f"{stage}.prefilter.rejected", prefilter["rejected"])
+        for key, value in stats.items():
+            metrics.gauge(f"{stage}.ml_stage.{key}", value)
+    info = normalize_cache_info()
+    metrics.cache("normalize_text", info.hits, info.misses)
+    if token_cache is not None:
+        tokens = token_cache.stats()
+        metrics.cache("token_cache", tokens["hits"], tokens["misses"])
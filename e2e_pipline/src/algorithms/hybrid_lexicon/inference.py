@@ -1,30 +1,37 @@
 import os
 import pandas as pd
 from tqdm import tqdm
-from setfit import SetFitModel
 
 from config import hybrid_lexicon as cfg
-from ...common.io import load_profiles, load_lexicon, save_df
-from ...common.current_job import select_current_job
+from ...common.instrumentation import start_run
+from ...common.io import load_profiles, save_df
+from ...common.lexicon import load_compiled_lexicon
+from ...common.lookup import build_lookup
+from ...common.tfidf import load_tfidf_classifier
+from ...common.current_job import select_current_job, select_current_jobs_bulk
 from ...common.text import normalize_text
-from .engine import predict_department_rule, predict_seniority_rule, predict_hybrid_smart
+from .models import format_neighbours, load_ml_models, load_token_cache
+from .tokens import format_token_cache_stats
+from .engine import (
+    format_ml_stats,
+    format_prefilter_stats,
+    predict_department_rule,
+    predict_seniority_rule,
+    predict_hybrid_batch,
+    record_hybrid_metrics,
+)
 
-def run_inference():
-    print("=== HYBRID (Lexicon + SetFit) ===")
-
-    dept_lexicon = load_lexicon(cfg.DEPT_LEXICON_PATH)
-    sen_lexicon = load_lexicon(cfg.SEN_LEXICON_PATH)
-
-    dept_model = SetFitModel.from_pretrained(str(cfg.CHECKPOINTS_DIR / "department_model"))
-    sen_model = SetFitModel.from_pretrained(str(cfg.CHECKPOINTS_DIR / "seniority_model"))
-
-    profiles = load_profiles(cfg.NOT_ANNOTATED_JSON_PATH)
-
-    results = []
+def collect_titles(profiles, current_jobs=None):
+    """Current-job title per profile. Returns the output rows (Empty rows already filled in),
+    the row index of each title to score and the normalized titles themselves."""
+    results, scored, texts = [], [], []
     for i, p in enumerate(tqdm(profiles)):
         pid = p.get("id", i) if isinstance(p, dict) else i
-        jobs = p if isinstance(p, list) else p.get("experiences", [])
-        curr_job = select_current_job(jobs)
+        if current_jobs is not None:
+            curr_job = current_jobs[i]
+        else:
+            jobs = p if isinstance(p, list) else p.get("experiences", [])
+            curr_job = select_current_job(jobs)
 
         pos_raw = curr_job.get("position", "") if curr_job else ""
         org_raw = curr_job.get("organization", "") if curr_job else ""
@@ -41,17 +48,72 @@ def run_inference():
             })
             continue
 
-        d_pred, d_conf, d_src = predict_hybrid_smart(
-            text, predict_department_rule, dept_lexicon, dept_model, cfg.DEPT_ML_THRESHOLD, "Other"
+        scored.append(len(results))
+        results.append({"id": pid, "position": pos_raw, "organization": org_raw})
+        texts.append(text)
+    return results, scored, texts
+
+def run_inference(
+    bulk_current_job: bool = cfg.BULK_CURRENT_JOB,
+    exact_lookup: bool = cfg.EXACT_LOOKUP,
+    tfidf_tier: bool = cfg.TFIDF_TIER,
+    instrumentation: bool = cfg.INSTRUMENTATION,
+):
+    print("=== HYBRID (Lexicon + SetFit) ===")
+    metrics = start_run(instrumentation)
+
+    with metrics.timer("load_models"):
+        dept_lexicon = load_compiled_lexicon(cfg.DEPT_LEXICON_PATH, cfg.DEPT_LEXICON_COMPILED_PATH)
+        sen_lexicon = load_compiled_lexicon(cfg.SEN_LEXICON_PATH, cfg.SEN_LEXICON_COMPILED_PATH)
+        dept_lookup = build_lookup(cfg.DEPT_LOOKUP_PATH) if exact_lookup else None
+        sen_lookup = build_lookup(cfg.SEN_LOOKUP_PATH) if exact_lookup else None
+        dept_tfidf = sen_tfidf = None
+        if tfidf_tier:
+            dept_tfidf = load_tfidf_classifier(
+                cfg.DEPT_LOOKUP_PATH, cfg.DEPT_TFIDF_PATH, "Department", cfg.TFIDF_TARGET_PRECISION
+            )
+            sen_tfidf = load_tfidf_classifier(
+                cfg.SEN_LOOKUP_PATH, cfg.SEN_TFIDF_PATH, "Seniority", cfg.TFIDF_TARGET_PRECISION
+            )
+
+        dept_model, sen_model, dept_ml_threshold, sen_ml_threshold = load_ml_models()
+        token_cache = load_token_cache(dept_model, sen_model)
+
+    with metrics.timer("load_profiles"):
+        profiles = load_profiles(cfg.NOT_ANNOTATED_JSON_PATH)
+    metrics.count("profiles", len(profiles))
+
+    current_jobs = None
+    if bulk_current_job:
+        with metrics.timer("select_current_jobs_bulk"):
+            current_jobs = select_current_jobs_bulk(
+                [p if isinstance(p, list) else p.get("experiences", []) for p in profiles]
+            )
+
+    with metrics.timer("select_and_normalize"):
+        results, scored, texts = collect_titles(profiles, current_jobs)
+    metrics.count("department.source.Empty", len(results) - len(scored))
+    metrics.count("seniority.source.Empty", len(results) - len(scored))
+
+    dept_stats, sen_stats = {}, {}
+    with metrics.timer("department"):
+        dept_out = predict_hybrid_batch(
+            texts, predict_department_rule, dept_lexicon, dept_model, dept_ml_threshold, "Other",
+            normalized=True, lookup=dept_lookup, tfidf=dept_tfidf,
+            batch_size=cfg.ML_BATCH_SIZE, max_length=cfg.ML_MAX_SEQ_LENGTH, stats=dept_stats,
+            token_cache=token_cache, stage="department",
         )
-        s_pred, s_conf, s_src = predict_hybrid_smart(
-            text, predict_seniority_rule, sen_lexicon, sen_model, cfg.SEN_ML_THRESHOLD, "Senior"
+    with metrics.timer("seniority"):
+        sen_out = predict_hybrid_batch(
+            texts, predict_seniority_rule, sen_lexicon, sen_model, sen_ml_threshold, "Senior",
+            normalized=True, lookup=sen_lookup, tfidf=sen_tfidf,
+            batch_size=cfg.ML_BATCH_SIZE, max_length=cfg.ML_MAX_SEQ_LENGTH, stats=sen_stats,
+            token_cache=token_cache, stage="seniority",
         )
 
-        results.append({
-            "id": pid,
-            "position": pos_raw,
-            "organization": org_raw,
+    for j, text, (d_pred, d_conf, d_src), (s_pred, s_conf, s_src) in zip(scored, texts, dept_out, sen_out):
+        row = results[j]
+        row.update({
             "department_pred": d_pred,
             "department_conf": round(d_conf, 2),
             "department_source": d_src,
@@ -59,10 +121,25 @@ def run_inference():
             "seniority_conf": round(s_conf, 2),
             "seniority_source": s_src,
         })
+        if cfg.ML_BACKEND == "knn":
+            row["department_neighbours"] = format_neighbours(dept_model, text) if d_src in ("ML", "Fallback") else ""
+            row["seniority_neighbours"] = format_neighbours(sen_model, text) if s_src in ("ML", "Fallback") else ""
 
-    df = pd.DataFrame(results)
-    save_df(df, cfg.PREDICTIONS_PATH)
+    with metrics.timer("write_output"):
+        df = pd.DataFrame(results)
+        save_df(df, cfg.PREDICTIONS_PATH)
 
     print(f"Saved: {cfg.PREDICTIONS_PATH}")
     print(df["department_source"].value_counts())
-    print(df["seniority_source"].value_counts())
\ No newline at end of file
+    print(df["seniority_source"].value_counts())
+    print(f"Department prefilter: {format_prefilter_stats(dept_lexicon)}")
+    print(f"Seniority prefilter: {format_prefilter_stats(sen_lexicon, boundary=True)}")
+    print(f"Department ML stage: {format_ml_stats(dept_stats)}")
+    print(f"Seniority ML stage: {format_ml_stats(sen_stats)}")
+    if token_cache is not None:
+        print(f"Token cache: {format_token_cache_stats(token_cache)}")
+
+    record_hybrid_metrics(metrics, dept_lexicon, sen_lexicon, dept_stats, sen_stats, token_cache)
+    report = metrics.write_report(cfg.INFERENCE_METRICS_PATH, algorithm="hybrid_lexicon", mode="inference")
+    if report:
+        print(f"Metrics: {report}")
@@ -0,0 +1,51 @@
+from typing import Optional
+
+from config import hybrid_lexicon as cfg
+from ...common.knn import KnnClassifier, load_knn_index
+from .tokens import TokenCache
+
+def load_ml_models():
+    """ML stage models and their thresholds: the SetFit checkpoints, or kNN classifiers over
+    their bodies when cfg.ML_BACKEND == "knn". Returns (dept_model, sen_model, dept_thr, sen_thr)."""
+    # Imported lazily so the registry, and the torch-free algorithms in it, load without setfit.
+    from setfit import SetFitModel
+
+    dept_path = cfg.CHECKPOINTS_DIR / "department_model"
+    sen_path = cfg.CHECKPOINTS_DIR / "seniority_model"
+    dept_model = SetFitModel.from_pretrained(str(dept_path))
+    sen_model = SetFitModel.from_pretrained(str(sen_path))
+    for model in (dept_model, sen_model):
+        model.model_body.max_seq_length = cfg.ML_MAX_SEQ_LENGTH
+    if cfg.ML_BACKEND != "knn":
+        return dept_model, sen_model, cfg.DEPT_ML_THRESHOLD, cfg.SEN_ML_THRESHOLD
+
+    dept_index = load_knn_index(
+        cfg.DEPT_LOOKUP_PATH, cfg.DEPT_KNN_DIR, dept_model.model_body, str(dept_path), cfg.KNN_USE_HNSW
+    )
+    sen_index = load_knn_index(
+        cfg.SEN_LOOKUP_PATH, cfg.SEN_KNN_DIR, sen_model.model_body, str(sen_path), cfg.KNN_USE_HNSW
+    )
+    return (
+        KnnClassifier(dept_index, dept_model.model_body, k=cfg.KNN_K),
+        KnnClassifier(sen_index, sen_model.model_body, k=cfg.KNN_K),
+        cfg.DEPT_KNN_THRESHOLD,
+        cfg.SEN_KNN_THRESHOLD,
+    )
+
+def load_token_cache(*models) -> Optional[TokenCache]:
+    """One TokenCache shared by the SetFit models when their bodies use the same vocabulary.
+    None when disabled, for kNN wrappers (they cache embeddings per title already) or when
+    the tokenizers differ."""
+    if not cfg.TOKEN_CACHE or not all(hasattr(m, "model_head") for m in models):
+        return None
+    tokenizers = [m.model_body.tokenizer for m in models]
+    vocab = tokenizers[0].get_vocab()
+    if any(t.get_vocab() != vocab for t in tokenizers[1:]):
+        return None
+    return TokenCache(tokenizers[0], cfg.ML_MAX_SEQ_LENGTH)
+
+def format_neighbours(model, text: str, k: int = 3) -> str:
+    """Nearest labeled titles behind a kNN prediction; empty for SetFit models."""
+    if not isinstance(model, KnnClassifier):
+        return ""
+    return "; ".join(f"{n['text']} ({n['label']}, {n['similarity']:.2f})" for n in model.explain(text, k=k))
@@ -0,0 +1,60 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+TOKEN_CACHE_SIZE = 1 << 17
+
+class TokenCache:
+    """input_ids per normalized title from one tokenizer, shared by every model whose body uses
+    it (the department and seniority bodies share the multilingual MiniLM vocabulary). Titles
+    not cached yet are tokenized in one bulk call; batches are padded from the cached ids."""
+
+    def __init__(self, tokenizer, max_length: int, max_size: int = TOKEN_CACHE_SIZE):
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._ids: Dict[str, List[int]] = {}
+
+    def tokenize(self, texts: Sequence[str]) -> np.ndarray:
+        """Bulk step, once per batch run: tokenize the titles not cached yet in a single tokenizer
+        call and return every title's token count (special tokens included)."""
+        if len(self._ids) + len(texts) > self.max_size:
+            self._ids.clear()
+        missing = list(dict.fromkeys(t for t in texts if t not in self._ids))
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        if missing:
+            ids = self.tokenizer(missing, truncation=True, max_length=self.max_length)["input_ids"]
+            self._ids.update(zip(missing, ids))
+        return np.fromiter((len(self._ids[t]) for t in texts), dtype=np.int64, count=len(texts))
+
+    def features(self, texts: Sequence[str]):
+        """Padded `input_ids` / `attention_mask` tensors for titles already passed to tokenize()."""
+        return self.tokenizer.pad({"input_ids": [self._ids[t] for t in texts]}, return_tensors="pt")
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._ids)}
+
+def predict_proba_tokens(model, features) -> np.ndarray:
+    """SetFitModel.predict_proba on pre-tokenized features: the body forward pass, the model's
+    embedding normalization and its head, as in SetFitModel.encode minus the tokenizer call."""
+    import torch
+
+    body = model.model_body
+    body.eval()
+    features = {k: v.to(body.device) for k, v in features.items()}
+    with torch.inference_mode():
+        embeddings = body(features)["sentence_embedding"]
+        if getattr(model, "normalize_embeddings", False):
+            embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+        if not getattr(model, "has_differentiable_head", False):
+            embeddings = embeddings.cpu().numpy()
+        return model.model_head.predict_proba(embeddings)
+
+def format_token_cache_stats(cache: TokenCache) -> str:
+    stats = cache.stats()
+    total = stats["hits"] + stats["misses"]
+    rate = stats["hits"] / total if total else 0.0
+    return f"{stats['hits']}/{total} lookups reused cached tokens ({rate:.2%}), {stats['size']} titles cached"
@@ -1,14 +1,30 @@
+import hashlib
 import json
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
-from sklearn.metrics import classification_report, accuracy_score
-from setfit import SetFitModel
 
 from config import hybrid_lexicon as cfg
-from ...common.io import load_lexicon
+from ...common.instrumentation import start_run
+from ...common.io import atomic_write
+from ...common.lexicon import load_compiled_lexicon
+from ...common.lookup import build_lookup
+from ...common.metrics import ConfusionMatrix
+from ...common.tfidf import load_tfidf_classifier
 from ...common.current_job import select_current_job
 from ...common.text import normalize_text
-from .engine import predict_department_rule, predict_seniority_rule, predict_hybrid_smart
+from .models import load_ml_models, load_token_cache
+from .tokens import format_token_cache_stats
+from .engine import (
+    format_ml_stats,
+    format_prefilter_stats,
+    predict_department_rule,
+    predict_seniority_rule,
+    predict_hybrid_batch,
+    predict_proba_bucketed,
+    record_hybrid_metrics,
+    resolve_before_ml,
+)
 
 def load_annotated_profiles(path):
     with open(path, "r", encoding="utf-8") as f:
@@ -23,19 +39,49 @@ def map_seniority_ground_truth(sen_label):
     mapping = {"Professional": "Senior", "Entry": "Junior"}
     return mapping.get(sen_label, sen_label)
 
-def run_validation():
-    dept_lexicon = load_lexicon(cfg.DEPT_LEXICON_PATH)
-    sen_lexicon = load_lexicon(cfg.SEN_LEXICON_PATH)
+ENCODER_SOURCES = ["ML", "Fallback"]
 
-    dept_model = SetFitModel.from_pretrained(str(cfg.CHECKPOINTS_DIR / "department_model"))
-    sen_model = SetFitModel.from_pretrained(str(cfg.CHECKPOINTS_DIR / "seniority_model"))
+def apply_tfidf_tier(df_res, task, model):
+    """Rewrite `task` columns as if TF-IDF sat between the rules and SetFit.
 
-    profiles = load_annotated_profiles(cfg.ANNOTATED_JSON_PATH)
+    The loop runs the cascade without it, so every rule miss has its SetFit answer; TF-IDF is
+    then scored in one batch and takes over the encoder rows at or above its threshold."""
+    df_res[f"{task}_pred_no_tfidf"] = df_res[f"{task}_pred"]
+    df_res[f"{task}_src_no_tfidf"] = df_res[f"{task}_src"]
+    tfidf_pred, tfidf_conf = model.predict(df_res["text"].tolist())
+    df_res[f"{task}_tfidf_pred"] = tfidf_pred
+    df_res[f"{task}_tfidf_conf"] = tfidf_conf
 
-    y_true_dept, y_pred_dept = [], []
-    y_true_sen, y_pred_sen = [], []
-    results = []
+    take = df_res[f"{task}_src"].isin(ENCODER_SOURCES) & (df_res[f"{task}_tfidf_conf"] >= model.threshold)
+    df_res.loc[take, f"{task}_pred"] = df_res.loc[take, f"{task}_tfidf_pred"]
+    df_res.loc[take, f"{task}_src"] = "TF-IDF"
+
+def tfidf_tradeoff(df_res, task, thresholds):
+    """Accuracy vs share of titles still reaching SetFit for each TF-IDF threshold."""
+    y_true = df_res[f"{task}_true"].to_numpy()
+    encoder = df_res[f"{task}_src_no_tfidf"].isin(ENCODER_SOURCES).to_numpy()
+    full_ok = df_res[f"{task}_pred_no_tfidf"].to_numpy() == y_true
+    tfidf_ok = df_res[f"{task}_tfidf_pred"].to_numpy() == y_true
+    conf = df_res[f"{task}_tfidf_conf"].to_numpy()
+
+    thr = np.asarray(thresholds, dtype=np.float64)[:, None]
+    take = encoder & (conf >= thr)
+    correct = np.where(take, tfidf_ok, full_ok)
+    return pd.DataFrame({
+        "threshold": thr[:, 0],
+        "accuracy": correct.mean(axis=1),
+        "tfidf_share": take.mean(axis=1),
+        "encoder_share": (encoder & ~take).mean(axis=1),
+    })
 
+def print_tfidf_tradeoff(df_res, task, model):
+    thresholds = sorted({*cfg.TFIDF_REPORT_THRESHOLDS, model.threshold, np.inf})
+    print(f"TF-IDF tier (calibrated threshold {model.threshold:.3f}, inf = tier off):")
+    print(tfidf_tradeoff(df_res, task, thresholds).to_string(index=False, float_format="{:.4f}".format))
+
+def collect_annotated(profiles):
+    """Normalized current-job title and mapped ground truth per profile with both labels."""
+    results = []
     for p in tqdm(profiles):
         jobs = p if isinstance(p, list) else p.get("experiences", [])
         curr_job = select_current_job(jobs)
@@ -51,32 +97,239 @@ def run_validation():
 
         truth_sen = map_seniority_ground_truth(truth_sen)
 
-        d_pred, d_conf, d_src = predict_hybrid_smart(
-            text, predict_department_rule, dept_lexicon, dept_model, cfg.DEPT_ML_THRESHOLD, "Other"
-        )
-        s_pred, s_conf, s_src = predict_hybrid_smart(
-            text, predict_seniority_rule, sen_lexicon, sen_model, cfg.SEN_ML_THRESHOLD, "Senior"
-        )
+        results.append({"text": text, "dept_true": truth_dept, "sen_true": truth_sen})
+    return results
+
+def run_validation(
+    exact_lookup: bool = cfg.EXACT_LOOKUP,
+    tfidf_tier: bool = cfg.TFIDF_TIER,
+    instrumentation: bool = cfg.INSTRUMENTATION,
+):
+    metrics = start_run(instrumentation)
+
+    with metrics.timer("load_models"):
+        dept_lexicon = load_compiled_lexicon(cfg.DEPT_LEXICON_PATH, cfg.DEPT_LEXICON_COMPILED_PATH)
+        sen_lexicon = load_compiled_lexicon(cfg.SEN_LEXICON_PATH, cfg.SEN_LEXICON_COMPILED_PATH)
+        dept_lookup = build_lookup(cfg.DEPT_LOOKUP_PATH) if exact_lookup else None
+        sen_lookup = build_lookup(cfg.SEN_LOOKUP_PATH) if exact_lookup else None
+        if tfidf_tier:
+            dept_tfidf = load_tfidf_classifier(
+                cfg.DEPT_LOOKUP_PATH, cfg.DEPT_TFIDF_PATH, "Department", cfg.TFIDF_TARGET_PRECISION
+            )
+            sen_tfidf = load_tfidf_classifier(
+                cfg.SEN_LOOKUP_PATH, cfg.SEN_TFIDF_PATH, "Seniority", cfg.TFIDF_TARGET_PRECISION
+            )
 
-        y_true_dept.append(truth_dept)
-        y_pred_dept.append(d_pred)
-        y_true_sen.append(truth_sen)
-        y_pred_sen.append(s_pred)
+        dept_model, sen_model, dept_ml_threshold, sen_ml_threshold = load_ml_models()
+        token_cache = load_token_cache(dept_model, sen_model)
 
-        results.append({
-            "text": text,
-            "dept_true": truth_dept, "dept_pred": d_pred, "dept_src": d_src,
-            "sen_true": truth_sen, "sen_pred": s_pred, "sen_src": s_src,
-        })
+    with metrics.timer("load_profiles"):
+        profiles = load_annotated_profiles(cfg.ANNOTATED_JSON_PATH)
+    metrics.count("profiles", len(profiles))
+
+    with metrics.timer("select_and_normalize"):
+        results = collect_annotated(profiles)
+
+    texts = [r["text"] for r in results]
+    dept_stats, sen_stats = {}, {}
+    with metrics.timer("department"):
+        dept_out = predict_hybrid_batch(
+            texts, predict_department_rule, dept_lexicon, dept_model, dept_ml_threshold, "Other",
+            normalized=True, lookup=dept_lookup,
+            batch_size=cfg.ML_BATCH_SIZE, max_length=cfg.ML_MAX_SEQ_LENGTH, stats=dept_stats,
+            token_cache=token_cache, stage="department",
+        )
+    with metrics.timer("seniority"):
+        sen_out = predict_hybrid_batch(
+            texts, predict_seniority_rule, sen_lexicon, sen_model, sen_ml_threshold, "Senior",
+            normalized=True, lookup=sen_lookup,
+            batch_size=cfg.ML_BATCH_SIZE, max_length=cfg.ML_MAX_SEQ_LENGTH, stats=sen_stats,
+            token_cache=token_cache, stage="seniority",
+        )
+    for row, (d_pred, _, d_src), (s_pred, _, s_src) in zip(results, dept_out, sen_out):
+        row.update({"dept_pred": d_pred, "dept_src": d_src, "sen_pred": s_pred, "sen_src": s_src})
 
     df_res = pd.DataFrame(results)
+    if token_cache is not None:
+        print(f"Token cache: {format_token_cache_stats(token_cache)}")
+    if tfidf_tier:
+        with metrics.timer("tfidf_tier"):
+            apply_tfidf_tier(df_res, "dept", dept_tfidf)
+            apply_tfidf_tier(df_res, "sen", sen_tfidf)
+        # The engine counted sources before the tier rewrote them; report the final ones.
+        for stage, col in (("department", "dept_src"), ("seniority", "sen_src")):
+            for name in [n for n in metrics.counters if n.startswith(f"{stage}.source.")]:
+                del metrics.counters[name]
+            metrics.count_all(f"{stage}.source", df_res[col])
+
+    dept_cm, sen_cm = ConfusionMatrix(), ConfusionMatrix()
+    dept_cm.update_many(df_res["dept_true"], df_res["dept_pred"])
+    sen_cm.update_many(df_res["sen_true"], df_res["sen_pred"])
 
     print("\n--- DEPARTMENT ---")
-    print(f"Accuracy: {accuracy_score(y_true_dept, y_pred_dept):.4f}")
-    print(classification_report(y_true_dept, y_pred_dept, zero_division=0))
+    print(f"Accuracy: {dept_cm.accuracy():.4f}")
+    print(dept_cm.classification_report())
     print(df_res["dept_src"].value_counts())
+    print(f"Exact hit rate: {(df_res['dept_src'] == 'Exact').mean():.2%}")
+    print(f"Encoder call rate: {df_res['dept_src'].isin(ENCODER_SOURCES).mean():.2%}")
+    print(f"Prefilter: {format_prefilter_stats(dept_lexicon)}")
+    print(f"ML stage: {format_ml_stats(dept_stats)}")
+    if tfidf_tier:
+        print_tfidf_tradeoff(df_res, "dept", dept_tfidf)
 
     print("\n--- SENIORITY ---")
-    print(f"Accuracy: {accuracy_score(y_true_sen, y_pred_sen):.4f}")
-    print(classification_report(y_true_sen, y_pred_sen, zero_division=0))
-    print(df_res["sen_src"].value_counts())
\ No newline at end of file
+    print(f"Accuracy: {sen_cm.accuracy():.4f}")
+    print(sen_cm.classification_report())
+    print(df_res["sen_src"].value_counts())
+    print(f"Exact hit rate: {(df_res['sen_src'] == 'Exact').mean():.2%}")
+    print(f"Encoder call rate: {df_res['sen_src'].isin(ENCODER_SOURCES).mean():.2%}")
+    print(f"Prefilter: {format_prefilter_stats(sen_lexicon, boundary=True)}")
+    print(f"ML stage: {format_ml_stats(sen_stats)}")
+    if tfidf_tier:
+        print_tfidf_tradeoff(df_res, "sen", sen_tfidf)
+
+    record_hybrid_metrics(metrics, dept_lexicon, sen_lexicon, dept_stats, sen_stats, token_cache)
+    metrics.gauge("department.accuracy", dept_cm.accuracy())
+    metrics.gauge("seniority.accuracy", sen_cm.accuracy())
+    report = metrics.write_report(cfg.VALIDATION_METRICS_PATH, algorithm="hybrid_lexicon", mode="validation")
+    if report:
+        print(f"\nMetrics: {report}")
+
+def _latest_mtime(path):
+    if path.is_file():
+        return path.stat().st_mtime
+    return max((f.stat().st_mtime for f in path.rglob("*") if f.is_file()), default=0.0) if path.exists() else 0.0
+
+def _model_stamp(name, knn_dir):
+    """Identifies the ML stage behind a cached probability matrix: backend, the checkpoint's
+    last modification and, for kNN, k, the search mode and the index's path and last
+    modification (so a rebuilt index invalidates the cache)."""
+    stamp = f"{cfg.ML_BACKEND}:{name}:{_latest_mtime(cfg.CHECKPOINTS_DIR / name)}"
+    if cfg.ML_BACKEND == "knn":
+        stamp += f":k={cfg.KNN_K}:hnsw={cfg.KNN_USE_HNSW}:{knn_dir}:{_latest_mtime(knn_dir)}"
+    return stamp
+
+def cached_predict_proba(model, texts, path, stamp, token_cache=None):
+    """predict_proba_bucketed for `texts`, reused from `path` while the titles and the model
+    stamp are unchanged."""
+    key = hashlib.sha256("\n".join([stamp, *texts]).encode("utf-8")).hexdigest()
+    if path.exists():
+        with np.load(path, allow_pickle=False) as cached:
+            if str(cached["key"]) == key:
+                return cached["probs"], [str(label) for label in cached["labels"]]
+    probs = predict_proba_bucketed(
+        model, texts, cfg.ML_BATCH_SIZE, cfg.ML_MAX_SEQ_LENGTH, token_cache=token_cache
+    )
+    labels = [str(label) for label in model.labels] if getattr(model, "labels", None) else [
+        str(i) for i in range(probs.shape[1])
+    ]
+    with atomic_write(path) as f:
+        np.savez(f, key=key, probs=probs, labels=np.array(labels))
+    return probs, labels
+
+def threshold_sweep(y_true, fixed_pred, encoder_rows, probs, labels, fallback_label, thresholds):
+    """Cascade accuracy and coverage for every ML threshold at once.
+
+    fixed_pred holds the answer of the tiers before the ML stage (ignored on encoder rows);
+    probs[k] are the ML probabilities of row encoder_rows[k]. Below the threshold an encoder
+    row gets fallback_label, as in ml_decision."""
+    y_true = np.asarray(y_true, dtype=object)
+    n = len(y_true)
+    fixed_ok = np.asarray(fixed_pred, dtype=object) == y_true
+    fixed_ok[encoder_rows] = False
+    fixed_correct = int(fixed_ok.sum())
+
+    conf = probs.max(axis=1) if len(probs) else np.zeros(0)
+    ml_pred = np.asarray(labels, dtype=object)[probs.argmax(axis=1)] if len(probs) else np.zeros(0, dtype=object)
+    ml_ok = ml_pred == y_true[encoder_rows]
+    fallback_ok = y_true[encoder_rows] == fallback_label
+
+    thr = np.asarray(thresholds, dtype=np.float64)[:, None]
+    answered = conf >= thr
+    correct = np.where(answered, ml_ok, fallback_ok).sum(axis=1)
+    ml_answered = answered.sum(axis=1)
+    ml_correct = (answered & ml_ok).sum(axis=1)
+    return pd.DataFrame({
+        "threshold": thr[:, 0],
+        "accuracy": (fixed_correct + correct) / n if n else 0.0,
+        "coverage": (n - len(encoder_rows) + ml_answered) / n if n else 0.0,
+        "ml_share": ml_answered / n if n else 0.0,
+        "ml_precision": np.divide(ml_correct, ml_answered, out=np.zeros(len(thr)), where=ml_answered > 0),
+        "fallback_share": (len(encoder_rows) - ml_answered) / n if n else 0.0,
+    })
+
+def best_operating_points(curve, configured, target_precision):
+    """Most accurate threshold (ties -> more coverage), the lowest threshold meeting
+    target_precision on ML-answered titles, and the configured threshold."""
+    points = {}
+    best = curve.sort_values(["accuracy", "coverage", "threshold"], ascending=False).iloc[0]
+    points["best_accuracy"] = best.to_dict()
+    precise = curve[curve["ml_precision"] >= target_precision]
+    if len(precise):
+        points[f"max_coverage_at_precision_{target_precision:g}"] = precise.sort_values("threshold").iloc[0].to_dict()
+    points["configured"] = curve.iloc[int(np.abs(curve["threshold"] - configured).argmin())].to_dict()
+    return points
+
+def run_threshold_sweep(
+    exact_lookup: bool = cfg.EXACT_LOOKUP,
+    tfidf_tier: bool = cfg.TFIDF_TIER,
+    thresholds=cfg.ML_SWEEP_THRESHOLDS,
+    target_precision: float = cfg.ML_SWEEP_TARGET_PRECISION,
+):
+    """Accuracy / coverage curves for DEPT_ML_THRESHOLD and SEN_ML_THRESHOLD on the annotated
+    profiles: the cascade before the ML stage runs once, the titles reaching it are scored once
+    (cached under SWEEP_DIR) and the whole grid is evaluated on the cached probabilities."""
+    dept_lexicon = load_compiled_lexicon(cfg.DEPT_LEXICON_PATH, cfg.DEPT_LEXICON_COMPILED_PATH)
+    sen_lexicon = load_compiled_lexicon(cfg.SEN_LEXICON_PATH, cfg.SEN_LEXICON_COMPILED_PATH)
+    dept_lookup = build_lookup(cfg.DEPT_LOOKUP_PATH) if exact_lookup else None
+    sen_lookup = build_lookup(cfg.SEN_LOOKUP_PATH) if exact_lookup else None
+    dept_tfidf = sen_tfidf = None
+    if tfidf_tier:
+        dept_tfidf = load_tfidf_classifier(
+            cfg.DEPT_LOOKUP_PATH, cfg.DEPT_TFIDF_PATH, "Department", cfg.TFIDF_TARGET_PRECISION
+        )
+        sen_tfidf = load_tfidf_classifier(
+            cfg.SEN_LOOKUP_PATH, cfg.SEN_TFIDF_PATH, "Seniority", cfg.TFIDF_TARGET_PRECISION
+        )
+    dept_model, sen_model, dept_ml_threshold, sen_ml_threshold = load_ml_models()
+    token_cache = load_token_cache(dept_model, sen_model)
+
+    results = collect_annotated(load_annotated_profiles(cfg.ANNOTATED_JSON_PATH))
+    texts = [r["text"] for r in results]
+
+    tasks = (
+        ("department", "dept", predict_department_rule, dept_lexicon, dept_lookup, dept_tfidf, dept_model,
+         "department_model", cfg.DEPT_KNN_DIR, dept_ml_threshold, "Other"),
+        ("seniority", "sen", predict_seniority_rule, sen_lexicon, sen_lookup, sen_tfidf, sen_model,
+         "seniority_model", cfg.SEN_KNN_DIR, sen_ml_threshold, "Senior"),
+    )
+    summary = {}
+    for task, col, rule_func, lexicon, lookup, tfidf, model, checkpoint, knn_dir, configured, fallback in tasks:
+        resolved = [
+            resolve_before_ml(t, rule_func, lexicon, normalized=True, lookup=lookup, tfidf=tfidf) for t in texts
+        ]
+        fixed_pred = [r[0] if r is not None else None for r in resolved]
+        encoder_rows = np.array([i for i, r in enumerate(resolved) if r is None], dtype=np.int64)
+        pending = list(dict.fromkeys(texts[i] for i in encoder_rows))
+        probs, labels = cached_predict_proba(
+            model, pending, cfg.SWEEP_DIR / f"{task}_probs.npz", _model_stamp(checkpoint, knn_dir), token_cache
+        )
+        row_of = {t: k for k, t in enumerate(pending)}
+        row_probs = probs[[row_of[texts[i]] for i in encoder_rows]] if len(encoder_rows) else probs[:0]
+
+        curve = threshold_sweep(
+            [r[f"{col}_true"] for r in results], fixed_pred, encoder_rows, row_probs, labels, fallback, thresholds
+        )
+        points = best_operating_points(curve, configured, target_precision)
+        curve_path = cfg.SWEEP_DIR / f"{task}_threshold_curve.csv"
+        curve.to_csv(curve_path, index=False)
+        summary[task] = {"titles": len(texts), "encoder_titles": len(encoder_rows), "points": points}
+
+        print(f"\n--- {task.upper()} ({len(encoder_rows)}/{len(texts)} titles reach the ML stage) ---")
+        print(pd.DataFrame(points).T.to_string(float_format="{:.4f}".format))
+        print(f"Curve: {curve_path}")
+
+    summary_path = cfg.SWEEP_DIR / "threshold_sweep.json"
+    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print(f"\nBest operating points: {summary_path}")
+    return summary
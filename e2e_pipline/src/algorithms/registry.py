@@ -4,13 +4,22 @@ from .rule_based.inference import run_inference as rb_inference
 from .rule_based.validation import run_validation as rb_validation
 from .hybrid_lexicon.inference import run_inference as hy_inference
 from .hybrid_lexicon.validation import run_validation as hy_validation
+from .tfidf_fast.inference import run_inference as tf_inference
+from .tfidf_fast.validation import run_validation as tf_validation
+from .tfidf_fast.train import train as tf_train
 
 INFERENCE_REGISTRY: Dict[str, Callable[[], None]] = {
     "rule_based": rb_inference,
     "hybrid_lexicon": hy_inference,
+    "tfidf_fast": tf_inference,
 }
 
 VALIDATION_REGISTRY: Dict[str, Callable[[], None]] = {
     "rule_based": rb_validation,
     "hybrid_lexicon": hy_validation,
+    "tfidf_fast": tf_validation,
+}
+
+TRAINING_REGISTRY: Dict[str, Callable[[], None]] = {
+    "tfidf_fast": tf_train,
 }
\ No newline at end of file
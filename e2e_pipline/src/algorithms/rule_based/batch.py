@@ -0,0 +1,190 @@
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+from scipy import sparse
+
+from ...common.lexicon import CompiledLexicon
+from ...common.text import normalize_text
+from .engine import DepartmentRuleScorer, SeniorityRuleScorer
+
+def _doc_term_matrix(
+    texts: Sequence[str],
+    term_hits: Callable[[str], List[int]],
+    n_terms: int,
+    dtype,
+    normalized: bool,
+) -> sparse.csr_matrix:
+    # Titles repeat heavily, so match each distinct one once and broadcast rows back.
+    uniq: Dict[str, int] = {}
+    inverse = np.empty(len(texts), dtype=np.int64)
+    indptr, indices = [0], []
+    for i, text in enumerate(texts):
+        t = text if normalized else normalize_text(text)
+        row = uniq.get(t)
+        if row is None:
+            row = uniq[t] = len(uniq)
+            indices.extend(term_hits(t))
+            indptr.append(len(indices))
+        inverse[i] = row
+    uniq_matrix = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=dtype), np.asarray(indices, dtype=np.int64), indptr),
+        shape=(len(uniq), n_terms),
+    )
+    return uniq_matrix[inverse]
+
+@dataclass
+class DepartmentBatchResult:
+    label_ids: np.ndarray
+    best_scores: np.ndarray
+    scores: np.ndarray
+    doc_terms: sparse.csr_matrix
+
+class BatchDepartmentScorer:
+    """Vectorized predict_department_rule: one automaton pass per distinct title, then a sparse
+    (titles x terms) @ (terms x labels) product for the scores."""
+
+    def __init__(
+        self,
+        lexicon: Union[Dict[str, List[str]], CompiledLexicon],
+        bigram_weight: float = 2.0,
+        unigram_weight: float = 1.0,
+        min_score: float = 2.0,
+        default_label: str = "Other",
+    ):
+        self.rules = DepartmentRuleScorer(
+            lexicon,
+            bigram_weight=bigram_weight,
+            unigram_weight=unigram_weight,
+            min_score=min_score,
+            default_label=default_label,
+        )
+        self.lexicon = self.rules.lexicon
+        self.labels = self.rules.labels
+        self.label_names = self.labels.names
+        self.min_score = min_score
+        self.default_label = default_label
+
+        rows, cols, vals = [], [], []
+        for tid, label_counts in enumerate(self.lexicon.term_labels):
+            w = self.rules.term_weight(tid)
+            for j, c in label_counts:
+                rows.append(tid)
+                cols.append(j)
+                vals.append(w * c)
+        self.weights = sparse.csr_matrix(
+            (np.asarray(vals, dtype=np.float64), (rows, cols)),
+            shape=(len(self.lexicon.terms), len(self.labels)),
+        )
+
+    def labels_of(self, result: DepartmentBatchResult) -> List[str]:
+        return self.labels.decode(result.label_ids, self.default_label)
+
+    def doc_term_matrix(self, texts: Sequence[str], normalized: bool = False) -> sparse.csr_matrix:
+        return _doc_term_matrix(texts, self.lexicon.term_hits, len(self.lexicon.terms), np.float64, normalized)
+
+    def score(self, texts: Sequence[str], normalized: bool = False) -> DepartmentBatchResult:
+        doc_terms = self.doc_term_matrix(texts, normalized=normalized)
+        scores = np.asarray((doc_terms @ self.weights).todense()).reshape(len(texts), len(self.labels))
+
+        if not len(self.labels):
+            return DepartmentBatchResult(
+                label_ids=np.full(len(texts), -1, dtype=np.int16),
+                best_scores=np.zeros(len(texts)),
+                scores=scores,
+                doc_terms=doc_terms,
+            )
+
+        label_ids = scores.argmax(axis=1).astype(np.int16)
+        best_scores = scores[np.arange(len(texts)), label_ids]
+        if self.rules.default_id >= 0:
+            label_ids[best_scores < self.min_score] = self.rules.default_id
+        return DepartmentBatchResult(
+            label_ids=label_ids,
+            best_scores=best_scores,
+            scores=scores,
+            doc_terms=doc_terms,
+        )
+
+    def iter_chunks(
+        self, texts: Sequence[str], chunk_size: int = 100_000, normalized: bool = False
+    ) -> Iterator[DepartmentBatchResult]:
+        for start in range(0, len(texts), chunk_size):
+            yield self.score(texts[start:start + chunk_size], normalized=normalized)
+
+    def debug(self, result: DepartmentBatchResult, i: int) -> Dict[str, Any]:
+        hit = set(result.doc_terms.getrow(i).indices.tolist())
+        terms = self.lexicon.terms
+        scores = {label: float(result.scores[i, j]) for j, label in enumerate(self.label_names)}
+        matched = {}
+        for label, entries in zip(self.label_names, self.lexicon.label_terms):
+            m = [terms[tid] for tid, _ in entries if tid in hit]
+            if m:
+                matched[label] = m
+        return {
+            "best_score": float(result.best_scores[i]),
+            "scores": scores,
+            "matched_terms": matched,
+        }
+
+@dataclass
+class SeniorityBatchResult:
+    label_ids: np.ndarray
+    counts: np.ndarray
+    doc_terms: sparse.csr_matrix
+
+class BatchSeniorityScorer:
+    """Vectorized predict_seniority_rule: word-boundary hit counts per SENIORITY_HIERARCHY label,
+    ties broken towards the later hierarchy entry exactly like the per-title engine."""
+
+    def __init__(
+        self,
+        lexicon: Union[Dict[str, List[str]], CompiledLexicon],
+        default_label: str = "Professional",
+    ):
+        self.rules = SeniorityRuleScorer(lexicon, default_label=default_label)
+        self.lexicon = self.rules.lexicon
+        self.labels = self.rules.labels
+        self.label_names = self.labels.names
+        self.default_label = default_label
+
+        rows, cols, vals = [], [], []
+        for tid, label_counts in enumerate(self.lexicon.term_labels):
+            for j, c in label_counts:
+                rank = self.rules.rank[j]
+                if rank >= 0:
+                    rows.append(tid)
+                    cols.append(rank)
+                    vals.append(c)
+        self.weights = sparse.csr_matrix(
+            (np.asarray(vals, dtype=np.int64), (rows, cols)),
+            shape=(len(self.lexicon.terms), len(self.labels)),
+        )
+
+    def labels_of(self, result: SeniorityBatchResult) -> List[str]:
+        return self.labels.decode(result.label_ids, self.default_label)
+
+    def doc_term_matrix(self, texts: Sequence[str], normalized: bool = False) -> sparse.csr_matrix:
+        return _doc_term_matrix(
+            texts, partial(self.lexicon.term_hits, boundary=True), len(self.lexicon.terms), np.int64, normalized
+        )
+
+    def score(self, texts: Sequence[str], normalized: bool = False) -> SeniorityBatchResult:
+        doc_terms = self.doc_term_matrix(texts, normalized=normalized)
+        counts = np.asarray((doc_terms @ self.weights).todense()).reshape(len(texts), len(self.labels))
+
+        n_labels = len(self.labels)
+        label_ids = (counts * n_labels + np.arange(n_labels)).argmax(axis=1).astype(np.int16)
+        label_ids[counts.max(axis=1) == 0] = -1
+        return SeniorityBatchResult(label_ids=label_ids, counts=counts, doc_terms=doc_terms)
+
+    def debug(self, result: SeniorityBatchResult, i: int) -> Dict[str, Any]:
+        all_scores = {label: int(result.counts[i, j]) for j, label in enumerate(self.label_names)}
+        label_id = int(result.label_ids[i])
+        if label_id < 0:
+            return {"matched_terms": [], "all_scores": all_scores}
+        hit = set(result.doc_terms.getrow(i).indices.tolist())
+        j = self.lexicon.labels.id(self.label_names[label_id])
+        matched = [term for tid, term in self.lexicon.label_terms[j] if tid in hit]
+        return {"matched_terms": matched, "all_scores": all_scores}
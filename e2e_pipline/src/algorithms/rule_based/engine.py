@@ -1,6 +1,8 @@
 import re
-from typing import Any, Dict, List, Tuple
+from array import array
+from typing import Any, Dict, List, Tuple, Union
 
+from ...common.lexicon import CompiledLexicon, LabelVocab, as_compiled
 from ...common.text import normalize_text
 
 SENIORITY_HIERARCHY = ["C-Level", "Director", "Management", "Lead", "Senior", "Junior", "Intern"]
@@ -11,9 +13,10 @@ def predict_department_rule(
     bigram_weight: float = 2.0,
     unigram_weight: float = 1.0,
     min_score: float = 2.0,
-    default_label: str = "Other"
+    default_label: str = "Other",
+    normalized: bool = False,
 ) -> Tuple[str, Dict[str, Any]]:
-    t = normalize_text(text)
+    t = text if normalized else normalize_text(text)
 
     scores: Dict[str, float] = {}
     matched: Dict[str, List[str]] = {}
@@ -54,9 +57,10 @@ def predict_department_rule(
 def predict_seniority_rule(
     text: str,
     lexicon: Dict[str, List[str]],
-    default_label: str = "Professional"
+    default_label: str = "Professional",
+    normalized: bool = False,
 ) -> Tuple[str, Dict[str, Any]]:
-    t = normalize_text(text)
+    t = text if normalized else normalize_text(text)
 
     scores = {label: 0 for label in SENIORITY_HIERARCHY}
     matched = {label: [] for label in SENIORITY_HIERARCHY}
@@ -77,3 +81,144 @@ def predict_seniority_rule(
         return best_label, {"matched_terms": matched[best_label], "all_scores": scores}
 
     return default_label, {"matched_terms": [], "all_scores": scores}
+
+class DepartmentRuleScorer:
+    """Compiled predict_department_rule. score() is the hot path: it returns
+    (label_id, best_score, second_best_score) and only touches preallocated count arrays.
+    explain() rebuilds the full debug dict on demand. Not safe to share across threads."""
+
+    def __init__(
+        self,
+        lexicon: Union[Dict[str, List[str]], CompiledLexicon],
+        bigram_weight: float = 2.0,
+        unigram_weight: float = 1.0,
+        min_score: float = 2.0,
+        default_label: str = "Other",
+    ):
+        self.lexicon = as_compiled(lexicon)
+        self.labels = self.lexicon.labels
+        self.label_names: List[str] = self.labels.names
+        self.bigram_weight = bigram_weight
+        self.unigram_weight = unigram_weight
+        self.min_score = min_score
+        self.default_label = default_label
+        self.default_id = self.labels.id(default_label) if default_label is not None else -1
+
+        self._multi = self.lexicon.new_counts()
+        self._single = self.lexicon.new_counts()
+        self._zeros = self.lexicon.new_counts()
+
+    def label_name(self, label_id: int) -> str:
+        return self.labels.name(label_id, self.default_label)
+
+    def term_weight(self, tid: int) -> float:
+        return self.bigram_weight if self.lexicon.is_multiword[tid] else self.unigram_weight
+
+    def score(self, text: str, normalized: bool = False) -> Tuple[int, float, float]:
+        t = text if normalized else normalize_text(text)
+        multi, single = self._multi, self._single
+        multi[:] = self._zeros
+        single[:] = self._zeros
+        self.lexicon.count_hits(t, multi, single)
+
+        bw, uw = self.bigram_weight, self.unigram_weight
+        best_id, best, second = -1, float("-inf"), float("-inf")
+        for j in range(len(multi)):
+            v = bw * multi[j] + uw * single[j]
+            if v > best:
+                best_id, best, second = j, v, best
+            elif v > second:
+                second = v
+
+        if best_id < 0:
+            return -1, 0.0, 0.0
+        if len(multi) < 2:
+            second = 0.0
+        if best < self.min_score and self.default_id >= 0:
+            return self.default_id, best, second
+        return best_id, best, second
+
+    def explain(self, text: str, normalized: bool = False) -> Tuple[str, Dict[str, Any]]:
+        t = text if normalized else normalize_text(text)
+        hit = set(self.lexicon.term_hits(t))
+        terms = self.lexicon.terms
+
+        scores: Dict[str, float] = {}
+        matched: Dict[str, List[str]] = {}
+        for label, entries in zip(self.label_names, self.lexicon.label_terms):
+            score = 0.0
+            m: List[str] = []
+            for tid, _ in entries:
+                if tid in hit:
+                    score += self.term_weight(tid)
+                    m.append(terms[tid])
+            scores[label] = score
+            if m:
+                matched[label] = m
+
+        best_label = max(scores, key=scores.get) if scores else self.default_label
+        best_score = scores.get(best_label, 0.0)
+        if best_score < self.min_score and self.default_id >= 0:
+            best_label = self.default_label
+
+        debug = {
+            "best_score": best_score,
+            "scores": scores,
+            "matched_terms": matched,
+        }
+        return best_label, debug
+
+class SeniorityRuleScorer:
+    """Compiled predict_seniority_rule. score() returns (label_id, hit_count) with label_id
+    indexing SENIORITY_HIERARCHY, or -1 for the default label."""
+
+    def __init__(
+        self,
+        lexicon: Union[Dict[str, List[str]], CompiledLexicon],
+        default_label: str = "Professional",
+    ):
+        self.lexicon = as_compiled(lexicon)
+        self.labels = LabelVocab(SENIORITY_HIERARCHY)
+        self.label_names: List[str] = self.labels.names
+        self.default_label = default_label
+        # Lexicon label id -> hierarchy rank (-1 for labels outside the hierarchy).
+        self.rank = array("l", [self.labels.id(name) for name in self.lexicon.labels.names])
+
+        self._counts = self.lexicon.new_counts()
+        self._zeros = self.lexicon.new_counts()
+
+    def label_name(self, label_id: int) -> str:
+        return self.labels.name(label_id, self.default_label)
+
+    def score(self, text: str, normalized: bool = False) -> Tuple[int, int]:
+        t = text if normalized else normalize_text(text)
+        counts = self._counts
+        counts[:] = self._zeros
+        self.lexicon.count_hits(t, counts, counts, boundary=True)
+
+        # Highest count wins; ties go to the later hierarchy entry.
+        best_id, best = -1, 0
+        for j, rank in enumerate(self.rank):
+            c = counts[j]
+            if c and rank >= 0 and (c > best or (c == best and rank > best_id)):
+                best_id, best = rank, c
+        return best_id, best
+
+    def explain(self, text: str, normalized: bool = False) -> Tuple[str, Dict[str, Any]]:
+        t = text if normalized else normalize_text(text)
+        hit = set(self.lexicon.term_hits(t, boundary=True))
+        scores = {label: 0 for label in self.label_names}
+        matched = {label: [] for label in self.label_names}
+        for label, entries in zip(self.lexicon.labels.names, self.lexicon.label_terms):
+            if label not in scores:
+                continue
+            for tid, term in entries:
+                if tid in hit:
+                    scores[label] += 1
+                    matched[label].append(term)
+
+        label_id, _ = self.score(t, normalized=True)
+        if label_id >= 0:
+            best_label = self.label_names[label_id]
+            return best_label, {"matched_terms": matched[best_label], "all_scores": scores}
+        return self.default_label, {"matched_terms": [], "all_scores": scores}
@@ -1,16 +1,18 @@
+import numpy as np
 import pandas as pd
 
 from config import rule_based as cfg
-from ...common.io import load_profiles, load_lexicon, save_df
-from ...common.current_job import select_current_job
-from ...common.text import build_job_text
-from .engine import predict_department_rule, predict_seniority_rule
+from ...common.instrumentation import start_run
+from ...common.io import load_profiles, save_df
+from ...common.lexicon import load_compiled_lexicon
+from ...common.current_job import select_current_job, select_current_jobs_bulk
+from ...common.text import build_job_text, normalize_cache_info
+from .engine import DepartmentRuleScorer, SeniorityRuleScorer
+from .batch import BatchDepartmentScorer, BatchSeniorityScorer
 
-def dept_confidence_from_debug(dept_dbg):
-    scores = (dept_dbg or {}).get("scores", {}) or {}
-    best_score = float((dept_dbg or {}).get("best_score") or 0.0)
-    vals = sorted([float(v) for v in scores.values()], reverse=True)
-    second_best = float(vals[1]) if len(vals) > 1 else 0.0
+def dept_confidence_from_score(best_score, second_best):
+    best_score = float(best_score)
+    second_best = float(second_best)
     margin = best_score - second_best
     conf = min(1.0, max(0.0, best_score / (best_score + 2.0)))
     return {
@@ -20,13 +22,79 @@ def dept_confidence_from_debug(dept_dbg):
         "dept_confidence": conf,
     }
 
+def dept_confidence_from_debug(dept_dbg):
+    scores = (dept_dbg or {}).get("scores", {}) or {}
+    best_score = float((dept_dbg or {}).get("best_score") or 0.0)
+    vals = sorted([float(v) for v in scores.values()], reverse=True)
+    second_best = float(vals[1]) if len(vals) > 1 else 0.0
+    return dept_confidence_from_score(best_score, second_best)
+
+def sen_confidence_from_hits(hits):
+    return 0.9 if hits else 0.4
+
 def sen_confidence_from_debug(sen_dbg):
-    matched_terms = (sen_dbg or {}).get("matched_terms", [])
-    return 0.9 if matched_terms else 0.4
+    return sen_confidence_from_hits((sen_dbg or {}).get("matched_terms", []))
+
+def dept_confidence_from_scores(scores: np.ndarray, best_scores: np.ndarray):
+    best = np.asarray(best_scores, dtype=np.float64)
+    if scores.shape[1] > 1:
+        second = np.partition(scores, -2, axis=1)[:, -2]
+    else:
+        second = np.zeros(len(best))
+    return {
+        "dept_best_score": best,
+        "dept_second_best_score": second,
+        "dept_margin": best - second,
+        "dept_confidence": np.clip(best / (best + 2.0), 0.0, 1.0),
+    }
+
+def sen_confidence_from_counts(counts: np.ndarray):
+    return np.where(counts.max(axis=1) > 0, sen_confidence_from_hits(True), sen_confidence_from_hits(False))
 
-def run_inference():
-    dept_lexicon = load_lexicon(cfg.DEPT_LEXICON_PATH)
-    sen_lexicon = load_lexicon(cfg.SEN_LEXICON_PATH)
+def record_rule_sources(metrics, df, n_profiles, min_score):
+    """Rule vs Fallback (default label) per task, plus profiles without a current job as Empty."""
+    if not metrics.enabled:
+        return
+    empty = n_profiles - len(df)
+    if len(df):
+        dept_rule = int((df["dept_best_score"] >= min_score).sum())
+        sen_rule = int((df["sen_confidence"] == sen_confidence_from_hits(True)).sum())
+    else:
+        dept_rule = sen_rule = 0
+    for stage, rule in (("department", dept_rule), ("seniority", sen_rule)):
+        metrics.count(f"{stage}.source.Rule", rule)
+        metrics.count(f"{stage}.source.Fallback", len(df) - rule)
+        metrics.count(f"{stage}.source.Empty", empty)
+    info = normalize_cache_info()
+    metrics.cache("normalize_text", info.hits, info.misses)
+
+def score_batch(texts, dept_lexicon, sen_lexicon, dept_predict_args, sen_default, include_debug=False):
+    dept_scorer = BatchDepartmentScorer(dept_lexicon, **dept_predict_args)
+    sen_scorer = BatchSeniorityScorer(sen_lexicon, default_label=sen_default)
+    dept_res = dept_scorer.score(texts)
+    sen_res = sen_scorer.score(texts)
+
+    columns = {
+        "dept_pred": dept_scorer.labels_of(dept_res),
+        "sen_pred": sen_scorer.labels_of(sen_res),
+        **dept_confidence_from_scores(dept_res.scores, dept_res.best_scores),
+        "sen_confidence": sen_confidence_from_counts(sen_res.counts),
+    }
+    if include_debug:
+        columns["dept_debug"] = [dept_scorer.debug(dept_res, i) for i in range(len(texts))]
+        columns["sen_debug"] = [sen_scorer.debug(sen_res, i) for i in range(len(texts))]
+    return columns
+
+def run_inference(
+    bulk_current_job: bool = cfg.BULK_CURRENT_JOB,
+    batch_scoring: bool = cfg.BATCH_SCORING,
+    include_debug: bool = False,
+    instrumentation: bool = cfg.INSTRUMENTATION,
+):
+    metrics = start_run(instrumentation)
+    with metrics.timer("load_models"):
+        dept_lexicon = load_compiled_lexicon(cfg.DEPT_LEXICON_PATH, cfg.DEPT_LEXICON_COMPILED_PATH)
+        sen_lexicon = load_compiled_lexicon(cfg.SEN_LEXICON_PATH, cfg.SEN_LEXICON_COMPILED_PATH)
 
     dept_params = {
         "bigram_weight": cfg.DEPT_BIGRAM_WEIGHT,
@@ -35,27 +103,40 @@ def run_inference():
         "default_label": cfg.DEPT_DEFAULT_LABEL,
         "sen_default": cfg.SEN_DEFAULT_LABEL,
     }
+    dept_predict_args = {k: v for k, v in dept_params.items() if k != "sen_default"}
+    sen_default = dept_params.get("sen_default", "Professional")
 
-    profiles = load_profiles(cfg.NOT_ANNOTATED_JSON_PATH)
+    if not batch_scoring:
+        dept_scorer = DepartmentRuleScorer(dept_lexicon, **dept_predict_args)
+        sen_scorer = SeniorityRuleScorer(sen_lexicon, default_label=sen_default)
+
+    with metrics.timer("load_profiles"):
+        profiles = load_profiles(cfg.NOT_ANNOTATED_JSON_PATH)
+    metrics.count("profiles", len(profiles))
+
+    current_jobs = None
+    if bulk_current_job:
+        with metrics.timer("select_current_jobs_bulk"):
+            current_jobs = select_current_jobs_bulk([p if isinstance(p, list) else [] for p in profiles])
 
     rows = []
+    texts = []
     for i, profile_jobs in enumerate(profiles):
         if not isinstance(profile_jobs, list) or not profile_jobs:
             continue
 
-        job = select_current_job(profile_jobs)
+        if current_jobs is not None:
+            job = current_jobs[i]
+        else:
+            with metrics.timer("select"):
+                job = select_current_job(profile_jobs)
         if not job:
             continue
 
-        text = build_job_text(job)
-
-        dept_predict_args = {k: v for k, v in dept_params.items() if k != "sen_default"}
-        sen_default = dept_params.get("sen_default", "Professional")
-
-        dept_pred, dept_dbg = predict_department_rule(text, dept_lexicon, **dept_predict_args)
-        sen_pred, sen_dbg = predict_seniority_rule(text, sen_lexicon, default_label=sen_default)
+        with metrics.timer("build_text"):
+            text = build_job_text(job)
 
-        rows.append({
+        row = {
             "profile_idx": i,
             "organization": job.get("organization"),
             "position": job.get("position"),
@@ -63,12 +144,37 @@ def run_inference():
             "endDate": job.get("endDate"),
             "status": job.get("status"),
             "linkedin": job.get("linkedin"),
-            "dept_pred": dept_pred,
-            "sen_pred": sen_pred,
-            **dept_confidence_from_debug(dept_dbg),
-            "sen_confidence": sen_confidence_from_debug(sen_dbg),
+        }
+
+        if batch_scoring:
+            rows.append(row)
+            texts.append(text)
+            continue
+
+        with metrics.timer("score"):
+            dept_id, dept_best, dept_second = dept_scorer.score(text)
+            sen_id, sen_hits = sen_scorer.score(text)
+
+        rows.append({
+            **row,
+            "dept_pred": dept_scorer.label_name(dept_id),
+            "sen_pred": sen_scorer.label_name(sen_id),
+            **dept_confidence_from_score(dept_best, dept_second),
+            "sen_confidence": sen_confidence_from_hits(sen_hits),
         })
 
     df = pd.DataFrame(rows)
-    save_df(df, cfg.PRED_NOT_ANNOTATED_PATH)
-    print(f"Saved: {cfg.PRED_NOT_ANNOTATED_PATH}")
\ No newline at end of file
+    if batch_scoring:
+        with metrics.timer("score_batch"):
+            for col, values in score_batch(
+                texts, dept_lexicon, sen_lexicon, dept_predict_args, sen_default, include_debug
+            ).items():
+                df[col] = values
+    with metrics.timer("write_output"):
+        save_df(df, cfg.PRED_NOT_ANNOTATED_PATH)
+    print(f"Saved: {cfg.PRED_NOT_ANNOTATED_PATH}")
+
+    record_rule_sources(metrics, df, len(profiles), cfg.DEPT_MIN_SCORE)
+    report = metrics.write_report(cfg.INFERENCE_METRICS_PATH, algorithm="rule_based", mode="inference")
+    if report:
+        print(f"Metrics: {report}")
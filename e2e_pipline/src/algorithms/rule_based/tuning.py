@@ -0,0 +1,149 @@
+import json
+from itertools import product
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from config import rule_based as cfg
+from ...common.current_job import select_current_job
+from ...common.io import load_profiles
+from ...common.lexicon import CompiledLexicon, load_compiled_lexicon
+from ...common.text import build_job_text
+from .batch import _doc_term_matrix
+
+# Cap on (weight pairs x titles x labels) score cells materialized per grid chunk.
+GRID_CHUNK_CELLS = 1 << 24
+
+def hit_count_matrices(lexicon: CompiledLexicon, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-title, per-label counts of multi-word and single-word term hits, so that
+    DepartmentRuleScorer's scores are bigram_weight * multi + unigram_weight * single for any
+    weights. The titles are matched once, here."""
+    doc_terms = _doc_term_matrix(texts, lexicon.term_hits, len(lexicon.terms), np.int64, normalized=False)
+    rows, cols, vals = [], [], []
+    for tid, label_counts in enumerate(lexicon.term_labels):
+        for j, c in label_counts:
+            rows.append(tid)
+            cols.append(j)
+            vals.append(c)
+    term_labels = sparse.csr_matrix(
+        (np.asarray(vals, dtype=np.int64), (rows, cols)), shape=(len(lexicon.terms), len(lexicon.labels))
+    )
+    is_multi = sparse.diags(np.asarray(lexicon.is_multiword, dtype=np.int64), dtype=np.int64)
+    multi = (doc_terms @ (is_multi @ term_labels)).toarray()
+    single = (doc_terms @ term_labels).toarray() - multi
+    return multi, single
+
+def grid_search(
+    multi: np.ndarray,
+    single: np.ndarray,
+    truth: np.ndarray,
+    default_id: int,
+    bigram_weights: Sequence[float],
+    unigram_weights: Sequence[float],
+    min_scores: Sequence[float],
+) -> pd.DataFrame:
+    """Accuracy, rule coverage (best score >= min_score) and rule precision for every
+    (bigram_weight, unigram_weight, min_score), decided as in DepartmentRuleScorer.score:
+    first highest-scoring label, default_id below min_score."""
+    n, n_labels = multi.shape
+    pairs = np.array(list(product(bigram_weights, unigram_weights)), dtype=np.float64).reshape(-1, 2)
+    ms = np.asarray(min_scores, dtype=np.float64)[None, :, None]
+    chunk = max(1, GRID_CHUNK_CELLS // max(1, n * n_labels))
+
+    frames = []
+    for lo in range(0, len(pairs), chunk):
+        bw, uw = pairs[lo:lo + chunk, 0], pairs[lo:lo + chunk, 1]
+        scores = bw[:, None, None] * multi[None] + uw[:, None, None] * single[None]
+        best_id = scores.argmax(axis=2)
+        best = np.take_along_axis(scores, best_id[..., None], axis=2)[..., 0]
+
+        answered = best[:, None, :] >= ms
+        rule_ok = (best_id == truth)[:, None, :]
+        if default_id >= 0:
+            correct = np.where(answered, rule_ok, (truth == default_id)[None, None, :])
+        else:
+            correct = np.broadcast_to(rule_ok, answered.shape)
+        n_answered = answered.sum(axis=2)
+        frames.append(pd.DataFrame({
+            "bigram_weight": np.repeat(bw, len(min_scores)),
+            "unigram_weight": np.repeat(uw, len(min_scores)),
+            "min_score": np.tile(ms[0, :, 0], len(bw)),
+            "accuracy": (correct.sum(axis=2) / n).ravel() if n else 0.0,
+            "rule_coverage": (n_answered / n).ravel() if n else 0.0,
+            "rule_precision": np.divide(
+                (answered & rule_ok).sum(axis=2), n_answered, out=np.zeros(n_answered.shape), where=n_answered > 0
+            ).ravel(),
+        }))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def pareto_front(grid: pd.DataFrame, objectives: Tuple[str, str]) -> pd.DataFrame:
+    """Rows not dominated on the two (maximized) objectives; exact ties keep one row."""
+    values = grid[list(objectives)].to_numpy()
+    # First objective descending (second breaks ties): a row is on the front iff it beats
+    # the running maximum of the second objective.
+    order = np.lexsort((values[:, 1], values[:, 0]))[::-1]
+    front, best_second = [], -np.inf
+    for i in order:
+        if values[i, 1] > best_second:
+            front.append(i)
+            best_second = values[i, 1]
+    return grid.iloc[front]
+
+def _point(grid: pd.DataFrame, bigram_weight: float, unigram_weight: float, min_score: float) -> dict:
+    at = grid[
+        np.isclose(grid["bigram_weight"], bigram_weight)
+        & np.isclose(grid["unigram_weight"], unigram_weight)
+        & np.isclose(grid["min_score"], min_score)
+    ]
+    return at.iloc[0].to_dict() if len(at) else {}
+
+def run_tuning(
+    bigram_weights: Sequence[float] = cfg.TUNE_BIGRAM_WEIGHTS,
+    unigram_weights: Sequence[float] = cfg.TUNE_UNIGRAM_WEIGHTS,
+    min_scores: Sequence[float] = cfg.TUNE_MIN_SCORES,
+):
+    """Grid search of the department rule weights against the annotated profiles; writes the
+    full grid and the (rule_precision, rule_coverage) Pareto front under TUNING_DIR."""
+    lexicon = load_compiled_lexicon(cfg.DEPT_LEXICON_PATH, cfg.DEPT_LEXICON_COMPILED_PATH)
+    texts, truths = [], []
+    for profile_jobs in load_profiles(cfg.ANNOTATED_JSON_PATH):
+        if not isinstance(profile_jobs, list) or not profile_jobs:
+            continue
+        job = select_current_job(profile_jobs)
+        if not job or job.get("department") is None:
+            continue
+        texts.append(build_job_text(job))
+        truths.append(str(job["department"]))
+
+    default_id = lexicon.labels.id(cfg.DEPT_DEFAULT_LABEL)
+    truth = np.array([lexicon.labels.id(t) if t in lexicon.labels else -2 for t in truths], dtype=np.int64)
+    multi, single = hit_count_matrices(lexicon, texts)
+    grid = grid_search(multi, single, truth, default_id, bigram_weights, unigram_weights, min_scores)
+    front = pareto_front(grid, ("rule_precision", "rule_coverage"))
+
+    best = grid.sort_values(["accuracy", "rule_precision"], ascending=False).iloc[0].to_dict()
+    summary = {
+        "titles": len(texts),
+        "grid_points": len(grid),
+        "best_accuracy": best,
+        "configured": _point(grid, cfg.DEPT_BIGRAM_WEIGHT, cfg.DEPT_UNIGRAM_WEIGHT, cfg.DEPT_MIN_SCORE),
+        # hybrid_lexicon.engine.predict_department_rule defaults.
+        "hybrid_engine_default": _point(grid, 3.0, 1.0, 2.0),
+        "pareto_precision_coverage": front.to_dict(orient="records"),
+    }
+
+    cfg.TUNING_DIR.mkdir(parents=True, exist_ok=True)
+    grid.to_csv(cfg.TUNING_DIR / "dept_rule_weights_grid.csv", index=False)
+    front.to_csv(cfg.TUNING_DIR / "dept_rule_weights_pareto.csv", index=False)
+    summary_path = cfg.TUNING_DIR / "dept_rule_weights.json"
+    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    fmt = "{:.4f}".format
+    print(f"{len(grid)} (bigram_weight, unigram_weight, min_score) points over {len(texts)} annotated titles")
+    print(pd.DataFrame({k: summary[k] for k in ("best_accuracy", "configured", "hybrid_engine_default")}).T.to_string(float_format=fmt))
+    print(f"\nPareto front (rule_precision vs rule_coverage), {len(front)} points:")
+    print(front.to_string(index=False, float_format=fmt))
+    print(f"\nSaved: {summary_path}")
+    return summary
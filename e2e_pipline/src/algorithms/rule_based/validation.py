@@ -1,15 +1,23 @@
 import pandas as pd
 
 from config import rule_based as cfg
-from ...common.io import load_profiles, load_lexicon, save_df
+from ...common.instrumentation import start_run
+from ...common.io import load_profiles, save_df
+from ...common.lexicon import load_compiled_lexicon
 from ...common.current_job import select_current_job
-from ...common.text import build_job_text
-from ...common.metrics import print_metrics
-from .engine import predict_department_rule, predict_seniority_rule
+from ...common.text import build_job_text, normalize_cache_info
+from ...common.metrics import ConfusionMatrix
+from .engine import DepartmentRuleScorer, SeniorityRuleScorer
+from .batch import BatchDepartmentScorer, BatchSeniorityScorer
 
-def run_validation():
-    dept_lexicon = load_lexicon(cfg.DEPT_LEXICON_PATH)
-    sen_lexicon = load_lexicon(cfg.SEN_LEXICON_PATH)
+def run_validation(
+    batch_scoring: bool = cfg.BATCH_SCORING,
+    instrumentation: bool = cfg.INSTRUMENTATION,
+):
+    metrics = start_run(instrumentation)
+    with metrics.timer("load_models"):
+        dept_lexicon = load_compiled_lexicon(cfg.DEPT_LEXICON_PATH, cfg.DEPT_LEXICON_COMPILED_PATH)
+        sen_lexicon = load_compiled_lexicon(cfg.SEN_LEXICON_PATH, cfg.SEN_LEXICON_COMPILED_PATH)
 
     dept_params = {
         "bigram_weight": cfg.DEPT_BIGRAM_WEIGHT,
@@ -19,28 +27,55 @@ def run_validation():
         "sen_default": cfg.SEN_DEFAULT_LABEL,
     }
 
-    profiles = load_profiles(cfg.ANNOTATED_JSON_PATH)
+    dept_predict_args = {k: v for k, v in dept_params.items() if k != "sen_default"}
+    sen_default = dept_params.get("sen_default", "Professional")
 
-    rows = []
-    y_true_dept, y_pred_dept = [], []
-    y_true_sen, y_pred_sen = [], []
+    with metrics.timer("load_profiles"):
+        profiles = load_profiles(cfg.ANNOTATED_JSON_PATH)
+    metrics.count("profiles", len(profiles))
 
+    selected = []
     for i, profile_jobs in enumerate(profiles):
         if not isinstance(profile_jobs, list) or not profile_jobs:
             continue
 
-        job = select_current_job(profile_jobs)
+        with metrics.timer("select"):
+            job = select_current_job(profile_jobs)
         if not job:
             continue
 
-        text = build_job_text(job)
+        with metrics.timer("build_text"):
+            text = build_job_text(job)
+        selected.append((i, job, text))
 
-        dept_predict_args = {k: v for k, v in dept_params.items() if k != "sen_default"}
-        sen_default = dept_params.get("sen_default", "Professional")
+    with metrics.timer("score"):
+        if batch_scoring:
+            texts = [text for _, _, text in selected]
+            dept_batch = BatchDepartmentScorer(dept_lexicon, **dept_predict_args)
+            sen_batch = BatchSeniorityScorer(sen_lexicon, default_label=sen_default)
+            dept_res = dept_batch.score(texts)
+            sen_res = sen_batch.score(texts)
+            predictions = list(zip(
+                dept_batch.labels_of(dept_res),
+                dept_res.best_scores.tolist(),
+                sen_batch.labels_of(sen_res),
+                (sen_res.counts.max(axis=1) > 0).tolist() if len(texts) else [],
+            ))
+        else:
+            dept_scorer = DepartmentRuleScorer(dept_lexicon, **dept_predict_args)
+            sen_scorer = SeniorityRuleScorer(sen_lexicon, default_label=sen_default)
+            predictions = []
+            for _, _, text in selected:
+                dept_id, dept_best, _ = dept_scorer.score(text)
+                sen_id, sen_hits = sen_scorer.score(text)
+                predictions.append(
+                    (dept_scorer.label_name(dept_id), dept_best, sen_scorer.label_name(sen_id), bool(sen_hits))
+                )
 
-        dept_pred, dept_dbg = predict_department_rule(text, dept_lexicon, **dept_predict_args)
-        sen_pred, sen_dbg = predict_seniority_rule(text, sen_lexicon, default_label=sen_default)
+    rows = []
+    dept_cm, sen_cm = ConfusionMatrix(), ConfusionMatrix()
 
+    for (i, job, _), (dept_pred, dept_best_score, sen_pred, _) in zip(selected, predictions):
         dept_true = job.get("department")
         sen_true = job.get("seniority")
 
@@ -54,18 +89,31 @@ def run_validation():
             "dept_pred": dept_pred,
             "sen_true": sen_true,
             "sen_pred": sen_pred,
-            "dept_best_score": dept_dbg.get("best_score"),
+            "dept_best_score": dept_best_score,
         })
 
         if dept_true is not None:
-            y_true_dept.append(str(dept_true))
-            y_pred_dept.append(str(dept_pred))
+            dept_cm.update(str(dept_true), str(dept_pred))
         if sen_true is not None:
-            y_true_sen.append(str(sen_true))
-            y_pred_sen.append(str(sen_pred))
+            sen_cm.update(str(sen_true), str(sen_pred))
 
     df = pd.DataFrame(rows)
     #save_df(df, cfg.PRED_ANNOTATED_PATH)
 
-    print_metrics(y_true_dept, y_pred_dept, "Department")
-    print_metrics(y_true_sen, y_pred_sen, "Seniority")
\ No newline at end of file
+    dept_cm.print_report("Department")
+    sen_cm.print_report("Seniority")
+
+    if metrics.enabled:
+        dept_rule = sum(best >= cfg.DEPT_MIN_SCORE for _, best, _, _ in predictions)
+        sen_rule = sum(hit for _, _, _, hit in predictions)
+        for stage, rule in (("department", dept_rule), ("seniority", sen_rule)):
+            metrics.count(f"{stage}.source.Rule", rule)
+            metrics.count(f"{stage}.source.Fallback", len(predictions) - rule)
+            metrics.count(f"{stage}.source.Empty", len(profiles) - len(predictions))
+        metrics.gauge("department.accuracy", dept_cm.accuracy())
+        metrics.gauge("seniority.accuracy", sen_cm.accuracy())
+        info = normalize_cache_info()
+        metrics.cache("normalize_text", info.hits, info.misses)
+    report = metrics.write_report(cfg.VALIDATION_METRICS_PATH, algorithm="rule_based", mode="validation")
+    if report:
+        print(f"Metrics: {report}")
\ No newline at end of file
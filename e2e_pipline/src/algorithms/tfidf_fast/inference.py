@@ -0,0 +1,109 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import tfidf_fast as cfg
+from ...common.instrumentation import METRICS, start_run
+from ...common.io import load_profiles, save_df
+from ...common.current_job import select_current_job, select_current_jobs_bulk
+from ...common.text import normalize_text
+from ...common.tfidf import TfidfClassifier, load_tfidf_classifier
+
+def load_models():
+    dept_model = load_tfidf_classifier(
+        cfg.DEPT_TRAIN_CSV_PATH, cfg.DEPT_MODEL_PATH, "Department", cfg.TARGET_PRECISION
+    )
+    sen_model = load_tfidf_classifier(
+        cfg.SEN_TRAIN_CSV_PATH, cfg.SEN_MODEL_PATH, "Seniority", cfg.TARGET_PRECISION
+    )
+    return dept_model, sen_model
+
+def predict_batched(model: TfidfClassifier, texts, fallback_label: str = None, batch_size: int = cfg.BATCH_SIZE):
+    """Distinct texts are vectorized and scored once, in sparse chunks of `batch_size`.
+    With a fallback label, predictions under the calibrated threshold are replaced by it.
+    Empty texts are not scored: they get EMPTY_LABEL with confidence 0."""
+    codes, uniq = pd.factorize(pd.Series(texts, dtype=object))
+    labels = np.full(len(uniq), cfg.EMPTY_LABEL, dtype=object)
+    confs = np.zeros(len(uniq), dtype=np.float64)
+    scored = np.flatnonzero([bool(t) for t in uniq])
+    for start in range(0, len(scored), batch_size):
+        idx = scored[start:start + batch_size]
+        labels[idx], confs[idx] = model.predict(uniq[idx].tolist())
+    if fallback_label is not None:
+        labels[scored[confs[scored] < model.threshold]] = fallback_label
+    return labels[codes], confs[codes], len(scored)
+
+def score_titles(texts, dept_model, sen_model):
+    start = time.perf_counter()
+    with METRICS.timer("department"):
+        dept_pred, dept_conf, n_unique = predict_batched(dept_model, texts, cfg.DEPT_FALLBACK_LABEL)
+    with METRICS.timer("seniority"):
+        sen_pred, sen_conf, _ = predict_batched(sen_model, texts, cfg.SEN_FALLBACK_LABEL)
+    elapsed = time.perf_counter() - start
+
+    if METRICS.enabled:
+        METRICS.count("unique_titles", n_unique)
+        scored = np.fromiter((bool(t) for t in texts), dtype=bool, count=len(texts))
+        for stage, conf, model in (("department", dept_conf, dept_model), ("seniority", sen_conf, sen_model)):
+            accepted = int(((conf >= model.threshold) & scored).sum())
+            METRICS.count(f"{stage}.source.TF-IDF", accepted)
+            METRICS.count(f"{stage}.source.Fallback", int(scored.sum()) - accepted)
+            METRICS.count(f"{stage}.source.Empty", len(texts) - int(scored.sum()))
+
+    rate = len(texts) / elapsed if elapsed > 0 else float("inf")
+    print(f"Scored {len(texts)} titles ({n_unique} unique) in {elapsed:.3f}s ({rate:,.0f} titles/s)")
+    return {
+        "dept_pred": dept_pred,
+        "dept_confidence": dept_conf,
+        "sen_pred": sen_pred,
+        "sen_confidence": sen_conf,
+    }
+
+def run_inference(
+    bulk_current_job: bool = cfg.BULK_CURRENT_JOB,
+    instrumentation: bool = cfg.INSTRUMENTATION,
+):
+    print("=== TF-IDF FAST ===")
+    metrics = start_run(instrumentation)
+    with metrics.timer("load_models"):
+        dept_model, sen_model = load_models()
+
+    with metrics.timer("load_profiles"):
+        profiles = load_profiles(cfg.NOT_ANNOTATED_JSON_PATH)
+    metrics.count("profiles", len(profiles))
+    profile_jobs = [p if isinstance(p, list) else p.get("experiences", []) for p in profiles]
+    with metrics.timer("select_current_job"):
+        if bulk_current_job:
+            current_jobs = select_current_jobs_bulk(profile_jobs)
+        else:
+            current_jobs = [select_current_job(jobs) for jobs in profile_jobs]
+
+    rows, texts = [], []
+    for i, job in enumerate(current_jobs):
+        if not job:
+            continue
+        rows.append({
+            "profile_idx": i,
+            "organization": job.get("organization"),
+            "position": job.get("position"),
+            "startDate": job.get("startDate"),
+            "endDate": job.get("endDate"),
+            "status": job.get("status"),
+            "linkedin": job.get("linkedin"),
+        })
+        texts.append(normalize_text(job.get("position", "")))
+
+    metrics.count("department.source.Empty", len(profiles) - len(rows))
+    metrics.count("seniority.source.Empty", len(profiles) - len(rows))
+
+    df = pd.DataFrame(rows)
+    for col, values in score_titles(texts, dept_model, sen_model).items():
+        df[col] = values
+
+    with metrics.timer("write_output"):
+        save_df(df, cfg.PREDICTIONS_PATH)
+    print(f"Saved: {cfg.PREDICTIONS_PATH}")
+    report = metrics.write_report(cfg.INFERENCE_METRICS_PATH, algorithm="tfidf_fast", mode="inference")
+    if report:
+        print(f"Metrics: {report}")
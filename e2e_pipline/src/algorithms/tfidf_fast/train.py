@@ -0,0 +1,11 @@
+from config import tfidf_fast as cfg
+from ...common.tfidf import train_tfidf_file
+
+def train():
+    print("=== TF-IDF FAST: training ===")
+    for task_name, csv_path, model_path in (
+        ("Department", cfg.DEPT_TRAIN_CSV_PATH, cfg.DEPT_MODEL_PATH),
+        ("Seniority", cfg.SEN_TRAIN_CSV_PATH, cfg.SEN_MODEL_PATH),
+    ):
+        train_tfidf_file(csv_path, model_path, task_name, cfg.TARGET_PRECISION)
+        print(f"Saved: {model_path}")
@@ -0,0 +1,46 @@
+from config import tfidf_fast as cfg
+from ...common.instrumentation import start_run
+from ...common.io import load_profiles
+from ...common.current_job import select_current_job
+from ...common.metrics import ConfusionMatrix
+from ...common.text import normalize_text
+from .inference import load_models, score_titles
+
+def run_validation(instrumentation: bool = cfg.INSTRUMENTATION):
+    metrics = start_run(instrumentation)
+    with metrics.timer("load_models"):
+        dept_model, sen_model = load_models()
+
+    with metrics.timer("load_profiles"):
+        profiles = load_profiles(cfg.ANNOTATED_JSON_PATH)
+    metrics.count("profiles", len(profiles))
+
+    selected = []
+    with metrics.timer("select_current_job"):
+        for p in profiles:
+            jobs = p if isinstance(p, list) else p.get("experiences", [])
+            job = select_current_job(jobs)
+            if job:
+                selected.append(job)
+
+    texts = [normalize_text(job.get("position", "")) for job in selected]
+    preds = score_titles(texts, dept_model, sen_model)
+
+    dept_cm, sen_cm = ConfusionMatrix(), ConfusionMatrix()
+    for job, dept_pred, sen_pred in zip(selected, preds["dept_pred"], preds["sen_pred"]):
+        dept_true = job.get("department")
+        sen_true = job.get("seniority")
+        if dept_true is not None:
+            dept_cm.update(str(dept_true), str(dept_pred))
+        if sen_true is not None:
+            sen_cm.update(cfg.SEN_TRUTH_MAP.get(str(sen_true), str(sen_true)), str(sen_pred))
+
+    dept_cm.print_report("Department")
+    sen_cm.print_report("Seniority")
+
+    if metrics.enabled:
+        metrics.gauge("department.accuracy", dept_cm.accuracy())
+        metrics.gauge("seniority.accuracy", sen_cm.accuracy())
+    report = metrics.write_report(cfg.VALIDATION_METRICS_PATH, algorithm="tfidf_fast", mode="validation")
+    if report:
+        print(f"Metrics: {report}")
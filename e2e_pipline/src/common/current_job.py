@@ -2,6 +2,11 @@ import re
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
+_YYYY_MM_RE = re.compile(r"\d{4}-\d{2}")
+_YYYY_RE = re.compile(r"\d{4}")
+
 def _parse_yyyy_mm(s: Optional[str]) -> Optional[datetime]:
     if not s or not isinstance(s, str):
         return None
@@ -35,4 +40,73 @@ def select_current_job(experiences: List[Dict[str, Any]]) -> Optional[Dict[str,
         return (1 if d else 0, d or datetime.min)
 
     pool_sorted = sorted(pool, key=key_fn, reverse=True)
-    return pool_sorted[0] if pool_sorted else None
\ No newline at end of file
+    return pool_sorted[0] if pool_sorted else None
+
+def _start_month(s: Any) -> int:
+    # Months since year 0, or -1 when the date is missing/unparseable (same rules as _parse_yyyy_mm).
+    if not s or not isinstance(s, str):
+        return -1
+    s = s.strip()
+    if _YYYY_MM_RE.fullmatch(s):
+        year, month = int(s[:4]), int(s[5:])
+    elif _YYYY_RE.fullmatch(s):
+        year, month = int(s), 1
+    else:
+        return -1
+    if year < 1 or not 1 <= month <= 12:
+        return -1
+    return year * 12 + month - 1
+
+def flatten_experiences(
+    profiles: List[List[Dict[str, Any]]],
+) -> Tuple[List[Dict[str, Any]], Dict[str, np.ndarray]]:
+    exps: List[Dict[str, Any]] = []
+    profile_idx: List[int] = []
+    status_active: List[bool] = []
+    end_null: List[bool] = []
+    start: List[int] = []
+
+    for i, experiences in enumerate(profiles):
+        if not experiences:
+            continue
+        for e in experiences:
+            if not isinstance(e, dict):
+                continue
+            exps.append(e)
+            profile_idx.append(i)
+            status_active.append((e.get("status") or "").strip().upper() == "ACTIVE")
+            end_null.append(e.get("endDate") in (None, "", "null"))
+            start.append(_start_month(e.get("startDate")))
+
+    columns = {
+        "profile_idx": np.asarray(profile_idx, dtype=np.int64),
+        "status_active": np.asarray(status_active, dtype=bool),
+        "end_null": np.asarray(end_null, dtype=bool),
+        "start": np.asarray(start, dtype=np.int64),
+    }
+    return exps, columns
+
+def select_current_jobs_bulk(profiles: List[List[Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+    out: List[Optional[Dict[str, Any]]] = [None] * len(profiles)
+    exps, cols = flatten_experiences(profiles)
+    if not exps:
+        return out
+
+    pidx = cols["profile_idx"]
+    active = cols["status_active"] | cols["end_null"]
+    # Lexicographic (active, has_date, date) packed into one int; missing dates sort below any real one.
+    key = active.astype(np.int64) << 32 | (cols["start"] + 1)
+
+    # Experiences are emitted profile by profile, so every group is a contiguous run.
+    starts = np.flatnonzero(np.r_[True, pidx[1:] != pidx[:-1]])
+    group = np.cumsum(np.r_[True, pidx[1:] != pidx[:-1]]) - 1
+
+    group_max = np.maximum.reduceat(key, starts)
+    pos = np.arange(len(key))
+    # First experience reaching the group max, mirroring the stable sort in select_current_job.
+    winner_pos = np.where(key == group_max[group], pos, len(key))
+    winners = np.minimum.reduceat(winner_pos, starts)
+
+    for p, w in zip(pidx[starts].tolist(), winners.tolist()):
+        out[p] = exps[w]
+    return out
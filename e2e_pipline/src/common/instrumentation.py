@@ -0,0 +1,203 @@
+import json
+import time
+import tracemalloc
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .io import atomic_write
+
+# Histogram upper bounds in seconds: 1 us doubling up to ~67 s, plus an overflow bucket.
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** i for i in range(27))
+
+class Histogram:
+    """Fixed log2 latency buckets; quantiles are read back as the bucket's upper bound."""
+    __slots__ = ("counts", "n", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.n = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.n += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        if not self.n:
+            return 0.0
+        rank, seen = q * self.n, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.n,
+            "sum_s": self.total,
+            "mean_s": self.total / self.n if self.n else 0.0,
+            "min_s": self.min if self.n else 0.0,
+            "max_s": self.max,
+            "p50_s": self.quantile(0.50),
+            "p95_s": self.quantile(0.95),
+            "p99_s": self.quantile(0.99),
+            "buckets": {
+                (f"le_{LATENCY_BUCKETS[i]:.6g}" if i < len(LATENCY_BUCKETS) else "le_inf"): c
+                for i, c in enumerate(self.counts) if c
+            },
+        }
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        if self.metrics.track_memory:
+            self.metrics._memory_enter()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        if self.metrics.track_memory:
+            self.metrics._memory_exit(self.name)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class Metrics:
+    """Counters, latency histograms and gauges for one run.
+
+    Disabled, every method returns after one attribute check and timer() hands back a shared
+    no-op context manager, so call sites can stay in hot paths. Counter pairs named
+    `<x>.hits` / `<x>.misses` are reported as hit rates.
+
+    With `track_memory` (set by the --profile-memory mode while tracemalloc is tracing) timers
+    also record the traced-memory peak of their stage, and top-level stages keep a
+    tracemalloc snapshot taken on the exit that set that peak (grouped into allocation sites
+    only when reported)."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.track_memory = False
+        self.reset()
+
+    def reset(self) -> None:
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.gauges: Dict[str, float] = {}
+        self.memory_peaks: Dict[str, int] = {}
+        self.memory_snapshots: Dict[str, tracemalloc.Snapshot] = {}
+        self._memory_stack: List[int] = []
+        self.started = time.time()
+
+    def _memory_enter(self) -> None:
+        # tracemalloc has a single peak; fold it into the enclosing stage before resetting.
+        if self._memory_stack:
+            self._memory_stack[-1] = max(self._memory_stack[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._memory_stack.append(0)
+
+    def _memory_exit(self, name: str) -> None:
+        peak = max(self._memory_stack.pop(), tracemalloc.get_traced_memory()[1])
+        previous = self.memory_peaks.get(name, -1)
+        self.memory_peaks[name] = max(previous, peak)
+        if self._memory_stack:
+            self._memory_stack[-1] = max(self._memory_stack[-1], peak)
+        elif peak > previous:
+            # Per-item stages exit once per title; only the call that raised the peak is kept.
+            self.memory_snapshots[name] = tracemalloc.take_snapshot()
+
+    def count(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def count_all(self, prefix: str, values: Iterable[str]) -> None:
+        """One counter per distinct value, e.g. prediction sources."""
+        if self.enabled:
+            for v in values:
+                name = f"{prefix}.{v}"
+                self.counters[name] = self.counters.get(name, 0) + 1
+
+    def observe(self, name: str, seconds: float) -> None:
+        if self.enabled:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram()
+            hist.observe(seconds)
+
+    def gauge(self, name: str, value: float) -> None:
+        if self.enabled:
+            self.gauges[name] = value
+
+    def cache(self, name: str, hits: int, misses: int) -> None:
+        """Record a cache's cumulative hit/miss totals."""
+        if self.enabled:
+            self.counters[f"{name}.hits"] = hits
+            self.counters[f"{name}.misses"] = misses
+
+    def timer(self, name: str):
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def hit_rates(self) -> Dict[str, float]:
+        rates = {}
+        for name, hits in self.counters.items():
+            if name.endswith(".hits"):
+                base = name[:-len(".hits")]
+                total = hits + self.counters.get(f"{base}.misses", 0)
+                rates[base] = hits / total if total else 0.0
+        return rates
+
+    def report(self, **meta: Any) -> Dict[str, Any]:
+        report = {
+            **meta,
+            "started": self.started,
+            "duration_s": time.time() - self.started,
+            "counters": dict(sorted(self.counters.items())),
+            "hit_rates": self.hit_rates(),
+            "gauges": dict(sorted(self.gauges.items())),
+            "timers": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+        }
+        if self.memory_peaks:
+            report["memory_peak_mb"] = {name: peak / 2 ** 20 for name, peak in self.memory_peaks.items()}
+        return report
+
+    def write_report(self, path: Path, **meta: Any) -> Optional[Path]:
+        """Write report() as JSON; a no-op returning None when disabled."""
+        if not self.enabled:
+            return None
+        path = Path(path)
+        with atomic_write(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.report(**meta), indent=2, ensure_ascii=False))
+        return path
+
+# Process-wide registry, shared by the engines and the run_* entry points.
+METRICS = Metrics()
+
+def start_run(enabled: bool) -> Metrics:
+    """Reset METRICS for a new run_inference/run_validation and switch it on or off. Memory
+    profiling needs the stage timers, so it keeps them on regardless."""
+    METRICS.reset()
+    METRICS.enabled = enabled or METRICS.track_memory
+    return METRICS
@@ -1,10 +1,17 @@
 import json
+import os
+import pickle
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import IO, Any, Dict, Iterator, List, Optional
 
 import pandas as pd
 
+from .text import normalize_text
+
 def load_profiles(json_path: Path) -> List[Any]:
+    if Path(json_path).suffix == ".jsonl":
+        return list(iter_profiles(json_path))
     with open(json_path, "r", encoding="utf-8") as f:
         data = json.load(f)
     if isinstance(data, list):
@@ -16,10 +23,57 @@ def load_profiles(json_path: Path) -> List[Any]:
         return [data]
     return []
 
-def load_lexicon(path: Path) -> Dict[str, List[str]]:
+def iter_profiles(json_path: Path) -> Iterator[Any]:
+    """Profiles one at a time. A .jsonl file is read line by line, so it may be larger than
+    memory; any other file goes through load_profiles."""
+    if Path(json_path).suffix != ".jsonl":
+        yield from load_profiles(json_path)
+        return
+    with open(json_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def load_lexicon(path: Path, fold: bool = True) -> Dict[str, List[str]]:
     with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+        lexicon = json.load(f)
+    # Terms go through the same normalizer as titles so folded and unfolded spellings meet.
+    return {label: [normalize_text(t, fold=fold) for t in terms] for label, terms in lexicon.items()}
 
 def save_df(df: pd.DataFrame, path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(path, index=False)
\ No newline at end of file
+    df.to_csv(path, index=False)
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "wb", encoding: str = None) -> Iterator[IO]:
+    """A temp file next to `path` that replaces it only when the block succeeds, so readers
+    never see a half-written file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+def save_stamped_pickle(obj: Any, header: Dict[str, Any], path: Path) -> None:
+    with atomic_write(path) as f:
+        # Header first, as its own pickle, so staleness checks never unpickle the payload.
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def load_stamped_pickle(path: Path, header: Dict[str, Any], kind: type) -> Optional[Any]:
+    """The payload written by save_stamped_pickle, or None when the file is missing, stamped
+    with another header, not a `kind`, or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            if pickle.load(f) != header:
+                return None
+            obj = pickle.load(f)
+    except Exception:
+        # Truncated or garbled bytes can make unpickling raise almost anything
+        # (UnicodeDecodeError, TypeError, struct.error, ...); callers rebuild.
+        return None
+    return obj if isinstance(obj, kind) else None
@@ -0,0 +1,183 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .io import atomic_write
+from .lexicon import LabelVocab
+from .lookup import build_lookup
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+KNN_FORMAT_VERSION = 1
+ENCODE_BATCH_SIZE = 256
+EMBEDDING_CACHE_SIZE = 1 << 16
+
+def encode_texts(encoder, texts: Sequence[str], batch_size: int = ENCODE_BATCH_SIZE) -> np.ndarray:
+    """L2-normalized float32 embeddings from a sentence-transformers body (SetFitModel.model_body)."""
+    emb = encoder.encode(
+        list(texts), batch_size=batch_size, convert_to_numpy=True,
+        normalize_embeddings=True, show_progress_bar=False,
+    )
+    return np.asarray(emb, dtype=np.float32)
+
+@dataclass
+class KnnIndex:
+    """Labeled-title embeddings stored as an L2-normalized float16 matrix, one row per
+    distinct normalized title (its majority label, as in build_lookup)."""
+    embeddings: np.ndarray
+    label_ids: np.ndarray
+    labels: LabelVocab
+    texts: List[str]
+    source_hash: str
+    encoder_id: str
+    hnsw: Optional[object] = None
+
+    def __post_init__(self):
+        # BLAS has no float16 GEMM; upcast once at load instead of on every query.
+        self._matrix = np.ascontiguousarray(self.embeddings, dtype=np.float32)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k (row indices, cosine similarities) per query, best first."""
+        k = min(k, len(self.texts))
+        if self.hnsw is not None:
+            idx, dist = self.hnsw.knn_query(queries, k=k)
+            return idx.astype(np.int64), 1.0 - dist
+        sims = queries @ self._matrix.T
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1, kind="stable")
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_sims, order, axis=1)
+
+def _source_hash(csv_path: Path, encoder_id: str) -> str:
+    digest = hashlib.sha256(Path(csv_path).read_bytes())
+    digest.update(f"|{KNN_FORMAT_VERSION}|{encoder_id}".encode())
+    return digest.hexdigest()
+
+def build_knn_index(
+    csv_path: Path, index_dir: Path, encoder, encoder_id: str, use_hnsw: bool = False
+) -> KnnIndex:
+    """Encode every distinct labeled title once and write the index to `index_dir`."""
+    lookup = build_lookup(csv_path)
+    texts = list(lookup)
+    labels = LabelVocab(sorted(set(lookup.values())))
+    label_ids = np.array([labels.id(lookup[t]) for t in texts], dtype=np.int16)
+    embeddings = encode_texts(encoder, texts).astype(np.float16)
+
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    np.save(index_dir / "embeddings.npy", embeddings)
+    np.save(index_dir / "label_ids.npy", label_ids)
+    hnsw = None
+    if use_hnsw:
+        hnsw = _build_hnsw(embeddings.astype(np.float32))
+        hnsw.save_index(str(index_dir / "hnsw.bin"))
+    meta = {
+        "format": KNN_FORMAT_VERSION,
+        "source_hash": _source_hash(csv_path, encoder_id),
+        "encoder_id": encoder_id,
+        "labels": labels.names,
+        "texts": texts,
+    }
+    # meta.json goes last: an index without it (interrupted build) is treated as missing.
+    with atomic_write(index_dir / "meta.json", "w", encoding="utf-8") as f:
+        f.write(json.dumps(meta, ensure_ascii=False))
+
+    return KnnIndex(embeddings, label_ids, labels, texts, meta["source_hash"], encoder_id, hnsw)
+
+def _build_hnsw(matrix: np.ndarray):
+    if hnswlib is None:
+        raise ImportError("hnswlib is not installed; set KNN_USE_HNSW = False or `pip install hnswlib`")
+    index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+    index.init_index(max_elements=len(matrix), ef_construction=200, M=16)
+    index.add_items(matrix, np.arange(len(matrix)))
+    index.set_ef(64)
+    return index
+
+def load_knn_index(
+    csv_path: Path, index_dir: Path, encoder, encoder_id: str, use_hnsw: bool = False
+) -> KnnIndex:
+    """Open the index in `index_dir`, rebuilding it when the CSV or the encoder changed."""
+    index_dir = Path(index_dir)
+    try:
+        meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        meta = None
+    if (
+        meta is None
+        or meta.get("format") != KNN_FORMAT_VERSION
+        or meta.get("source_hash") != _source_hash(csv_path, encoder_id)
+        or (use_hnsw and not (index_dir / "hnsw.bin").exists())
+    ):
+        print(f"Building kNN index: {index_dir}")
+        return build_knn_index(csv_path, index_dir, encoder, encoder_id, use_hnsw=use_hnsw)
+
+    embeddings = np.load(index_dir / "embeddings.npy")
+    hnsw = None
+    if use_hnsw:
+        if hnswlib is None:
+            raise ImportError("hnswlib is not installed; set KNN_USE_HNSW = False or `pip install hnswlib`")
+        hnsw = hnswlib.Index(space="ip", dim=embeddings.shape[1])
+        hnsw.load_index(str(index_dir / "hnsw.bin"), max_elements=embeddings.shape[0])
+        hnsw.set_ef(64)
+    return KnnIndex(
+        embeddings=embeddings,
+        label_ids=np.load(index_dir / "label_ids.npy"),
+        labels=LabelVocab(meta["labels"]),
+        texts=meta["texts"],
+        source_hash=meta["source_hash"],
+        encoder_id=encoder_id,
+        hnsw=hnsw,
+    )
+
+class KnnClassifier:
+    """Drop-in for the SetFit model in predict_hybrid_smart: similarity-weighted top-k vote
+    over the index, exposed as predict_proba() + labels. Each distinct title is encoded once;
+    embeddings are cached so explain() after predict_proba() costs a search, not an encode."""
+
+    def __init__(self, index: KnnIndex, encoder, k: int = 10):
+        self.index = index
+        self.encoder = encoder
+        self.k = k
+        self.labels = list(index.labels.names)
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        missing = list(dict.fromkeys(t for t in texts if t not in self._cache))
+        if missing:
+            if len(self._cache) + len(missing) > EMBEDDING_CACHE_SIZE:
+                self._cache.clear()
+            for text, vec in zip(missing, encode_texts(self.encoder, missing)):
+                self._cache[text] = vec
+        return np.stack([self._cache[t] for t in texts])
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        texts = list(texts)
+        proba = np.zeros((len(texts), len(self.labels)), dtype=np.float64)
+        if not texts:
+            return proba
+        idx, sims = self.index.search(self.embed(texts), self.k)
+        weights = np.clip(sims, 0.0, None).astype(np.float64)
+        rows = np.repeat(np.arange(len(texts)), idx.shape[1])
+        np.add.at(proba, (rows, self.index.label_ids[idx].ravel()), weights.ravel())
+        totals = proba.sum(axis=1, keepdims=True)
+        np.divide(proba, totals, out=proba, where=totals > 0)
+        return proba
+
+    def explain(self, text: str, k: int = None) -> List[dict]:
+        """Nearest labeled titles behind a prediction, best first."""
+        idx, sims = self.index.search(self.embed([text]), k or self.k)
+        return [
+            {
+                "text": self.index.texts[i],
+                "label": self.labels[self.index.label_ids[i]],
+                "similarity": round(float(s), 4),
+            }
+            for i, s in zip(idx[0].tolist(), sims[0].tolist())
+        ]
@@ -0,0 +1,278 @@
+import hashlib
+import re
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .io import load_lexicon, load_stamped_pickle, save_stamped_pickle
+from .matcher import TermMatcher, is_word_char
+
+# Bump whenever CompiledLexicon/TermMatcher internals or the term normalization change, so
+# stale artifacts get rebuilt instead of unpickled into the wrong shape.
+LEXICON_FORMAT_VERSION = 2
+
+_RUN_RE = re.compile(r"\w+")
+
+class LabelVocab:
+    """Label <-> small int mapping fixed at lexicon-compile time. Id -1 is reserved for the
+    caller's default label, which is often not part of the lexicon."""
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(names)
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, label: str) -> bool:
+        return label in self.ids
+
+    def id(self, label: str) -> int:
+        return self.ids.get(label, -1)
+
+    def name(self, label_id: int, default: str = None) -> str:
+        return self.names[label_id] if label_id >= 0 else default
+
+    def decode(self, label_ids: np.ndarray, default: str = None) -> List[str]:
+        names = np.asarray(self.names + [default], dtype=object)
+        return names[np.asarray(label_ids, dtype=np.int64)].tolist()
+
+class TokenPrefilter:
+    """Cheap necessary condition for any lexicon hit, checked over the title's \\w-runs.
+
+    Every term gets one anchor run. With word-bounded matching every run of a term shows up
+    as a whole run in the title, so one run goes in `exact`. Substring-matched multi-word
+    terms ("ops manager" inside "devops managers") only guarantee their interior runs. When
+    there are none, the last run must prefix a title run or the first must suffix one. A term
+    without any \\w character disables the filter. may_match() never rejects a title the
+    full scan would hit."""
+
+    def __init__(self, terms: Sequence[str], substring: Sequence[bool]):
+        self.exact = set()
+        self.prefixes = set()
+        self.suffixes = set()
+        self.always_scan = False
+        for term, is_substring in zip(terms, substring):
+            runs = [(m.start(), m.end()) for m in _RUN_RE.finditer(term)]
+            if not runs:
+                self.always_scan = True
+                continue
+            if is_substring:
+                exact = [r for r in runs if r[0] > 0 and r[1] < len(term)]
+            else:
+                exact = runs
+            if exact:
+                a, b = max(exact, key=lambda r: r[1] - r[0])
+                self.exact.add(term[a:b])
+                continue
+            (a0, b0), (a1, b1) = runs[0], runs[-1]
+            candidates = []
+            if a1 > 0:
+                candidates.append((b1 - a1, self.prefixes, term[a1:b1]))
+            if b0 < len(term):
+                candidates.append((b0 - a0, self.suffixes, term[a0:b0]))
+            if not candidates:
+                self.always_scan = True
+                continue
+            _, anchors, run = max(candidates, key=lambda c: c[0])
+            anchors.add(run)
+        # Bucket affix anchors by their shortest common head/tail so a run costs one dict hit.
+        self._prefix_len = min(map(len, self.prefixes), default=0)
+        self._suffix_len = min(map(len, self.suffixes), default=0)
+        self._prefix_index: Dict[str, List[str]] = {}
+        self._suffix_index: Dict[str, List[str]] = {}
+        for x in self.prefixes:
+            self._prefix_index.setdefault(x[:self._prefix_len], []).append(x)
+        for x in self.suffixes:
+            self._suffix_index.setdefault(x[len(x) - self._suffix_len:], []).append(x)
+        self.passed = 0
+        self.rejected = 0
+
+    def may_match(self, t: str) -> bool:
+        if self.always_scan or self._any_anchor(t):
+            self.passed += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def _any_anchor(self, t: str) -> bool:
+        runs = _RUN_RE.findall(t)
+        if not self.exact.isdisjoint(runs):
+            return True
+        prefix_index, prefix_len = self._prefix_index, self._prefix_len
+        suffix_index, suffix_len = self._suffix_index, self._suffix_len
+        if not (prefix_index or suffix_index):
+            return False
+        for run in runs:
+            if prefix_index:
+                heads = prefix_index.get(run[:prefix_len])
+                if heads and any(run.startswith(x) for x in heads):
+                    return True
+            if suffix_index:
+                tails = suffix_index.get(run[len(run) - suffix_len:])
+                if tails and any(run.endswith(x) for x in tails):
+                    return True
+        return False
+
+    def stats(self) -> Dict[str, int]:
+        return {"passed": self.passed, "rejected": self.rejected}
+
+def _at_boundary(t: str, pos: int) -> bool:
+    before = pos > 0 and is_word_char(t[pos - 1])
+    after = pos < len(t) and is_word_char(t[pos])
+    return before != after
+
+@dataclass
+class CompiledLexicon:
+    labels: LabelVocab
+    terms: List[str]
+    is_multiword: List[bool]
+    term_labels: List[Tuple[Tuple[int, int], ...]]
+    label_terms: List[List[Tuple[int, str]]]
+    matcher: TermMatcher
+    _seen: bytearray = field(init=False, repr=False)
+    _touched: List[int] = field(init=False, repr=False)
+    _prefilters: Dict[bool, TokenPrefilter] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._seen = bytearray(len(self.terms))
+        self._touched = []
+        # Built at compile time so they are pickled into the artifact with the automaton.
+        self._prefilters = {
+            False: TokenPrefilter(self.terms, self.is_multiword),
+            True: TokenPrefilter(self.terms, [False] * len(self.terms)),
+        }
+
+    def prefilter(self, boundary: bool = False) -> TokenPrefilter:
+        """Prefilter matching count_hits(boundary=...) semantics."""
+        return self._prefilters[boundary]
+
+    def new_counts(self) -> array:
+        return array("l", bytes(array("l").itemsize * len(self.labels)))
+
+    def count_hits(self, t: str, multi_out: array, single_out: array, boundary: bool = False) -> None:
+        """Add per-label hit counts for `t` (already normalized) into the two buffers.
+
+        boundary=False is the department rule: multi-word terms are substring checks and single
+        words need (?<!\\w)term(?!\\w). boundary=True is the seniority rule, \\bterm\\b for every
+        term. Each distinct term counts once per lexicon entry. Not thread-safe."""
+        seen, touched = self._seen, self._touched
+        multi, term_labels = self.is_multiword, self.term_labels
+        m = self.matcher
+        goto, fail, out = m._goto, m._fail, m._out
+        n = len(t)
+
+        state = 0
+        for i, ch in enumerate(t):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for tid, length in out[state]:
+                if seen[tid]:
+                    continue
+                start = i + 1 - length
+                if boundary:
+                    if not (_at_boundary(t, start) and _at_boundary(t, i + 1)):
+                        continue
+                elif not multi[tid]:
+                    if start and is_word_char(t[start - 1]):
+                        continue
+                    if i + 1 < n and is_word_char(t[i + 1]):
+                        continue
+                seen[tid] = 1
+                touched.append(tid)
+                dst = multi_out if multi[tid] else single_out
+                for j, c in term_labels[tid]:
+                    dst[j] += c
+
+        for tid in touched:
+            seen[tid] = 0
+        touched.clear()
+
+    def term_hits(self, t: str, boundary: bool = False) -> List[int]:
+        hits = set()
+        n = len(t)
+        for tid, start, end in self.matcher.iter_matches(t):
+            if tid in hits:
+                continue
+            if boundary:
+                ok = _at_boundary(t, start) and _at_boundary(t, end)
+            else:
+                ok = self.is_multiword[tid] or (
+                    (start == 0 or not is_word_char(t[start - 1]))
+                    and (end == n or not is_word_char(t[end]))
+                )
+            if ok:
+                hits.add(tid)
+        return sorted(hits)
+
+def compile_lexicon(lexicon: Dict[str, Sequence[str]]) -> CompiledLexicon:
+    labels = LabelVocab(lexicon)
+    terms: List[str] = []
+    term_ids: Dict[str, int] = {}
+    counts: List[Dict[int, int]] = []
+    label_terms: List[List[Tuple[int, str]]] = []
+
+    for j, label_term_list in enumerate(lexicon.values()):
+        entries = []
+        for term in label_term_list:
+            term_n = term.strip().lower()
+            if not term_n:
+                continue
+            tid = term_ids.get(term_n)
+            if tid is None:
+                tid = term_ids[term_n] = len(terms)
+                terms.append(term_n)
+                counts.append({})
+            counts[tid][j] = counts[tid].get(j, 0) + 1
+            entries.append((tid, term))
+        label_terms.append(entries)
+
+    return CompiledLexicon(
+        labels=labels,
+        terms=terms,
+        is_multiword=[" " in t for t in terms],
+        term_labels=[tuple(c.items()) for c in counts],
+        label_terms=label_terms,
+        matcher=TermMatcher(terms),
+    )
+
+def as_compiled(lexicon) -> CompiledLexicon:
+    return lexicon if isinstance(lexicon, CompiledLexicon) else compile_lexicon(lexicon)
+
+
+def _artifact_header(source_bytes: bytes, fold: bool) -> Dict[str, object]:
+    return {
+        "format": LEXICON_FORMAT_VERSION,
+        "source_hash": hashlib.sha256(source_bytes).hexdigest(),
+        "fold": fold,
+    }
+
+def save_compiled_lexicon(compiled: CompiledLexicon, header: Dict[str, object], artifact_path: Path) -> None:
+    save_stamped_pickle(compiled, header, artifact_path)
+
+def _read_artifact(artifact_path: Path, header: Dict[str, object]) -> Optional[CompiledLexicon]:
+    return load_stamped_pickle(artifact_path, header, CompiledLexicon)
+
+def compile_lexicon_file(json_path: Path, artifact_path: Path, fold: bool = True) -> CompiledLexicon:
+    """Compile the lexicon JSON and write the artifact unconditionally."""
+    source_bytes = Path(json_path).read_bytes()
+    compiled = compile_lexicon(load_lexicon(json_path, fold=fold))
+    save_compiled_lexicon(compiled, _artifact_header(source_bytes, fold), artifact_path)
+    return compiled
+
+def load_compiled_lexicon(json_path: Path, artifact_path: Path = None, fold: bool = True) -> CompiledLexicon:
+    """Load the compiled artifact for `json_path`, rebuilding it when the JSON's sha256, the
+    fold flag or LEXICON_FORMAT_VERSION no longer match. Without an artifact path this is
+    just compile_lexicon(load_lexicon(...))."""
+    if artifact_path is None:
+        return compile_lexicon(load_lexicon(json_path, fold=fold))
+
+    header = _artifact_header(Path(json_path).read_bytes(), fold)
+    compiled = _read_artifact(artifact_path, header)
+    if compiled is None:
+        compiled = compile_lexicon_file(json_path, artifact_path, fold=fold)
+    return compiled
@@ -0,0 +1,370 @@
+import json
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from .io import atomic_write, load_stamped_pickle, save_stamped_pickle
+
+# Ported from Rule-based_old/build_department_lexicon.py and generate_seniority_lexicon.py.
+STOP = {
+    "und", "oder", "der", "die", "das", "im", "in", "am", "an", "auf", "für", "mit", "von", "zu",
+    "de", "la", "le", "les", "du", "des", "et", "en", "au", "aux",
+    "of", "and", "the", "to", "for", "with", "on", "at", "from", "as",
+    "bei", "ins", "zum", "zur", "vom", "über", "ueber", "unter", "zwischen",
+    "avec", "pour", "par", "dans", "sur", "sans", "chez",
+    "or", "is", "are", "was", "were", "be", "been", "being",
+}
+SENIORITY_STOP = {"und", "oder", "of", "and", "the", "for", "with", "in", "at"}
+
+GENERIC_JOB_WORDS = {
+    # English
+    "manager", "management", "senior", "junior", "director", "head", "lead", "officer",
+    "assistant", "specialist", "consultant", "analyst", "executive", "coordinator",
+    "project", "projects", "strategy", "developer", "application", "applications",
+    "operations", "business", "development", "vp", "vice", "president", "chief", "ceo", "cfo", "cto",
+    "cio", "coo", "founder", "cofounder", "co-founder", "owner", "partner", "sr", "sen",
+    # German (role/seniority words that are not department-specific)
+    "leiter", "leiterin", "leitung", "teamleiter", "teamleitung", "bereichsleiter", "bereichsleitung",
+    "geschäftsführer", "geschäftsführerin", "geschäftsführung", "geschäftsleitung", "vorstand",
+    "prokurist", "prokuristin", "assistenz", "assistent", "assistentin", "sekretariat", "sekretärin",
+    # French
+    "chef", "responsable", "directeur", "directrice", "administrateur", "administratrice",
+}
+
+LEGAL_FORM_WORDS = {
+    "gmbh", "ag", "kg", "kgaa", "gbr", "ohg", "eg", "ev", "e.v", "bv", "nv",
+    "inc", "ltd", "llc", "sarl", "s.a", "sa", "plc", "co",
+}
+
+BRAND_REGION_NOISE = {
+    "volkswagen", "keysight", "jaguar", "rover", "land rover", "jaguar land", "swiss",
+    "dach", "emea", "eemea", "europe", "west europe", "south west", "dach central",
+    "life sciences", "sciences", "beauty", "speaker", "printmedien",
+    "central eastern", "eastern europe", "eastern", "northern europe", "dach region", "europe region",
+    "west", "south", "north", "european",
+    "crm sharepoint", "salesforce chez", "sap salesforce", "systems cutting", "cutting tools",
+    "service digital", "digital systems", "healthcare it",
+}
+
+GENERIC_NON_DEPT_NOISE = {
+    "service", "services", "tool", "tools", "event", "events", "market", "markets",
+    "international", "global", "regional", "region", "country",
+    "customer", "clients", "account", "accounts", "solutions", "solution",
+    "digital", "transformation", "innovation", "platform", "products", "product",
+    "commercial", "retail", "industry", "industries", "business",
+}
+
+TOKEN_PATTERN = r"(?u)\b[\w\-\+\.]{2,}\b"
+
+# Cap on (classes x vocabulary) score cells materialized at once while ranking candidates.
+RANK_BLOCK_CELLS = 1 << 24
+
+# Bump whenever LexiconStats internals or the term counting change, so stale stores get
+# rebuilt instead of unpickled into the wrong shape.
+STATS_FORMAT_VERSION = 1
+
+def is_bad_department_term(t: str) -> bool:
+    if t in STOP:
+        return True
+    parts = t.split()
+    # Bigrams with a stopword ("of marketing"), legal forms ("gmbh co"), brand/region and broad
+    # non-department noise, codes, and role/seniority words (left to the seniority lexicon).
+    if len(parts) == 2 and (parts[0] in STOP or parts[1] in STOP):
+        return True
+    if any(p in LEGAL_FORM_WORDS for p in parts):
+        return True
+    if t in BRAND_REGION_NOISE or t in GENERIC_NON_DEPT_NOISE:
+        return True
+    if sum(ch.isalnum() for ch in t) < 3:
+        return True
+    if any(p in GENERIC_JOB_WORDS for p in parts):
+        return True
+    if len(parts) == 1 and len(parts[0]) <= 2:
+        return True
+    return len(t) < 3
+
+def is_bad_seniority_term(t: str) -> bool:
+    return len(t) < 3 or t in SENIORITY_STOP
+
+@dataclass(frozen=True)
+class LexiconSpec:
+    """How one lexicon is built: candidate terms are ranked per class by mean TF-IDF in the
+    class minus mean TF-IDF outside it, the best `pool_size` survive `bad_term`, and terms
+    pooled by several classes are pruned.
+
+    fill_overlapping=False keeps only terms pooled by exactly one class (seniority).
+    With True, classes short of `size` unique terms are topped up with terms shared by at
+    most three classes, then with any pooled term (department)."""
+    vectorizer: Dict[str, Any]
+    pool_size: int
+    size: int
+    bad_term: Callable[[str], bool]
+    positive_only: bool = False
+    fill_overlapping: bool = False
+    sort_classes: bool = False
+
+DEPARTMENT_SPEC = LexiconSpec(
+    vectorizer={"ngram_range": (1, 2), "min_df": 2, "max_df": 0.8, "token_pattern": TOKEN_PATTERN},
+    pool_size=1000,
+    size=60,
+    bad_term=is_bad_department_term,
+    fill_overlapping=True,
+    sort_classes=True,
+)
+
+SENIORITY_SPEC = LexiconSpec(
+    vectorizer={"ngram_range": (1, 2), "token_pattern": TOKEN_PATTERN},
+    pool_size=100,
+    size=50,
+    bad_term=is_bad_seniority_term,
+    positive_only=True,
+)
+
+def one_hot(label_ids: np.ndarray, n_classes: int) -> sparse.csr_matrix:
+    n = len(label_ids)
+    return sparse.csr_matrix(
+        (np.ones(n, dtype=np.float64), (np.arange(n), label_ids)), shape=(n, n_classes)
+    )
+
+def class_sums(X: sparse.spmatrix, label_ids: np.ndarray, n_classes: int) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """Per-class column sums of X and class sizes, from one sparse product Y.T @ X."""
+    Y = one_hot(label_ids, n_classes)
+    return sparse.csr_matrix(Y.T @ X), np.bincount(label_ids, minlength=n_classes)
+
+def rank_candidates(
+    sums: sparse.csr_matrix,
+    counts: np.ndarray,
+    valid: np.ndarray,
+    pool_size: int,
+    positive_only: bool = False,
+) -> List[np.ndarray]:
+    """Top `pool_size` valid term ids per class by mean-in minus mean-out, best first (ties
+    by term id). Classes are scored in dense blocks of RANK_BLOCK_CELLS cells, so memory
+    does not grow with the number of classes."""
+    n_classes, n_terms = sums.shape
+    n = counts.sum()
+    total = np.asarray(sums.sum(axis=0)).ravel()
+    block = max(1, RANK_BLOCK_CELLS // max(1, n_terms))
+    k = min(pool_size, n_terms)
+    pools: List[np.ndarray] = []
+    for lo in range(0, n_classes, block):
+        rows = sums[lo:lo + block].toarray()
+        size_in = counts[lo:lo + block, None].astype(np.float64)
+        size_out = n - size_in
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_in = np.where(size_in > 0, rows / size_in, 0.0)
+            mean_out = np.where(size_out > 0, (total - rows) / size_out, 0.0)
+        score = mean_in - mean_out
+        score[:, ~valid] = -np.inf
+        if positive_only:
+            score[score <= 0] = -np.inf
+        if k == 0:
+            pools.extend(np.empty(0, dtype=np.int64) for _ in range(len(rows)))
+            continue
+        top = np.argpartition(-score, k - 1, axis=1)[:, :k]
+        top_score = np.take_along_axis(score, top, axis=1)
+        order = np.lexsort((top, -top_score), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_score = np.take_along_axis(top_score, order, axis=1)
+        for r in range(len(rows)):
+            pools.append(top[r][np.isfinite(top_score[r])])
+    return pools
+
+def prune_overlaps(pools: Sequence[np.ndarray], n_terms: int, size: int, fill_overlapping: bool) -> List[np.ndarray]:
+    """Keep up to `size` terms per class: terms pooled by one class first, then (with
+    fill_overlapping) terms shared by at most three classes, then the rest; pool order within
+    each tier. One sort over all (class, term) pairs instead of a loop per class."""
+    if not len(pools):
+        return []
+    lengths = np.array([len(p) for p in pools], dtype=np.int64)
+    cls = np.repeat(np.arange(len(pools)), lengths)
+    tid = np.concatenate(pools).astype(np.int64) if lengths.sum() else np.empty(0, dtype=np.int64)
+    rank = np.arange(len(tid)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    shared = np.bincount(tid, minlength=n_terms)[tid]
+    tier = np.where(shared == 1, 0, np.where(shared <= 3, 1, 2))
+    keep = tier == 0 if not fill_overlapping else np.ones(len(tid), dtype=bool)
+    cls, tid, rank, tier = cls[keep], tid[keep], rank[keep], tier[keep]
+
+    order = np.lexsort((rank, tier, cls))
+    cls, tid = cls[order], tid[order]
+    starts = np.searchsorted(cls, np.arange(len(pools)))
+    pos = np.arange(len(cls)) - starts[cls]
+    selected = pos < size
+    cls, tid = cls[selected], tid[selected]
+    bounds = np.searchsorted(cls, np.arange(len(pools) + 1))
+    return [tid[bounds[c]:bounds[c + 1]] for c in range(len(pools))]
+
+def select_terms(
+    sums: sparse.csr_matrix, counts: np.ndarray, terms: np.ndarray, spec: LexiconSpec
+) -> List[np.ndarray]:
+    """Candidate ranking and overlap pruning on per-class sums; term ids per class."""
+    valid = np.fromiter((not spec.bad_term(t) for t in terms), dtype=bool, count=len(terms))
+    pools = rank_candidates(sums, counts, valid, spec.pool_size, positive_only=spec.positive_only)
+    return prune_overlaps(pools, len(terms), spec.size, spec.fill_overlapping)
+
+def class_order(labels: Sequence[str], sort_classes: bool) -> List[str]:
+    uniq = list(dict.fromkeys(labels))
+    return sorted(uniq) if sort_classes else uniq
+
+def build_lexicon(texts: Sequence[str], labels: Sequence[str], spec: LexiconSpec) -> Dict[str, List[str]]:
+    """label -> terms, best first, from labeled titles."""
+    classes = class_order(labels, spec.sort_classes)
+    class_ids = {c: i for i, c in enumerate(classes)}
+    label_ids = np.fromiter((class_ids[label] for label in labels), dtype=np.int64, count=len(labels))
+
+    vec = TfidfVectorizer(lowercase=True, **spec.vectorizer)
+    X = vec.fit_transform(texts)
+    terms = vec.get_feature_names_out()
+    sums, counts = class_sums(X, label_ids, len(classes))
+    selected = select_terms(sums, counts, terms, spec)
+    return {c: terms[ids].tolist() for c, ids in zip(classes, selected)}
+
+def write_lexicon(lexicon: Dict[str, List[str]], json_path: Path) -> None:
+    """Write the lexicon JSON atomically, so readers never see a half-written file."""
+    with atomic_write(json_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(lexicon, ensure_ascii=False, indent=2))
+
+def row_hashes(texts: Sequence[str], labels: Sequence[str]) -> np.ndarray:
+    """One uint64 per labeled title, to tell which rows a stats store has already folded."""
+    return pd.util.hash_pandas_object(
+        pd.DataFrame({"text": list(texts), "label": list(labels)}), index=False
+    ).to_numpy()
+
+class LexiconStats:
+    """Term counts of every folded title, by label, so a lexicon can be re-ranked after new
+    titles arrive without re-tokenizing the old ones.
+
+    The TF-IDF weights themselves cannot be kept per class: idf, min_df / max_df and each row's
+    l2 norm all move when titles are added. Re-weighting the stored counts is a few vectorized
+    passes over their non-zeros, so an update costs tokenizing the new rows plus those passes,
+    and lexicon() equals build_lexicon() over all folded rows."""
+
+    def __init__(self, spec: LexiconSpec):
+        self.vectorizer = dict(spec.vectorizer)
+        self.terms: List[str] = []
+        self.classes: List[str] = []
+        self._term_ids: Dict[str, int] = {}
+        self._class_ids: Dict[str, int] = {}
+        self.counts = sparse.csr_matrix((0, 0), dtype=np.int64)
+        self.df = np.zeros(0, dtype=np.int64)
+        self.label_ids = np.zeros(0, dtype=np.int64)
+        self.row_hashes = np.zeros(0, dtype=np.uint64)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.label_ids)
+
+    def fold(self, texts: Sequence[str], labels: Sequence[str], hashes: np.ndarray = None) -> None:
+        """Count the terms of new labeled titles (same analyzer as the full build)."""
+        analyze = TfidfVectorizer(lowercase=True, **self.vectorizer).build_analyzer()
+        indices, data, indptr = [], [], [0]
+        for text in texts:
+            for term, c in Counter(analyze(text)).items():
+                tid = self._term_ids.get(term)
+                if tid is None:
+                    tid = self._term_ids[term] = len(self.terms)
+                    self.terms.append(term)
+                indices.append(tid)
+                data.append(c)
+            indptr.append(len(indices))
+        for label in labels:
+            if label not in self._class_ids:
+                self._class_ids[label] = len(self.classes)
+                self.classes.append(label)
+
+        new = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.int64), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(texts), len(self.terms)),
+        )
+        # CountVectorizer's row layout (ids by first appearance, sorted per row), so the l2 norms
+        # and class sums are summed in the same order and come out bitwise equal.
+        new.sort_indices()
+        old = self.counts.copy()
+        old.resize((self.n_rows, len(self.terms)))
+        self.counts = sparse.csr_matrix(sparse.vstack([old, new], format="csr"))
+        self.df = np.pad(self.df, (0, len(self.terms) - len(self.df)))
+        self.df += np.bincount(new.indices, minlength=len(self.terms))
+        self.label_ids = np.concatenate([self.label_ids, [self._class_ids[label] for label in labels]]).astype(np.int64)
+        if hashes is None:
+            hashes = row_hashes(texts, labels)
+        self.row_hashes = np.concatenate([self.row_hashes, np.asarray(hashes, dtype=np.uint64)])
+
+    def _vocabulary(self) -> np.ndarray:
+        """Term ids kept by min_df / max_df, in the full build's (alphabetical) order."""
+        n = self.n_rows
+        min_df, max_df = self.vectorizer.get("min_df", 1), self.vectorizer.get("max_df", 1.0)
+        min_count = min_df if isinstance(min_df, int) else min_df * n
+        max_count = max_df if isinstance(max_df, int) else max_df * n
+        kept = np.flatnonzero((self.df >= min_count) & (self.df <= max_count))
+        return kept[np.argsort(np.asarray(self.terms, dtype=object)[kept], kind="stable")]
+
+    def tfidf(self) -> Tuple[sparse.csr_matrix, np.ndarray]:
+        """The folded rows as TfidfVectorizer.fit_transform would weight them, and their terms."""
+        v = self.vectorizer
+        cols = self._vocabulary()
+        X = sparse.csr_matrix(self.counts[:, cols], dtype=np.float64)
+        if v.get("sublinear_tf", False):
+            np.log(X.data, X.data)
+            X.data += 1.0
+        if v.get("use_idf", True):
+            smooth = v.get("smooth_idf", True)
+            df = self.df[cols].astype(np.float64) + float(smooth)
+            idf = np.full_like(df, fill_value=self.n_rows + int(smooth))
+            idf /= df
+            np.log(idf, out=idf)
+            idf += 1.0
+            X.data *= idf[X.indices]
+        if v.get("norm", "l2") is not None:
+            X = normalize(X, norm=v.get("norm", "l2"), copy=False)
+        return X, np.asarray(self.terms, dtype=object)[cols]
+
+    def lexicon(self, spec: LexiconSpec) -> Dict[str, List[str]]:
+        classes = class_order(self.classes, spec.sort_classes)
+        position = {c: i for i, c in enumerate(classes)}
+        remap = np.array([position[c] for c in self.classes], dtype=np.int64)
+        X, terms = self.tfidf()
+        sums, counts = class_sums(X, remap[self.label_ids], len(classes))
+        selected = select_terms(sums, counts, terms, spec)
+        return {c: terms[ids].tolist() for c, ids in zip(classes, selected)}
+
+def _stats_header(spec: LexiconSpec) -> Dict[str, object]:
+    return {"format": STATS_FORMAT_VERSION, "vectorizer": sorted(spec.vectorizer.items())}
+
+def save_stats(stats: LexiconStats, spec: LexiconSpec, stats_path: Path) -> None:
+    save_stamped_pickle(stats, _stats_header(spec), stats_path)
+
+def load_stats(spec: LexiconSpec, stats_path: Path) -> Optional[LexiconStats]:
+    """The stored stats, or None when missing, unreadable or built with another format /
+    vectorizer."""
+    return load_stamped_pickle(stats_path, _stats_header(spec), LexiconStats)
+
+def update_lexicon(
+    texts: Sequence[str], labels: Sequence[str], spec: LexiconSpec, stats_path: Path
+) -> Tuple[Dict[str, List[str]], int, bool]:
+    """Fold the rows past the ones already in the store at `stats_path` and re-rank.
+
+    Rows are expected to be appended: when the stored rows are no longer a prefix of `texts`
+    (edited, removed or reordered titles), the store is rebuilt from all rows.
+    Returns (lexicon, rows folded, whether the store was rebuilt)."""
+    hashes = row_hashes(texts, labels)
+    stats = load_stats(spec, stats_path)
+    rebuilt = (
+        stats is None
+        or stats.n_rows > len(texts)
+        or not np.array_equal(stats.row_hashes, hashes[:stats.n_rows])
+    )
+    if rebuilt:
+        stats = LexiconStats(spec)
+    start = stats.n_rows
+    if start < len(texts):
+        stats.fold(texts[start:], labels[start:], hashes[start:])
+        save_stats(stats, spec, stats_path)
+    return stats.lexicon(spec), len(texts) - start, rebuilt
@@ -0,0 +1,20 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict
+
+import pandas as pd
+
+from .text import normalize_text
+
+def build_lookup(csv_path: Path, fold: bool = True) -> Dict[str, str]:
+    """Normalized title -> label from a `text,label` CSV. Titles labeled differently across rows
+    take the majority label; ties go to the label seen first."""
+    df = pd.read_csv(csv_path)
+    votes: Dict[str, Counter] = {}
+    for text, label in zip(df["text"], df["label"]):
+        if pd.isna(text) or pd.isna(label):
+            continue
+        key = normalize_text(str(text), fold=fold)
+        if key:
+            votes.setdefault(key, Counter())[str(label)] += 1
+    return {key: counts.most_common(1)[0][0] for key, counts in votes.items()}
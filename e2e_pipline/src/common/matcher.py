@@ -0,0 +1,59 @@
+from collections import deque
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+def is_word_char(ch: str) -> bool:
+    # Same definition as \w for str patterns in the re module.
+    return ch.isalnum() or ch == "_"
+
+class TermMatcher:
+    """Aho-Corasick automaton reporting every occurrence of every term in one pass over the text."""
+
+    def __init__(self, terms: Sequence[str]):
+        self.terms: List[str] = list(terms)
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[Tuple[int, int]]] = [[]]
+
+        for tid, term in enumerate(self.terms):
+            if not term:
+                continue
+            state = 0
+            for ch in term:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append((tid, len(term)))
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt].extend(out[fail[nxt]])
+
+        self._goto = goto
+        self._fail = fail
+        self._out: List[Tuple[Tuple[int, int], ...]] = [tuple(o) for o in out]
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = i + 1
+                for tid, length in out[state]:
+                    yield tid, end - length, end
@@ -1,14 +1,117 @@
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from typing import Dict, Iterable, List, Optional
 
-def print_metrics(y_true, y_pred, task_name: str) -> None:
-    if not y_true:
-        print(f"\n{task_name}: No ground truth available")
-        return
+import numpy as np
+
+class ConfusionMatrix:
+    """Streaming confusion matrix over interned labels.
+
+    update() costs one dict lookup and one integer increment per prediction, so validation
+    never has to keep y_true / y_pred around; accuracy and per-class precision / recall / F1
+    are derived from the counts (zero_division=0, as in the sklearn report this replaces).
+    Matrices from worker shards combine with merge() or `+`, whatever their label order."""
+
+    def __init__(self, labels: Iterable[str] = ()):
+        self.labels: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._counts = np.zeros((8, 8), dtype=np.int64)
+        for label in labels:
+            self._intern(label)
+
+    def _intern(self, label: str) -> int:
+        idx = self._ids.get(label)
+        if idx is None:
+            idx = self._ids[label] = len(self.labels)
+            self.labels.append(label)
+            if idx >= len(self._counts):
+                grown = np.zeros((2 * len(self._counts),) * 2, dtype=np.int64)
+                grown[:idx, :idx] = self._counts[:idx, :idx]
+                self._counts = grown
+        return idx
+
+    def update(self, y_true: str, y_pred: str, n: int = 1) -> None:
+        i, j = self._intern(y_true), self._intern(y_pred)
+        self._counts[i, j] += n
+
+    def update_many(self, y_true: Iterable[str], y_pred: Iterable[str]) -> None:
+        true_ids = np.fromiter((self._intern(y) for y in y_true), dtype=np.int64)
+        pred_ids = np.fromiter((self._intern(y) for y in y_pred), dtype=np.int64)
+        np.add.at(self._counts, (true_ids, pred_ids), 1)
+
+    def merge(self, other: "ConfusionMatrix") -> "ConfusionMatrix":
+        ids = np.array([self._intern(label) for label in other.labels], dtype=np.int64)
+        if len(ids):
+            self._counts[np.ix_(ids, ids)] += other.matrix()
+        return self
 
-    print(f"\n=== {task_name} ===")
-    print(f"Accuracy: {accuracy_score(y_true, y_pred):.4f}")
+    def __add__(self, other: "ConfusionMatrix") -> "ConfusionMatrix":
+        return ConfusionMatrix().merge(self).merge(other)
 
-    labels = sorted(set(y_true) | set(y_pred))
-    print(f"Labels: {labels}")
-    print(f"\nConfusion matrix:\n{confusion_matrix(y_true, y_pred, labels=labels)}")
-    print(f"\nClassification report:\n{classification_report(y_true, y_pred, labels=labels, zero_division=0)}")
\ No newline at end of file
+    @property
+    def total(self) -> int:
+        return int(self.matrix().sum())
+
+    def matrix(self, labels: Optional[List[str]] = None) -> np.ndarray:
+        """Counts as [true, pred], in interning order or in the order of `labels`."""
+        n = len(self.labels)
+        if labels is None:
+            return self._counts[:n, :n].copy()
+        ids = [self._ids[label] for label in labels]
+        return self._counts[np.ix_(ids, ids)]
+
+    def accuracy(self) -> float:
+        m = self.matrix()
+        total = m.sum()
+        return float(np.trace(m) / total) if total else 0.0
+
+    def per_class(self, labels: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        m = self.matrix(labels)
+        tp = np.diag(m).astype(np.float64)
+        support = m.sum(axis=1)
+        predicted = m.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(predicted > 0, tp / predicted, 0.0)
+            recall = np.where(support > 0, tp / support, 0.0)
+            denom = precision + recall
+            f1 = np.where(denom > 0, 2 * precision * recall / denom, 0.0)
+        return {"precision": precision, "recall": recall, "f1": f1, "support": support}
+
+    def classification_report(self, labels: Optional[List[str]] = None, digits: int = 2) -> str:
+        """Text table in the layout of sklearn's classification_report."""
+        labels = sorted(self.labels) if labels is None else labels
+        stats = self.per_class(labels)
+        support = stats["support"]
+        total = int(support.sum())
+        name_width = max((len(label) for label in labels), default=0)
+        width = max(name_width, len("weighted avg"), digits)
+        head_fmt = "{:>{width}s} " + " {:>9}" * 4
+        row_fmt = "{:>{width}s} " + " {:>9.{digits}f}" * 3 + " {:>9}\n"
+        report = head_fmt.format("", "precision", "recall", "f1-score", "support", width=width) + "\n\n"
+        for i, label in enumerate(labels):
+            report += row_fmt.format(
+                label, stats["precision"][i], stats["recall"][i], stats["f1"][i], int(support[i]), width=width, digits=digits
+            )
+        report += "\n"
+        accuracy_fmt = "{:>{width}s} " + " {:>9.{digits}}" * 2 + " {:>9.{digits}f}" + " {:>9}\n"
+        report += accuracy_fmt.format("accuracy", "", "", self.accuracy(), total, width=width, digits=digits)
+        weights = support / total if total else np.zeros(len(labels))
+        for name, avg in (("macro avg", np.mean), ("weighted avg", lambda v: float(np.dot(v, weights)))):
+            values = [avg(stats[k]) if len(labels) else 0.0 for k in ("precision", "recall", "f1")]
+            report += row_fmt.format(name, *values, total, width=width, digits=digits)
+        return report
+
+    def print_report(self, task_name: str) -> None:
+        if not self.total:
+            print(f"\n{task_name}: No ground truth available")
+            return
+
+        labels = sorted(self.labels)
+        print(f"\n=== {task_name} ===")
+        print(f"Accuracy: {self.accuracy():.4f}")
+        print(f"Labels: {labels}")
+        print(f"\nConfusion matrix:\n{self.matrix(labels)}")
+        print(f"\nClassification report:\n{self.classification_report(labels)}")
+
+def print_metrics(y_true, y_pred, task_name: str) -> None:
+    cm = ConfusionMatrix()
+    cm.update_many(y_true, y_pred)
+    cm.print_report(task_name)
@@ -0,0 +1,127 @@
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from config.base import ARTIFACTS_DIR
+from .instrumentation import METRICS
+
+PROFILE_DIR = ARTIFACTS_DIR / "profiles"
+SAMPLE_INTERVAL_S = 0.001
+TRACEMALLOC_FRAMES = 25
+TOP_FUNCTIONS = 20
+TOP_ALLOCATIONS = 15
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack every `interval` seconds into collapsed-stack counts
+    ("root;...;leaf" -> samples), the input format of flamegraph.pl, speedscope and inferno.
+    cProfile has per-function totals but no full call paths, hence the separate sampler."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL_S):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        return self.counts
+
+def write_collapsed(counts: Dict[str, int], path: Path) -> Path:
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, n in sorted(counts.items()):
+            f.write(f"{stack} {n}\n")
+    return path
+
+def _format_memory(peaks: Dict[str, int], snapshots: Dict[str, tracemalloc.Snapshot], snapshot) -> str:
+    lines = ["Peak traced memory per stage (MB):"]
+    lines += [f"  {name:<32} {peak / 2 ** 20:10.2f}" for name, peak in peaks.items()]
+    for name, stage_snapshot in snapshots.items():
+        lines += ["", f"Top allocation sites live at the end of stage {name}:"]
+        lines += [f"  {stat}" for stat in stage_snapshot.statistics("lineno")[:TOP_ALLOCATIONS]]
+    lines += ["", f"Top {TOP_ALLOCATIONS} allocation sites still live at exit (with tracebacks):"]
+    for stat in snapshot.statistics("traceback")[:TOP_ALLOCATIONS]:
+        lines.append(f"  {stat.size / 2 ** 20:.2f} MB in {stat.count} blocks")
+        lines += [f"    {line}" for line in stat.traceback.format(limit=5)]
+    return "\n".join(lines) + "\n"
+
+@contextmanager
+def profiling(name: str, out_dir: Path = PROFILE_DIR, cpu: bool = True, memory: bool = False):
+    """Profile the enclosed block.
+
+    cpu: cProfile stats to `<name>.pstats` (snakeviz, `python -m pstats`) and sampled stacks to
+    `<name>.collapsed` (flamegraph tools), plus the top functions by cumulative time on stdout.
+    memory: tracemalloc with per-stage peaks from the METRICS stage timers and the top
+    allocation sites, written to `<name>.memory.txt`. Tracing slows allocation-heavy code
+    several times over, so use it for where memory goes, not for timings."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if memory:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        METRICS.track_memory = True
+    profiler = sampler = None
+    if cpu:
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if cpu:
+            profiler.disable()
+            counts = sampler.stop()
+            pstats_path = out_dir / f"{name}.pstats"
+            profiler.dump_stats(pstats_path)
+            collapsed_path = write_collapsed(counts, out_dir / f"{name}.collapsed")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+            print(f"CPU profile -> {pstats_path}; {sum(counts.values())} stack samples -> {collapsed_path}")
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            METRICS.track_memory = False
+            # Stage timers reset the tracemalloc peak, so the run's peak is the max over stages.
+            peak = max(peak, *METRICS.memory_peaks.values(), 0)
+            peaks = dict(METRICS.memory_peaks, total=peak)
+            memory_path = out_dir / f"{name}.memory.txt"
+            memory_path.write_text(_format_memory(peaks, METRICS.memory_snapshots, snapshot), encoding="utf-8")
+            print(f"Peak traced memory {peak / 2 ** 20:.1f} MB; per-stage report -> {memory_path}")
+
+def add_profile_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--profile", action="store_true", help="Run under cProfile; write .pstats and a collapsed-stack file")
+    parser.add_argument("--profile-memory", action="store_true", help="Trace allocations with tracemalloc; report peak memory per stage and top allocation sites")
+    parser.add_argument("--profile-dir", type=Path, default=PROFILE_DIR)
+
+def run_profiled(name: str, func: Callable[[], Any], args: argparse.Namespace) -> Any:
+    """Call func(), under profiling() when --profile / --profile-memory were given."""
+    if not (args.profile or args.profile_memory):
+        return func()
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    with profiling(f"{name}_{stamp}_{os.getpid()}", args.profile_dir, cpu=args.profile, memory=args.profile_memory):
+        return func()
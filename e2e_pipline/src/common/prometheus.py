@@ -0,0 +1,133 @@
+import threading
+from http.server import BaseHTTPRequestHandler
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from .instrumentation import LATENCY_BUCKETS, Histogram
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Family:
+    kind = ""
+
+    def __init__(self, registry: "Registry", name: str, doc: str, labelnames: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Family):
+    kind = "counter"
+
+    def inc(self, n: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + n
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in sorted(self.values.items())]
+
+class Gauge(_Family):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self.registry.lock:
+            self.values[self._key(labels)] = value
+
+    def inc(self, n: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + n
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in sorted(self.values.items())]
+
+class HistogramFamily(_Family):
+    """Latency histograms on the instrumentation LATENCY_BUCKETS, exposed cumulatively."""
+    kind = "histogram"
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self.registry.lock:
+            hist = self.values.get(key)
+            if hist is None:
+                hist = self.values[key] = Histogram()
+            hist.observe(seconds)
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, hist in sorted(self.values.items()):
+            cumulative = 0
+            for i, c in enumerate(hist.counts):
+                cumulative += c
+                le = _number(LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float("inf"))
+                labels = _labels(self.labelnames, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(hist.total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {hist.n}")
+        return lines
+
+class Registry:
+    """Thread-safe in-process metric families rendered in the Prometheus text format.
+
+    Unlike the per-run METRICS report, values here are cumulative over the process lifetime
+    (counters only go up; rates and mixes over time come from PromQL). Collectors are called
+    at scrape time for values that are cheaper to read than to push, e.g. cache hit ratios."""
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self.lock = threading.Lock()
+        self.families: List[_Family] = []
+        self.collectors: List[Callable[[], None]] = []
+
+    def _add(self, cls, name: str, doc: str, labelnames: Sequence[str]):
+        family = cls(self, f"{self.namespace}_{name}" if self.namespace else name, doc, labelnames)
+        self.families.append(family)
+        return family
+
+    def counter(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter, name, doc, labelnames)
+
+    def gauge(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge, name, doc, labelnames)
+
+    def histogram(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> HistogramFamily:
+        return self._add(HistogramFamily, name, doc, labelnames)
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            collect()
+        lines = []
+        with self.lock:
+            for family in self.families:
+                lines += family.header() + family.render()
+        return "\n".join(lines) + "\n"
+
+def metrics_response(handler: BaseHTTPRequestHandler, registry: Registry) -> None:
+    """Answer a GET /metrics on an http.server handler."""
+    body = registry.render().encode("utf-8")
+    handler.send_response(200)
+    handler.send_header("Content-Type", CONTENT_TYPE)
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
@@ -1,12 +1,48 @@
 import re
-from typing import Any, Dict
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Optional
 
-def normalize_text(text: str) -> str:
+_WS_RE = re.compile(r"\s+")
+NORMALIZE_CACHE_SIZE = 1 << 16
+
+def _build_fold_table() -> Dict[int, Optional[str]]:
+    table: Dict[int, Optional[str]] = {}
+    # Latin-1 Supplement + Latin Extended-A/B: precompose once with NFKD instead of per character at runtime.
+    for cp in range(0x00C0, 0x0250):
+        ch = chr(cp)
+        base = "".join(c for c in unicodedata.normalize("NFKD", ch) if not unicodedata.combining(c))
+        if base and base != ch:
+            table[cp] = base.lower()
+    for cp in range(0x0300, 0x0370):
+        table[cp] = None
+    table.update({
+        ord("ß"): "ss", ord("æ"): "ae", ord("œ"): "oe", ord("ø"): "o",
+        ord("ł"): "l", ord("đ"): "d", ord("ð"): "d", ord("þ"): "th", ord("ı"): "i",
+    })
+    for sep in "&/|":
+        table[ord(sep)] = " "
+    for dash in "‐‑‒–—−":
+        table[ord(dash)] = "-"
+    return table
+
+_FOLD_TABLE = _build_fold_table()
+
+def fold_text(text: str) -> str:
+    return text.lower().translate(_FOLD_TABLE)
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_cached(text: str, fold: bool) -> str:
+    text = fold_text(text) if fold else text.lower()
+    return _WS_RE.sub(" ", text).strip()
+
+def normalize_text(text: str, fold: bool = True) -> str:
     if not isinstance(text, str):
         return ""
-    text = str(text).lower()
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    return _normalize_cached(text, fold)
+
+def normalize_cache_info():
+    return _normalize_cached.cache_info()
 
 def build_job_text(job: Dict[str, Any]) -> str:
     pos = str(job.get("position", "")).strip()
@@ -16,4 +52,4 @@ def build_job_text(job: Dict[str, Any]) -> str:
     parts = [f"Position: {pos}.", f"Organization: {org}."]
     if li:
         parts.append(f"LinkedIn: {li}.")
-    return " ".join(parts)
\ No newline at end of file
+    return " ".join(parts)
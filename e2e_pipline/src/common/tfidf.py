@@ -0,0 +1,187 @@
+import hashlib
+import math
+import pickle
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import classification_report, f1_score
+from sklearn.model_selection import train_test_split
+
+from .io import atomic_write
+from .text import normalize_text
+
+# Bump when training defaults or the pickled layout change so stale artifacts are retrained.
+TFIDF_FORMAT_VERSION = 1
+
+@dataclass
+class TfidfClassifier:
+    """TF-IDF + LogisticRegression tier (ported from Approach 6/model_improved.py).
+
+    `threshold` is calibrated on the held-out split: the lowest max-probability at which the
+    accepted predictions still reach `target_precision`. Below it the caller should escalate."""
+    vectorizer: TfidfVectorizer
+    clf: LogisticRegression
+    threshold: float
+    target_precision: float
+    source_hash: str = ""
+    format_version: int = TFIDF_FORMAT_VERSION
+    _analyzer: Callable[[str], List[str]] = field(init=False, repr=False, default=None)
+    _rows: Dict[str, Tuple[float, np.ndarray]] = field(init=False, repr=False, default=None)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_analyzer"] = state["_rows"] = None
+        return state
+
+    @property
+    def labels(self) -> List[str]:
+        return [str(c) for c in self.clf.classes_]
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        return self.clf.predict_proba(self.vectorizer.transform(texts))
+
+    def predict(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Batch predict on normalized texts -> (labels, max probabilities)."""
+        proba = self.predict_proba(texts)
+        return self.clf.classes_[proba.argmax(axis=1)], proba.max(axis=1)
+
+    def predict_one(self, text: str) -> Tuple[str, float]:
+        """Single-title scoring without building a sparse matrix: the same sublinear tf-idf,
+        l2 norm and multinomial softmax as predict_proba, summed over the few n-grams present."""
+        if self._rows is None:
+            self._build_rows()
+        counts: Dict[str, int] = {}
+        for gram in self._analyzer(text):
+            if gram in self._rows:
+                counts[gram] = counts.get(gram, 0) + 1
+
+        logits = self.clf.intercept_.copy()
+        if counts:
+            weights = {g: (1.0 + math.log(c)) * self._rows[g][0] for g, c in counts.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values()))
+            for gram, w in weights.items():
+                logits += (w / norm) * self._rows[gram][1]
+        if len(logits) == 1:
+            proba = np.array([1.0, 1.0]) / (1.0 + np.exp([logits[0], -logits[0]]))
+        else:
+            proba = np.exp(logits - logits.max())
+            proba /= proba.sum()
+        idx = int(np.argmax(proba))
+        return str(self.clf.classes_[idx]), float(proba[idx])
+
+    def _build_rows(self) -> None:
+        # Per-feature (idf, coefficient column), built lazily and kept out of the pickle.
+        coef_t = np.ascontiguousarray(self.clf.coef_.T)
+        idf = self.vectorizer.idf_
+        self._rows = {gram: (float(idf[j]), coef_t[j]) for gram, j in self.vectorizer.vocabulary_.items()}
+        self._analyzer = self.vectorizer.build_analyzer()
+
+def calibrate_threshold(confidences: np.ndarray, correct: np.ndarray, target_precision: float) -> float:
+    """Lowest confidence cut whose accepted set (conf >= cut) keeps precision >= target."""
+    order = np.argsort(-confidences, kind="stable")
+    conf, hit = confidences[order], correct[order].astype(np.float64)
+    precision = np.cumsum(hit) / np.arange(1, len(hit) + 1)
+    # A cut can only sit between distinct confidences; keep the last position of each run.
+    last_of_run = np.r_[conf[1:] != conf[:-1], True]
+    ok = np.flatnonzero((precision >= target_precision) & last_of_run)
+    return float(conf[ok[-1]]) if len(ok) else float("inf")
+
+def train_tfidf_logreg(
+    df: pd.DataFrame,
+    task_name: str,
+    random_state: int = 42,
+    test_size: float = 0.2,
+    target_precision: float = 0.95,
+    use_smote: bool = False,
+) -> TfidfClassifier:
+    if "text" not in df.columns or "label" not in df.columns:
+        raise ValueError(
+            f"[{task_name}] DataFrame must contain columns ['text','label']. "
+            f"Got: {df.columns.tolist()}"
+        )
+
+    X = df["text"]
+    y = df["label"]
+
+    stratify = y if (y.nunique() > 1 and y.value_counts().min() >= 2) else None
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y, test_size=test_size, random_state=random_state, stratify=stratify
+    )
+
+    vec = TfidfVectorizer(ngram_range=(1, 3), min_df=1, max_features=100_000, sublinear_tf=True)
+    X_train_vec = vec.fit_transform(X_train)
+    X_val_vec = vec.transform(X_val)
+
+    # Off by default: synthetic samples skew the probabilities the threshold is calibrated on.
+    if use_smote:
+        try:
+            from imblearn.over_sampling import SMOTE
+
+            min_samples = y_train.value_counts().min()
+            if min_samples >= 6:
+                smote = SMOTE(random_state=random_state, k_neighbors=min(5, min_samples - 1))
+                X_train_vec, y_train = smote.fit_resample(X_train_vec, y_train)
+                print(f"[{task_name}] Applied SMOTE: {len(y_train)} samples after resampling")
+        except ImportError:
+            print(f"[{task_name}] imbalanced-learn is not installed, continuing without SMOTE")
+
+    # Same objective as the Approach 6 model; lbfgs converges in seconds where saga hit max_iter.
+    clf = LogisticRegression(
+        max_iter=3000, class_weight="balanced", C=0.5, solver="lbfgs", random_state=random_state
+    )
+    clf.fit(X_train_vec, y_train)
+
+    proba = clf.predict_proba(X_val_vec)
+    y_pred = clf.classes_[proba.argmax(axis=1)]
+    threshold = calibrate_threshold(proba.max(axis=1), y_pred == y_val.to_numpy(), target_precision)
+
+    print(f"\n===== {task_name}: TF-IDF validation on CSV (train/val split) =====")
+    print(f"macro-F1: {f1_score(y_val, y_pred, average='macro'):.4f}")
+    print(classification_report(y_val, y_pred, digits=4, zero_division=0))
+    print(f"Calibrated threshold for {target_precision:.0%} precision: {threshold:.3f}")
+
+    return TfidfClassifier(vectorizer=vec, clf=clf, threshold=threshold, target_precision=target_precision)
+
+def load_labeled_csv(csv_path: Path) -> pd.DataFrame:
+    df = pd.read_csv(csv_path)[["text", "label"]].dropna()
+    df["text"] = df["text"].astype(str).map(normalize_text)
+    df["label"] = df["label"].astype(str)
+    return df[df["text"] != ""]
+
+def _source_hash(csv_path: Path, target_precision: float) -> str:
+    digest = hashlib.sha256(Path(csv_path).read_bytes())
+    digest.update(f"|{TFIDF_FORMAT_VERSION}|{target_precision}".encode())
+    return digest.hexdigest()
+
+def train_tfidf_file(
+    csv_path: Path, artifact_path: Path, task_name: str, target_precision: float = 0.95
+) -> TfidfClassifier:
+    """Train on a labeled `text,label` CSV and write the artifact unconditionally."""
+    model = train_tfidf_logreg(load_labeled_csv(csv_path), task_name, target_precision=target_precision)
+    model.source_hash = _source_hash(csv_path, target_precision)
+
+    with atomic_write(artifact_path) as f:
+        joblib.dump(model, f)
+    return model
+
+def load_tfidf_classifier(
+    csv_path: Path, artifact_path: Path, task_name: str, target_precision: float = 0.95
+) -> TfidfClassifier:
+    """Load the persisted tier, retraining when the CSV, the target precision or
+    TFIDF_FORMAT_VERSION changed since it was written."""
+    expected = _source_hash(csv_path, target_precision)
+    try:
+        model = joblib.load(artifact_path)
+        if isinstance(model, TfidfClassifier) and model.source_hash == expected:
+            return model
+    except (OSError, EOFError, pickle.UnpicklingError, struct.error, KeyError, AttributeError, ImportError, ValueError):
+        # Missing, truncated or stale artifact: retrain below.
+        pass
+    return train_tfidf_file(csv_path, artifact_path, task_name, target_precision=target_precision)
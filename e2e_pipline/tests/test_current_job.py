@@ -0,0 +1,69 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pytest
+
+from config import rule_based as cfg
+from src.common.current_job import select_current_job, select_current_jobs_bulk
+from src.common.io import load_profiles
+
+
+@pytest.mark.parametrize("path", [cfg.ANNOTATED_JSON_PATH, cfg.NOT_ANNOTATED_JSON_PATH], ids=["annotated", "not_annotated"])
+def test_bulk_matches_select_current_job(path):
+    profiles = load_profiles(path)
+    bulk = select_current_jobs_bulk(profiles)
+    assert len(bulk) == len(profiles)
+    for i, experiences in enumerate(profiles):
+        assert bulk[i] is select_current_job(experiences), i
+
+
+def _job(position, start=None, end=None, status=None):
+    job = {"position": position, "startDate": start, "endDate": end}
+    if status is not None:
+        job["status"] = status
+    return job
+
+
+EDGE_CASES = {
+    "empty": [],
+    "none": None,
+    "only_non_dicts": ["x", 3, None],
+    "non_dicts_mixed": ["x", _job("a", "2019-01", "2020-01"), None, _job("b", "2018-01", "2019-01")],
+    "missing_end_is_active": [_job("old", "2022-01", "2023-01"), _job("current", "2015-03")],
+    "null_string_end": [_job("old", "2022-01", "2023-01"), _job("current", "2015-03", "null")],
+    "status_active": [_job("a", "2021-01", "2022-01", status="active"), _job("b", "2023-01", "2024-01")],
+    "year_only": [_job("a", "2019", "2020"), _job("b", "2019-02", "2020")],
+    "year_only_equal": [_job("a", "2019", "2021"), _job("b", "2019-01", "2021")],
+    "no_dates": [_job("a"), _job("b", end="2020-01")],
+    "unparseable_dates": [_job("a", "soon", "2020"), _job("b", "2019-13", "2020"), _job("c", "2001", "2002")],
+    "ties_keep_first": [_job("a", "2020-05"), _job("b", "2020-05")],
+}
+
+
+@pytest.mark.parametrize("experiences", list(EDGE_CASES.values()), ids=list(EDGE_CASES))
+def test_bulk_edge_cases(experiences):
+    assert select_current_jobs_bulk([experiences])[0] is select_current_job(experiences)
+
+
+def test_bulk_edge_cases_together():
+    profiles = list(EDGE_CASES.values())
+    assert select_current_jobs_bulk(profiles) == [select_current_job(p) for p in profiles]
+
+
+@pytest.mark.parametrize("case, position", [
+    ("empty", None),
+    ("only_non_dicts", None),
+    ("non_dicts_mixed", "a"),
+    ("missing_end_is_active", "current"),
+    ("status_active", "a"),
+    ("year_only", "b"),
+    ("year_only_equal", "a"),
+    ("ties_keep_first", "a"),
+])
+def test_bulk_expected_choice(case, position):
+    job = select_current_jobs_bulk([EDGE_CASES[case]])[0]
+    assert (job or {}).get("position") == position
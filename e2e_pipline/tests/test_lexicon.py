@@ -0,0 +1,98 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import random
+import shutil
+
+import pytest
+
+from config import rule_based as cfg
+from src.common.io import load_profiles
+from src.common.lexicon import CompiledLexicon, compile_lexicon, load_compiled_lexicon
+from src.common.text import build_job_text, normalize_text
+
+
+def _garble(data: bytes) -> bytes:
+    rng = random.Random(0)
+    out = bytearray(data)
+    for pos in rng.sample(range(len(out)), 64):
+        out[pos] = rng.randrange(256)
+    return bytes(out)
+
+
+@pytest.fixture
+def compiled_artifact(tmp_path):
+    json_path = tmp_path / cfg.DEPT_LEXICON_PATH.name
+    shutil.copy(cfg.DEPT_LEXICON_PATH, json_path)
+    artifact_path = tmp_path / "department_lexicon.pkl"
+    expected = load_compiled_lexicon(json_path, artifact_path)
+    return json_path, artifact_path, expected
+
+
+@pytest.mark.parametrize("damage", ["garbage", "empty", "truncated_header", "truncated", "flipped_bytes"])
+def test_damaged_artifact_is_recompiled(compiled_artifact, damage):
+    json_path, artifact_path, expected = compiled_artifact
+    data = artifact_path.read_bytes()
+    artifact_path.write_bytes({
+        "garbage": b"\x80\x04not a pickle at all",
+        "empty": b"",
+        "truncated_header": data[:7],
+        "truncated": data[:len(data) // 2],
+        "flipped_bytes": _garble(data),
+    }[damage])
+
+    compiled = load_compiled_lexicon(json_path, artifact_path)
+    assert isinstance(compiled, CompiledLexicon)
+    assert compiled.terms == expected.terms
+    assert compiled.labels.names == expected.labels.names
+    # Rewritten, so the next load reads it back.
+    assert artifact_path.read_bytes() == data
+
+
+def _bundled_titles():
+    texts = set()
+    for path in (cfg.ANNOTATED_JSON_PATH, cfg.NOT_ANNOTATED_JSON_PATH):
+        for jobs in load_profiles(path):
+            for job in jobs if isinstance(jobs, list) else []:
+                if isinstance(job, dict):
+                    texts.add(normalize_text(build_job_text(job)))
+                    texts.add(normalize_text(str(job.get("position") or "")))
+    return sorted(texts)
+
+
+@pytest.mark.parametrize("boundary", [False, True], ids=["substring", "boundary"])
+@pytest.mark.parametrize("json_path", [cfg.DEPT_LEXICON_PATH, cfg.SEN_LEXICON_PATH], ids=["department", "seniority"])
+def test_prefilter_never_rejects_a_hit(json_path, boundary):
+    compiled = load_compiled_lexicon(json_path)
+    prefilter = compiled.prefilter(boundary)
+    for t in _bundled_titles():
+        if not prefilter.may_match(t):
+            assert compiled.term_hits(t, boundary=boundary) == [], t
+
+
+# (term, title, boundary, whether the full scan hits)
+AFFIX_CASES = [
+    ("ops manager", "devops managers", False, True),
+    ("ops manager", "devops manager", False, True),
+    ("ops manager", "ops managers", False, True),
+    ("ops manager", "devops managers", True, False),
+    ("ops manager", "devops manager", True, False),
+    ("ops manager", "devops lead", False, False),
+    ("sales ops lead", "presales ops leader", False, True),
+    ("sales ops lead", "presales ops leader", True, False),
+    ("r&d", "head of r&d", False, True),
+    ("c-level", "c-levels", False, False),
+    ("- it", "senior qa- it x", False, True),
+]
+
+
+@pytest.mark.parametrize("term,title,boundary,hit", AFFIX_CASES)
+def test_prefilter_affix_terms(term, title, boundary, hit):
+    compiled = compile_lexicon({"X": [term]})
+    assert bool(compiled.term_hits(title, boundary=boundary)) == hit
+    if hit:
+        assert compiled.prefilter(boundary).may_match(title)
@@ -0,0 +1,59 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pandas as pd
+import pytest
+
+from config import rule_based as cfg
+from src.common.lexicon_builder import (
+    DEPARTMENT_SPEC,
+    SENIORITY_SPEC,
+    build_lexicon,
+    load_stats,
+    update_lexicon,
+)
+
+TASKS = {
+    "department": (cfg.DEPT_LEXICON_SOURCE_PATH, DEPARTMENT_SPEC),
+    "seniority": (cfg.SEN_LEXICON_SOURCE_PATH, SENIORITY_SPEC),
+}
+
+
+def _rows(csv_path):
+    df = pd.read_csv(csv_path)
+    return df["text"].astype(str).tolist(), df["label"].astype(str).tolist()
+
+
+@pytest.mark.parametrize("task", TASKS)
+@pytest.mark.parametrize("cuts", [(0.7,), (0.3, 0.6, 0.99)])
+def test_chunked_update_matches_full_build(tmp_path, task, cuts):
+    csv_path, spec = TASKS[task]
+    texts, labels = _rows(csv_path)
+    stats_path = tmp_path / "stats.pkl"
+
+    bounds = [int(len(texts) * c) for c in cuts] + [len(texts)]
+    lo = 0
+    for i, hi in enumerate(bounds):
+        lexicon, folded, rebuilt = update_lexicon(texts[:hi], labels[:hi], spec, stats_path)
+        assert (folded, rebuilt) == (hi - lo, i == 0)
+        lo = hi
+
+    assert lexicon == build_lexicon(texts, labels, spec)
+
+
+def test_damaged_stats_store_is_rebuilt(tmp_path):
+    texts, labels = _rows(cfg.SEN_LEXICON_SOURCE_PATH)
+    stats_path = tmp_path / "stats.pkl"
+    expected, _, _ = update_lexicon(texts, labels, SENIORITY_SPEC, stats_path)
+
+    data = stats_path.read_bytes()
+    stats_path.write_bytes(data[:len(data) // 2])
+    assert load_stats(SENIORITY_SPEC, stats_path) is None
+
+    lexicon, folded, rebuilt = update_lexicon(texts, labels, SENIORITY_SPEC, stats_path)
+    assert (lexicon, folded, rebuilt) == (expected, len(texts), True)
+    assert load_stats(SENIORITY_SPEC, stats_path).n_rows == len(texts)
@@ -0,0 +1,25 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np
+import pytest
+from sklearn.metrics import classification_report
+
+from src.common.metrics import ConfusionMatrix
+
+
+@pytest.mark.parametrize("labels", [["Other", "Sales", "Marketing", "Human Resources"], ["a", "b"], ["x" * 20, "y"]])
+@pytest.mark.parametrize("digits", [2, 4])
+def test_classification_report_matches_sklearn(labels, digits):
+    rng = np.random.default_rng(0)
+    y_true = rng.choice(labels, 300).tolist()
+    y_pred = rng.choice(labels + ["Unknown"], 300).tolist()
+    cm = ConfusionMatrix()
+    cm.update_many(y_true, y_pred)
+    order = sorted(cm.labels)
+    expected = classification_report(y_true, y_pred, labels=order, digits=digits, zero_division=0)
+    assert cm.classification_report(order, digits=digits) == expected
@@ -0,0 +1,87 @@
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pandas as pd
+import pytest
+
+from config import rule_based as cfg
+from src.algorithms.rule_based.batch import BatchDepartmentScorer, BatchSeniorityScorer
+from src.algorithms.rule_based.engine import (
+    DepartmentRuleScorer,
+    SeniorityRuleScorer,
+    predict_department_rule,
+    predict_seniority_rule,
+)
+from src.common.io import load_lexicon, load_profiles
+from src.common.text import build_job_text, normalize_text
+
+DEPT_ARGS = {
+    "bigram_weight": cfg.DEPT_BIGRAM_WEIGHT,
+    "unigram_weight": cfg.DEPT_UNIGRAM_WEIGHT,
+    "min_score": cfg.DEPT_MIN_SCORE,
+    "default_label": cfg.DEPT_DEFAULT_LABEL,
+}
+
+
+def _bundled_titles():
+    texts = []
+    for path in (cfg.ANNOTATED_JSON_PATH, cfg.NOT_ANNOTATED_JSON_PATH):
+        for jobs in load_profiles(path):
+            for job in jobs if isinstance(jobs, list) else []:
+                if isinstance(job, dict):
+                    texts.append(build_job_text(job))
+                    texts.append(str(job.get("position") or ""))
+    return texts
+
+
+def _csv_titles():
+    return [text for path in (cfg.DEPT_LEXICON_SOURCE_PATH, cfg.SEN_LEXICON_SOURCE_PATH)
+            for text in pd.read_csv(path)["text"].astype(str)]
+
+
+@pytest.fixture(scope="module", params=["bundled", "csv"])
+def titles(request):
+    texts = _bundled_titles() if request.param == "bundled" else _csv_titles()
+    # The reference engines run one regex per term, so score each normalized title once.
+    return list(dict.fromkeys(normalize_text(t) for t in texts))
+
+
+@pytest.fixture(scope="module")
+def lexicons():
+    return load_lexicon(cfg.DEPT_LEXICON_PATH), load_lexicon(cfg.SEN_LEXICON_PATH)
+
+
+def test_department_scorers_match_reference(titles, lexicons):
+    dept_lexicon, _ = lexicons
+    scorer = DepartmentRuleScorer(dept_lexicon, **DEPT_ARGS)
+    batch = BatchDepartmentScorer(dept_lexicon, **DEPT_ARGS)
+    res = batch.score(titles, normalized=True)
+    batch_labels = batch.labels_of(res)
+
+    for i, t in enumerate(titles):
+        label, debug = predict_department_rule(t, dept_lexicon, normalized=True, **DEPT_ARGS)
+        label_id, best, _ = scorer.score(t, normalized=True)
+        assert (scorer.label_name(label_id), best) == (label, debug["best_score"]), t
+        assert scorer.explain(t, normalized=True) == (label, debug), t
+        assert batch_labels[i] == label, t
+        assert batch.debug(res, i) == debug, t
+
+
+def test_seniority_scorers_match_reference(titles, lexicons):
+    _, sen_lexicon = lexicons
+    scorer = SeniorityRuleScorer(sen_lexicon, default_label=cfg.SEN_DEFAULT_LABEL)
+    batch = BatchSeniorityScorer(sen_lexicon, default_label=cfg.SEN_DEFAULT_LABEL)
+    res = batch.score(titles, normalized=True)
+    batch_labels = batch.labels_of(res)
+
+    for i, t in enumerate(titles):
+        label, debug = predict_seniority_rule(t, sen_lexicon, default_label=cfg.SEN_DEFAULT_LABEL, normalized=True)
+        label_id, hits = scorer.score(t, normalized=True)
+        assert (scorer.label_name(label_id), hits) == (label, debug["all_scores"].get(label, 0)), t
+        assert scorer.explain(t, normalized=True) == (label, debug), t
+        assert batch_labels[i] == label, t
+        assert batch.debug(res, i) == debug, t